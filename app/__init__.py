@@ -20,6 +20,9 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    from app.serialization import json_provider
+    app.json = json_provider(app)
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
@@ -27,17 +30,43 @@ def create_app(config_class=Config):
     CORS(app)
     ma.init_app(app)
     limiter.init_app(app)
-    socketio.init_app(app, cors_allowed_origins="*")
 
     # Register blueprints
     from app.auth import bp as auth_bp
     from app.main import bp as main_bp
     from app.providers import bp as providers_bp
     from app.messages import bp as messages_bp
+    from app.api import api as api_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(providers_bp)
     app.register_blueprint(messages_bp)
+    app.register_blueprint(api_bp, url_prefix='/api')
+
+    # After the blueprints, so every app's server gets the socket handlers
+    # they register; emits fan out through the message queue to all workers
+    from app.realtime import message_queue
+    socketio.init_app(app, cors_allowed_origins="*", client_manager=message_queue(app),
+                      async_mode=app.config.get('SOCKETIO_ASYNC_MODE'))
+
+    # Register CLI commands
+    from app.commands import background_cli, ratings_cli
+    app.cli.add_command(ratings_cli)
+    app.cli.add_command(background_cli)
 
     return app
+
+def start_background_tasks(app):
+    """Start the outbox dispatcher, post view flusher and presence sweeper of ``app``.
+
+    Only serving entry points call this: gunicorn's ``post_worker_init``,
+    ``run.py`` and ``flask background run``. Tests, scripts and other CLI
+    commands never start threads against a database they did not set up.
+    """
+    from app.outbox import start_dispatcher
+    from app.presence import start_sweeper
+    from app.view_counts import start_flusher
+    start_dispatcher(app)
+    start_flusher(app)
+    start_sweeper(app)
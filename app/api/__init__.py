@@ -2,4 +2,4 @@ from flask import Blueprint
 
 api = Blueprint('api', __name__)
 
-from . import users, providers, messages, blog, reviews
+from . import users, providers, messages, conversations, presence, blog, reviews, cache
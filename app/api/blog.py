@@ -1,19 +1,52 @@
-from flask import jsonify, request
+import time
+
+from flask import current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import delete, select
+from sqlalchemy.orm import joinedload
 from app.models import BlogPost, Comment, User
 from app import db
+from app.cache import cached, invalidate
+from app.comment_tree import DEFAULT_DEPTH, MAX_DEPTH, comment_trees, subtrees
+from app.conditional import conditional
+from app.pagination import paginate, page_response
+from app.serialization import row_dict
+from app.view_counts import record_view
 from . import api
 
+COMMENT_COLUMNS = (Comment.id, Comment.content, Comment.author_id, Comment.post_id, Comment.parent_id,
+                   Comment.created_at, Comment.updated_at)
+
+def post_version(id):
+    """Return what a published post's representation depends on, or None.
+
+    ``view_count`` is not versioned; the time bucket bounds how stale a
+    revalidated copy of it gets, like the cached listings.
+    """
+    row = db.session.execute(
+        select(BlogPost.version, User.updated_at)
+        .join(User, User.id == BlogPost.author_id)
+        .where(BlogPost.id == id, BlogPost.status == 'published')
+    ).first()
+    if row is None:
+        return None
+    return (*row, int(time.time() // current_app.config['RESPONSE_CACHE_TTL']))
+
 @api.route('/blog/posts', methods=['GET'])
+@conditional()
+@cached(lambda: ['blog:list'])
 def get_posts():
-    posts = BlogPost.query.filter_by(status='published').order_by(BlogPost.created_at.desc()).all()
-    return jsonify([post.to_dict() for post in posts])
+    query = BlogPost.query.filter_by(status='published').options(joinedload(BlogPost.author))
+    posts, next_cursor = paginate(query, BlogPost)
+    return page_response(posts, next_cursor, BlogPost.to_dict)
 
 @api.route('/blog/posts/<int:id>', methods=['GET'])
+@conditional(version=post_version, not_modified=lambda id: record_view(id))
 def get_post(id):
     post = BlogPost.query.get_or_404(id)
     if post.status != 'published':
         return jsonify({'error': 'Post not found'}), 404
+    record_view(post.id)
     return jsonify(post.to_dict())
 
 @api.route('/blog/posts', methods=['POST'])
@@ -31,6 +64,7 @@ def create_post():
     )
     
     db.session.add(post)
+    invalidate('blog:list')
     db.session.commit()
     return jsonify(post.to_dict()), 201
 
@@ -53,13 +87,37 @@ def update_post(id):
     if 'status' in data:
         post.status = data['status']
     
+    invalidate('blog:list')
     db.session.commit()
     return jsonify(post.to_dict())
 
 @api.route('/blog/posts/<int:id>/comments', methods=['GET'])
+@conditional()
 def get_post_comments(id):
     post = BlogPost.query.get_or_404(id)
-    return jsonify([comment.to_dict() for comment in post.comments])
+    query = db.session.query(*COMMENT_COLUMNS).filter(Comment.post_id == post.id)
+    comments, next_cursor = paginate(query, Comment, descending=False)
+    return page_response(comments, next_cursor, row_dict)
+
+def _tree_depth():
+    return max(0, min(request.args.get('depth', DEFAULT_DEPTH, type=int), MAX_DEPTH))
+
+@api.route('/blog/posts/<int:id>/comments/tree', methods=['GET'])
+@conditional()
+def get_post_comment_tree(id):
+    post = BlogPost.query.get_or_404(id)
+    roots, next_cursor = paginate(Comment.query.filter_by(post_id=post.id, parent_id=None), Comment,
+                                  descending=False)
+    return jsonify({
+        'items': comment_trees(roots, _tree_depth()),
+        'next_cursor': next_cursor
+    })
+
+@api.route('/blog/comments/<int:id>/tree', methods=['GET'])
+@conditional()
+def get_comment_tree(id):
+    comment = Comment.query.get_or_404(id)
+    return jsonify(comment_trees([comment], _tree_depth())[0])
 
 @api.route('/blog/posts/<int:id>/comments', methods=['POST'])
 @jwt_required()
@@ -68,13 +126,40 @@ def create_comment(id):
     post = BlogPost.query.get_or_404(id)
     data = request.get_json()
     
+    parent_id = data.get('parent_id')
+    if parent_id is not None:
+        parent = db.session.get(Comment, parent_id)
+        if parent is None or parent.post_id != post.id:
+            return jsonify({'error': 'Parent comment not found on this post'}), 400
+    
     comment = Comment(
         content=data['content'],
         author_id=current_user_id,
         post_id=post.id,
-        parent_id=data.get('parent_id')
+        parent_id=parent_id
     )
     
     db.session.add(comment)
+    post.record_comment(1)
+    invalidate('blog:list')
     db.session.commit()
     return jsonify(comment.to_dict()), 201
+
+@api.route('/blog/comments/<int:id>', methods=['DELETE'])
+@jwt_required()
+def delete_comment(id):
+    current_user_id = get_jwt_identity()
+    comment = Comment.query.get_or_404(id)
+    
+    if comment.author_id != current_user_id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    # Replies go with the comment, as the parent_id cascade would have it
+    ids = db.session.scalars(select(subtrees([comment.id]).c.id)).all()
+    comment.post.record_comment(-len(ids))
+    invalidate('blog:list')
+    
+    db.session.execute(delete(Comment).where(Comment.id.in_(ids)),
+                       execution_options={'synchronize_session': False})
+    db.session.commit()
+    return '', 204
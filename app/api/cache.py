@@ -0,0 +1,23 @@
+from flask import jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db
+from app.cache import response_cache
+from app.models import User, UserRole
+from . import api
+
+@api.route('/cache/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    user = db.session.get(User, get_jwt_identity())
+    if user is None or user.role != UserRole.ADMIN:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    # Counters are per worker process
+    endpoints = response_cache().stats
+    totals = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+    for counters in endpoints.values():
+        for outcome, count in counters.items():
+            totals[outcome] += count
+    lookups = sum(totals.values())
+    totals['hit_ratio'] = round((totals['local_hits'] + totals['shared_hits']) / lookups, 3) if lookups else None
+    return jsonify({'totals': totals, 'endpoints': endpoints})
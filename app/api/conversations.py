@@ -0,0 +1,71 @@
+from flask import jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models import Conversation, Message
+from app import db
+from app.pagination import id_window, paginate, page_response
+from . import api
+
+@api.route('/conversations', methods=['GET'])
+@jwt_required()
+def get_conversations():
+    current_user_id = get_jwt_identity()
+    query = db.session.query(Conversation, Message).\
+        filter((Conversation.user_a_id == current_user_id) | (Conversation.user_b_id == current_user_id)).\
+        outerjoin(Message, Message.id == Conversation.last_message_id)
+    
+    rows, next_cursor = paginate(query, Conversation, entity=lambda row: row[0],
+                                 column=Conversation.last_message_at)
+    return jsonify({
+        'items': [conversation.to_dict(current_user_id, message) for conversation, message in rows],
+        'next_cursor': next_cursor
+    })
+
+def get_participant_conversation(id, user_id):
+    conversation = Conversation.query.get_or_404(id)
+    if user_id not in (conversation.user_a_id, conversation.user_b_id):
+        return None
+    return conversation
+
+@api.route('/conversations/<int:id>/messages', methods=['GET'])
+@jwt_required()
+def get_conversation_messages(id):
+    current_user_id = get_jwt_identity()
+    conversation = get_participant_conversation(id, current_user_id)
+    if conversation is None:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    query = Message.query.filter_by(conversation_id=conversation.id)
+    since_id = request.args.get('since_id', type=int)
+    before_id = request.args.get('before_id', type=int)
+    if since_id is not None or before_id is not None:
+        # Delta sync: only what the client is missing, oldest first for since_id
+        messages, has_more = id_window(query, Message, since_id, before_id)
+        return jsonify({
+            'items': [message.to_dict() for message in messages],
+            'has_more': has_more
+        })
+    
+    messages, next_cursor = paginate(query, Message)
+    if not request.args.get('cursor'):
+        # Opening the thread reads it: one UPDATE however long it is
+        conversation.mark_read(current_user_id)
+        db.session.commit()
+    
+    return page_response(messages, next_cursor, Message.to_dict)
+
+@api.route('/conversations/<int:id>/read', methods=['POST'])
+@jwt_required()
+def mark_conversation_read(id):
+    current_user_id = get_jwt_identity()
+    conversation = get_participant_conversation(id, current_user_id)
+    if conversation is None:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    up_to = data.get('message_id')
+    if up_to is not None and (type(up_to) is not int or up_to < 0):
+        return jsonify({'error': 'message_id must be a message id'}), 400
+    
+    conversation.mark_read(current_user_id, up_to=up_to)
+    db.session.commit()
+    return jsonify(conversation.to_dict(current_user_id))
@@ -1,19 +1,20 @@
 from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_socketio import emit
-from app.models import Message, User
-from app import db, socketio
+from app.models import Message, User, record_message
+from app import db
+from app.delivery import deliver
+from app.pagination import paginate, page_response
 from . import api
 
 @api.route('/messages', methods=['GET'])
 @jwt_required()
 def get_messages():
     current_user_id = get_jwt_identity()
-    messages = Message.query.filter(
+    messages, next_cursor = paginate(Message.query.filter(
         (Message.sender_id == current_user_id) | 
         (Message.receiver_id == current_user_id)
-    ).order_by(Message.created_at.desc()).all()
-    return jsonify([message.to_dict() for message in messages])
+    ), Message)
+    return page_response(messages, next_cursor, Message.to_dict)
 
 @api.route('/messages/<int:id>', methods=['GET'])
 @jwt_required()
@@ -40,15 +41,11 @@ def create_message():
     )
     
     db.session.add(message)
+    record_message(message)
+    # Emitted by the outbox dispatcher once this transaction commits
+    deliver(receiver.id, message.to_dict())
     db.session.commit()
     
-    # Emit socket event
-    socketio.emit(
-        'new_message',
-        message.to_dict(),
-        room=str(receiver.id)
-    )
-    
     return jsonify(message.to_dict()), 201
 
 @api.route('/messages/<int:id>/read', methods=['POST'])
@@ -60,8 +57,8 @@ def mark_message_read(id):
     if message.receiver_id != current_user_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    message.read = True
-    message.read_at = db.func.now()
+    # Reading a message also reads everything before it in the thread
+    message.conversation.mark_read(current_user_id, up_to=message.id)
     db.session.commit()
     
     return jsonify(message.to_dict())
@@ -0,0 +1,17 @@
+from flask import jsonify, request
+from flask_jwt_extended import jwt_required
+from app.presence import MAX_LOOKUP, presence
+from . import api
+
+@api.route('/presence', methods=['GET'])
+@jwt_required()
+def get_presence():
+    try:
+        user_ids = [int(user_id) for user_id in request.args.get('user_ids', '').split(',') if user_id.strip()]
+    except ValueError:
+        return jsonify({'error': 'user_ids must be a comma-separated list of ids'}), 400
+    if len(user_ids) > MAX_LOOKUP:
+        return jsonify({'error': f'At most {MAX_LOOKUP} user ids per lookup'}), 400
+    
+    # One lookup for the whole batch, however many ids are asked about
+    return jsonify({'online': sorted(presence().online(user_ids))})
@@ -1,15 +1,67 @@
-from flask import jsonify, request
+import time
+from flask import current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import ServiceProvider, User, UserRole
+from sqlalchemy import select
+from app.models import ServiceProvider, User, UserRole, Service, normalize_services, providers_offering
+from app.models.service import provider_service
 from app import db
+from app.cache import cached, invalidate
+from app.conditional import conditional
+from app.distance import within_radius
+from app.geo import geohash_filter
+from app.nearest import ProviderIndex
+from app.pagination import paginate, page_response
+from app.singleflight import coalesced
+from app.streaming import stream_json, wants_stream
 from . import api
 
+def provider_index():
+    """Return this process's KD-tree of provider locations.
+
+    The tree is built lazily from the database and rebuilt after
+    NEAREST_INDEX_MAX_AGE seconds so that changes made by other workers
+    are picked up; changes made here are applied to it immediately.
+    """
+    index = current_app.extensions.get('provider_index')
+    max_age = current_app.config.get('NEAREST_INDEX_MAX_AGE', 300)
+    if index is None or time.monotonic() - index.built_at > max_age:
+        tags = {}
+        for provider_id, name in db.session.query(provider_service.c.provider_id, Service.name).\
+                join(Service, Service.id == provider_service.c.service_id):
+            tags.setdefault(provider_id, set()).add(name)
+        
+        rows = db.session.query(ServiceProvider.id, ServiceProvider.latitude, ServiceProvider.longitude)
+        index = ProviderIndex()
+        index.build((id, lat, lng, tags.get(id)) for id, lat, lng in rows)
+        current_app.extensions['provider_index'] = index
+    return index
+
+def index_provider(provider):
+    index = current_app.extensions.get('provider_index')
+    if index is not None:
+        index.upsert(provider.id, provider.latitude, provider.longitude,
+                     provider.services)
+
+def unindex_provider(provider_id):
+    index = current_app.extensions.get('provider_index')
+    if index is not None:
+        index.remove(provider_id)
+
+def provider_version(id):
+    return db.session.execute(select(ServiceProvider.version).where(ServiceProvider.id == id)).scalar()
+
 @api.route('/providers', methods=['GET'])
+@conditional()
+@cached(lambda: ['providers'])
 def get_providers():
-    providers = ServiceProvider.query.all()
-    return jsonify([provider.to_dict() for provider in providers])
+    if wants_stream():
+        return stream_json(ServiceProvider.query.order_by(ServiceProvider.id), ServiceProvider.to_dict)
+    providers, next_cursor = paginate(ServiceProvider.query, ServiceProvider)
+    return page_response(providers, next_cursor, ServiceProvider.to_dict)
 
 @api.route('/providers/<int:id>', methods=['GET'])
+@conditional(version=provider_version)
+@cached(lambda id: [f'provider:{id}'])
 def get_provider(id):
     provider = ServiceProvider.query.get_or_404(id)
     return jsonify(provider.to_dict())
@@ -24,18 +76,23 @@ def create_provider():
         return jsonify({'error': 'Only providers can create a provider profile'}), 403
     
     data = request.get_json()
-    provider = ServiceProvider(
-        user_id=current_user_id,
-        business_name=data['business_name'],
-        description=data.get('description'),
-        address=data['address'],
-        latitude=data['latitude'],
-        longitude=data['longitude'],
-        services=data.get('services', [])
-    )
+    try:
+        provider = ServiceProvider(
+            user_id=current_user_id,
+            business_name=data['business_name'],
+            description=data.get('description'),
+            address=data['address'],
+            latitude=data['latitude'],
+            longitude=data['longitude'],
+            services=data.get('services', [])
+        )
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
     
     db.session.add(provider)
+    invalidate('providers')
     db.session.commit()
+    index_provider(provider)
     return jsonify(provider.to_dict()), 201
 
 @api.route('/providers/<int:id>', methods=['PUT'])
@@ -59,9 +116,14 @@ def update_provider(id):
     if 'longitude' in data:
         provider.longitude = data['longitude']
     if 'services' in data:
-        provider.services = data['services']
+        try:
+            provider.services = data['services']
+        except ValueError as error:
+            return jsonify({'error': str(error)}), 400
     
+    invalidate('providers', f'provider:{id}')
     db.session.commit()
+    index_provider(provider)
     return jsonify(provider.to_dict())
 
 @api.route('/providers/<int:id>', methods=['DELETE'])
@@ -74,25 +136,75 @@ def delete_provider(id):
         return jsonify({'error': 'Unauthorized'}), 403
     
     db.session.delete(provider)
+    invalidate('providers', f'provider:{id}', f'provider:{id}:reviews')
     db.session.commit()
+    unindex_provider(id)
     return '', 204
 
 @api.route('/providers/search', methods=['GET'])
+@conditional()
+@cached(lambda: ['providers'])
+@coalesced()
 def search_providers():
-    lat = float(request.args.get('lat', 0))
-    lon = float(request.args.get('lon', 0))
-    radius = float(request.args.get('radius', 10))  # km
-    service = request.args.get('service')
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    radius = request.args.get('radius', 10, type=float)  # km
+    try:
+        services = normalize_services(request.args.get('service', ''))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    match = request.args.get('match', 'all')
+    if match not in ('all', 'any'):
+        return jsonify({'error': "match must be 'all' or 'any'"}), 400
+    exact = request.args.get('exact', 'false').lower() == 'true'
+    
+    query = ServiceProvider.query
+    if services:
+        query = query.filter(ServiceProvider.id.in_(providers_offering(services, match)))
+    if lat is not None and lon is not None:
+        # Only rows in the geohash cells around the point are loaded
+        query = query.filter(geohash_filter(ServiceProvider.geohash, lat, lon, radius))
+    
+    providers = query.all()
+    
+    if lat is None or lon is None:
+        return jsonify([provider.to_dict() for provider in providers])
     
-    # Basic filtering for now - in production, use PostGIS or similar for proper geo queries
-    providers = ServiceProvider.query.all()
     results = []
+    for provider, distance in within_radius(providers, lat, lon, radius, exact=exact):
+        provider_dict = provider.to_dict()
+        provider_dict['distance'] = round(distance, 1)
+        results.append(provider_dict)
+    
+    return jsonify(results)
+
+@api.route('/providers/nearest', methods=['GET'])
+@conditional()
+@cached(lambda: ['providers'])
+@coalesced()
+def nearest_providers():
+    lat = request.args.get('lat', type=float)
+    lng = request.args.get('lng', type=float)
+    k = min(request.args.get('k', 20, type=int), 100)
+    try:
+        services = normalize_services(request.args.get('services', ''))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
     
-    for provider in providers:
-        # Calculate distance using Haversine formula (implement this)
-        # Filter by service if specified
-        if service and service not in provider.services:
-            continue
-        results.append(provider.to_dict())
+    if lat is None or lng is None:
+        return jsonify({'error': 'lat and lng are required'}), 400
+    
+    nearest = provider_index().nearest(lat, lng, k, tags=services)
+    providers = {
+        provider.id: provider
+        for provider in ServiceProvider.query.filter(ServiceProvider.id.in_([id for id, _ in nearest]))
+    }
+    
+    results = []
+    for id, distance in nearest:
+        if id in providers:
+            provider_dict = providers[id].to_dict()
+            provider_dict['distance'] = round(distance, 1)
+            results.append(provider_dict)
     
     return jsonify(results)
@@ -2,13 +2,32 @@ from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import Review, ServiceProvider
 from app import db
+from app.cache import cached, invalidate
+from app.conditional import conditional
+from app.pagination import paginate, page_response
+from app.serialization import row_dict
 from . import api
 
+REVIEW_COLUMNS = (Review.id, Review.user_id, Review.provider_id, Review.rating, Review.content,
+                  Review.created_at, Review.updated_at)
+
+def valid_rating(rating):
+    # Each rating has its own histogram column, so only whole stars are accepted
+    return type(rating) is int and 1 <= rating <= 5
+
+def invalidate_review_tags(provider_id):
+    # Provider pages and listings embed the rating aggregates
+    invalidate('providers', f'provider:{provider_id}', f'provider:{provider_id}:reviews')
+
 @api.route('/providers/<int:provider_id>/reviews', methods=['GET'])
+@conditional()
+@cached(lambda provider_id: [f'provider:{provider_id}:reviews'])
 def get_provider_reviews(provider_id):
     provider = ServiceProvider.query.get_or_404(provider_id)
-    reviews = Review.query.filter_by(provider_id=provider.id).order_by(Review.created_at.desc()).all()
-    return jsonify([review.to_dict() for review in reviews])
+    # Columns only: no Review instances are built and the provider encodes the dates
+    query = db.session.query(*REVIEW_COLUMNS).filter(Review.provider_id == provider.id)
+    reviews, next_cursor = paginate(query, Review)
+    return page_response(reviews, next_cursor, row_dict)
 
 @api.route('/providers/<int:provider_id>/reviews', methods=['POST'])
 @jwt_required()
@@ -16,6 +35,8 @@ def create_review(provider_id):
     current_user_id = get_jwt_identity()
     provider = ServiceProvider.query.get_or_404(provider_id)
     data = request.get_json()
+    if not valid_rating(data.get('rating')):
+        return jsonify({'error': 'rating must be a whole number from 1 to 5'}), 400
     
     # Check if user has already reviewed this provider
     existing_review = Review.query.filter_by(
@@ -33,9 +54,8 @@ def create_review(provider_id):
         content=data.get('content')
     )
     
-    # Update provider's rating
-    provider.review_count += 1
-    provider.rating = (provider.rating * (provider.review_count - 1) + review.rating) / provider.review_count
+    provider.record_rating(added=review.rating)
+    invalidate_review_tags(provider.id)
     
     db.session.add(review)
     db.session.commit()
@@ -51,6 +71,8 @@ def update_review(id):
         return jsonify({'error': 'Unauthorized'}), 403
     
     data = request.get_json()
+    if 'rating' in data and not valid_rating(data['rating']):
+        return jsonify({'error': 'rating must be a whole number from 1 to 5'}), 400
     old_rating = review.rating
     
     if 'rating' in data:
@@ -58,9 +80,12 @@ def update_review(id):
     if 'content' in data:
         review.content = data['content']
     
-    # Update provider's rating
-    provider = review.provider
-    provider.rating = (provider.rating * provider.review_count - old_rating + review.rating) / provider.review_count
+    if review.rating != old_rating:
+        review.provider.record_rating(added=review.rating, removed=old_rating)
+        invalidate_review_tags(review.provider_id)
+    else:
+        # Only the review list shows the content
+        invalidate(f'provider:{review.provider_id}:reviews')
     
     db.session.commit()
     return jsonify(review.to_dict())
@@ -74,13 +99,8 @@ def delete_review(id):
     if review.user_id != current_user_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    # Update provider's rating
-    provider = review.provider
-    if provider.review_count > 1:
-        provider.rating = (provider.rating * provider.review_count - review.rating) / (provider.review_count - 1)
-    else:
-        provider.rating = 0
-    provider.review_count -= 1
+    review.provider.record_rating(removed=review.rating)
+    invalidate_review_tags(review.provider_id)
     
     db.session.delete(review)
     db.session.commit()
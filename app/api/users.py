@@ -2,13 +2,17 @@ from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import User
 from app import db, limiter
+from app.pagination import paginate, page_response
+from app.streaming import stream_json, wants_stream
 from . import api
 
 @api.route('/users', methods=['GET'])
 @jwt_required()
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    if wants_stream():
+        return stream_json(User.query.order_by(User.id), User.to_dict)
+    users, next_cursor = paginate(User.query, User)
+    return page_response(users, next_cursor, User.to_dict)
 
 @api.route('/users/<int:id>', methods=['GET'])
 @jwt_required()
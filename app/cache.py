@@ -0,0 +1,217 @@
+"""Two-tier response cache with tag-based invalidation.
+
+``@cached(tags)`` stores a view's 200 responses in a bounded in-process
+LRU in front of a shared tier. Each entry is tagged with the entities it
+was built from (``provider:42``, ``blog:list``...) and write paths call
+``invalidate`` with the tags they affect.
+
+Invalidation is generational. Every tag has a version number in the
+shared tier and cache keys include the versions of their tags, so bumping
+a tag makes every entry built from it unreachable in both tiers and on
+every worker at once; stale entries simply age out. A lookup costs one
+round trip to read the tag versions, plus one more on a local miss.
+
+``RESPONSE_CACHE_URL`` picks the shared tier like ``DELIVERY_QUEUE_URL``:
+Redis, ``fakeredis://`` for tests, or a local stand-in when unset. Hit and
+miss counters per endpoint are kept per process and served by
+``GET /api/cache/stats``.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import redis
+from flask import Response, current_app, has_app_context, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import db
+from app.streaming import wants_stream
+
+KEY_PREFIX = 'cache'
+
+
+class LRUCache:
+    """Thread-safe LRU map bounded by entry count and age."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class LocalStore:
+    """Process-local stand-in for the shared tier."""
+
+    def __init__(self, maxsize, ttl):
+        self._lock = threading.Lock()
+        self._entries = LRUCache(maxsize, ttl)
+        self._versions = {}
+
+    def versions(self, tags):
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, value, ttl):
+        self._entries.set(key, value, ttl)
+
+
+class RedisStore:
+    """Shared tier in Redis: one string per entry, one counter per tag."""
+
+    def __init__(self, client):
+        self.redis = client
+
+    def _tag_key(self, tag):
+        return f'{KEY_PREFIX}:tag:{tag}'
+
+    def versions(self, tags):
+        if not tags:
+            return []
+        return [int(version or 0) for version in self.redis.mget([self._tag_key(tag) for tag in tags])]
+
+    def bump(self, tags):
+        pipeline = self.redis.pipeline()
+        for tag in tags:
+            pipeline.incr(self._tag_key(tag))
+        pipeline.execute()
+
+    def get(self, key):
+        value = self.redis.get(f'{KEY_PREFIX}:entry:{key}')
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.redis.set(f'{KEY_PREFIX}:entry:{key}', json.dumps(value), ex=ttl)
+
+
+class ResponseCache:
+    """The two tiers of one app, with per-endpoint counters."""
+
+    def __init__(self, local, shared, ttl):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def count(self, endpoint, outcome):
+        with self._lock:
+            counters = self.stats.setdefault(endpoint, {'local_hits': 0, 'shared_hits': 0, 'misses': 0})
+            counters[outcome] += 1
+
+    def key(self, base, tags):
+        versions = self.shared.versions(tags)
+        tagged = ','.join(f'{tag}={version}' for tag, version in zip(tags, versions))
+        return hashlib.sha1(f'{base}|{tagged}'.encode()).hexdigest()
+
+    def get(self, key):
+        """Return ``(entry, tier)``, or ``(None, None)`` on a miss."""
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry, 'local_hits'
+        entry = self.shared.get(key)
+        if entry is not None:
+            self.local.set(key, entry)
+            return entry, 'shared_hits'
+        return None, None
+
+    def set(self, key, entry, ttl=None):
+        self.local.set(key, entry)
+        self.shared.set(key, entry, ttl or self.ttl)
+
+
+def _create(app):
+    url = app.config.get('RESPONSE_CACHE_URL')
+    ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+    local = LRUCache(app.config.get('RESPONSE_CACHE_LOCAL_SIZE', 1024),
+                     app.config.get('RESPONSE_CACHE_LOCAL_TTL', 30))
+    if not url:
+        shared = LocalStore(app.config.get('RESPONSE_CACHE_LOCAL_SIZE', 1024) * 4, ttl)
+    elif url.startswith('fakeredis://'):
+        import fakeredis
+        shared = RedisStore(fakeredis.FakeRedis())
+    else:
+        shared = RedisStore(redis.Redis.from_url(url))
+    return ResponseCache(local, shared, ttl)
+
+
+def response_cache():
+    """Return the response cache of the current app."""
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        cache = current_app.extensions['response_cache'] = _create(current_app)
+    return cache
+
+
+def cached(tags, ttl=None):
+    """Cache a GET view's 200 responses under the tags ``tags(**view_args)``."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Streamed responses are never stored, and the key does not
+            # tell them from the paginated body of the same URL
+            if not current_app.config.get('RESPONSE_CACHE_ENABLED', True) or wants_stream():
+                return view(*args, **kwargs)
+
+            cache = response_cache()
+            key = cache.key(f'{request.path}?{request.query_string.decode()}', sorted(tags(**kwargs)))
+            entry, tier = cache.get(key)
+            if entry is not None:
+                cache.count(request.endpoint, tier)
+                return Response(entry['body'], status=200, mimetype=entry['mimetype'])
+
+            cache.count(request.endpoint, 'misses')
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.set(key, {'body': response.get_data(as_text=True), 'mimetype': response.mimetype}, ttl)
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate(*tags):
+    """Invalidate ``tags`` once the current transaction commits."""
+    db.session.info.setdefault('cache_tags', set()).update(tags)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_tags(session):
+    tags = session.info.pop('cache_tags', None)
+    if tags and has_app_context():
+        response_cache().shared.bump(sorted(tags))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_tags(session):
+    session.info.pop('cache_tags', None)
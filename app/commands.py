@@ -0,0 +1,83 @@
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import case, func, select, update
+from app import db
+from app.models import Review, ServiceProvider
+
+ratings_cli = AppGroup('ratings', help='Maintain provider rating aggregates.')
+background_cli = AppGroup('background', help='Run background tasks outside the web server.')
+
+# Stores a separate background process must share with the web processes
+SHARED_STORES = ('SOCKETIO_MESSAGE_QUEUE', 'DELIVERY_QUEUE_URL', 'VIEW_COUNTER_URL', 'PRESENCE_URL',
+                 'RESPONSE_CACHE_URL')
+
+def rebuild_rating_aggregates(batch_size=1000):
+    """Recompute every provider's review aggregates from the review table.
+
+    Returns the number of providers written.
+    """
+    stars_columns = [
+        func.sum(case((Review.rating == stars, 1), else_=0))
+        for stars in range(1, 6)
+    ]
+    totals = {
+        provider_id: (count, rating_sum, stars)
+        for provider_id, count, rating_sum, *stars in db.session.execute(
+            select(Review.provider_id, func.count(Review.id), func.sum(Review.rating), *stars_columns)
+            .group_by(Review.provider_id))
+    }
+    
+    written = 0
+    batch = []
+    for provider_id in db.session.scalars(select(ServiceProvider.id)):
+        count, rating_sum, stars = totals.get(provider_id, (0, 0, [0] * 5))
+        values = {
+            'id': provider_id,
+            'review_count': count,
+            'rating_sum': rating_sum,
+            'rating': rating_sum / count if count else 0.0,
+        }
+        values.update({f'stars_{index}': value for index, value in enumerate(stars, 1)})
+        batch.append(values)
+        
+        if len(batch) >= batch_size:
+            db.session.execute(update(ServiceProvider), batch)
+            written += len(batch)
+            batch = []
+    
+    if batch:
+        db.session.execute(update(ServiceProvider), batch)
+        written += len(batch)
+    # Bulk updates by primary key skip the ORM's version bump
+    db.session.execute(update(ServiceProvider).values(version=ServiceProvider.version + 1))
+    db.session.commit()
+    return written
+
+@ratings_cli.command('rebuild')
+@click.option('--batch-size', default=1000, show_default=True, help='Providers updated per statement.')
+def rebuild_command(batch_size):
+    """Rebuild rating aggregates for all providers."""
+    written = rebuild_rating_aggregates(batch_size)
+    click.echo(f'Rebuilt rating aggregates for {written} providers.')
+
+@background_cli.command('run')
+def run_background_command():
+    """Drain the outbox, flush post views and sweep presence until interrupted.
+
+    For servers that do not start them in each worker, such as ``flask run``.
+    Refuses to start while any of SHARED_STORES is process-local, since the
+    tasks would then work on this process's copy instead of the web's.
+    """
+    local = [name for name in SHARED_STORES
+             if not current_app.config.get(name) or current_app.config[name].startswith('fakeredis://')]
+    if local:
+        raise click.ClickException(f'{", ".join(local)} must point at a shared store such as Redis.')
+    
+    from app import start_background_tasks
+    start_background_tasks(current_app._get_current_object())
+    click.echo('Running background tasks, press Ctrl+C to stop.')
+    while True:
+        time.sleep(60)
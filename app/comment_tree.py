@@ -0,0 +1,72 @@
+"""Threaded comment trees built from a single query.
+
+The subtrees under a set of root comments are read with one recursive CTE
+that tags every row with its depth below its root, and the tree is then
+assembled in memory in O(n): each row is filed under its parent once, and
+descendant counts are summed bottom-up by depth instead of by walking the
+tree.
+
+Replies deeper than the requested depth are not serialized. The deepest
+node shown carries ``collapsed_count``, the number of comments hidden
+under it, so a client can offer to expand the branch by fetching that
+comment's own subtree.
+"""
+from sqlalchemy import literal, select
+
+from app import db
+from app.models import Comment
+
+DEFAULT_DEPTH = 3
+MAX_DEPTH = 10
+
+
+def subtrees(root_ids):
+    """Return a recursive CTE of ``(id, depth)`` for the roots and all their replies."""
+    tree = select(Comment.id, literal(0).label('depth')) \
+        .where(Comment.id.in_(root_ids)) \
+        .cte('comment_tree', recursive=True)
+    return tree.union_all(
+        select(Comment.id, tree.c.depth + 1).join(tree, Comment.parent_id == tree.c.id)
+    )
+
+
+def load_subtrees(root_ids):
+    """Return ``(comment, depth)`` for the roots and all their replies."""
+    if not root_ids:
+        return []
+    tree = subtrees(root_ids)
+    query = select(Comment, tree.c.depth).join(tree, Comment.id == tree.c.id) \
+        .order_by(Comment.created_at, Comment.id)
+    return db.session.execute(query).all()
+
+
+def build_tree(roots, rows, max_depth=DEFAULT_DEPTH):
+    """Serialize ``roots`` with their replies down to ``max_depth`` levels."""
+    children = {}
+    by_depth = {}
+    for comment, depth in rows:
+        children.setdefault(comment.parent_id, []).append(comment)
+        by_depth.setdefault(depth, []).append(comment)
+
+    # Deepest level first, so every child's total is known before its parent's
+    descendants = {}
+    for depth in sorted(by_depth, reverse=True):
+        for comment in by_depth[depth]:
+            descendants[comment.id] = sum(1 + descendants[child.id] for child in children.get(comment.id, ()))
+
+    def serialize(comment, depth):
+        node = comment.to_dict()
+        if depth < max_depth:
+            node['replies'] = [serialize(child, depth + 1) for child in children.get(comment.id, ())]
+            node['collapsed_count'] = 0
+        else:
+            node['replies'] = []
+            node['collapsed_count'] = descendants.get(comment.id, 0)
+        return node
+
+    return [serialize(root, 0) for root in roots]
+
+
+def comment_trees(roots, max_depth=DEFAULT_DEPTH):
+    """Return the serialized trees under ``roots`` in one query."""
+    return build_tree(roots, load_subtrees([root.id for root in roots]), max_depth)
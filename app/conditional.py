@@ -0,0 +1,62 @@
+"""Conditional GET for read endpoints.
+
+``@conditional()`` gives a view's 200 responses an ETag and answers a
+matching ``If-None-Match`` with ``304 Not Modified`` and no body. By
+default the ETag is a hash of the response body, which saves the
+transfer but still runs the view.
+
+With ``version=`` the ETag is derived from a cheap lookup instead, called
+with the view's arguments: typically the row's ``version`` counter (see
+``Versioned``), plus whatever else the representation embeds. When it
+matches, the view is never called, so neither the full query nor the
+serialization runs. The lookup returns None when there is nothing to
+version, and the view runs as usual to produce its error. Side effects
+of the view that must happen on every request, such as counting a view,
+go in ``not_modified``, which is called with the same arguments whenever
+the 304 is answered without the view.
+
+Only ETags are used. ``updated_at`` is not bumped by the counters that
+are maintained in SQL, and ``Last-Modified`` has one-second granularity,
+so neither can tell every version of a row apart.
+"""
+import hashlib
+from functools import wraps
+
+from flask import make_response, request
+
+
+def _version_etag(token):
+    key = f'{request.path}?{request.query_string.decode()}|{token}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def conditional(version=None, not_modified=None):
+    """Decorate a GET view to support ``If-None-Match``."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = None
+            if version is not None:
+                token = version(**kwargs)
+                if token is not None:
+                    etag = _version_etag(token)
+                    if request.if_none_match.contains(etag):
+                        if not_modified is not None:
+                            not_modified(**kwargs)
+                        response = make_response('', 304)
+                        response.set_etag(etag)
+                        response.headers['Cache-Control'] = 'no-cache'
+                        return response
+
+            response = make_response(view(*args, **kwargs))
+            # Hashing a streamed body would read it all into memory
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            if etag is not None:
+                response.set_etag(etag)
+            else:
+                response.add_etag()
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
@@ -0,0 +1,127 @@
+"""Per-user queues of messages waiting for a socket acknowledgement.
+
+Every message is queued for its recipient when the outbox dispatches it
+and stays queued until the recipient's client acks it over the socket. A client
+that connects receives everything still pending in one batch, so being
+offline costs O(pending) instead of a full thread re-fetch.
+
+The backend is picked from ``DELIVERY_QUEUE_URL``: a Redis URL keeps the
+queues in one hash per user shared by all workers, ``fakeredis://`` does
+the same in-process for tests, and leaving it unset keeps them in local
+memory for single-process deployments.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from flask import current_app
+
+KEY_PREFIX = 'pending'
+
+
+class LocalDeliveryQueue:
+    """Process-local pending queues.
+
+    Like the Redis hashes, a queue is dropped ``ttl`` seconds after its last
+    message, so users who never come back do not accumulate in memory.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # user id -> (expires at, {message id: payload}), least recently pushed first
+        self._queues = OrderedDict()
+
+    def _expire(self, now):
+        while self._queues:
+            user_id, (expires_at, _) = next(iter(self._queues.items()))
+            if expires_at > now:
+                break
+            del self._queues[user_id]
+
+    def _queue(self, user_id):
+        self._expire(time.monotonic())
+        entry = self._queues.get(user_id)
+        return entry[1] if entry else {}
+
+    def push(self, user_id, message_id, payload):
+        with self._lock:
+            queue = self._queue(user_id)
+            queue[message_id] = payload
+            self._queues[user_id] = (time.monotonic() + self.ttl, queue)
+            self._queues.move_to_end(user_id)
+
+    def ack(self, user_id, message_ids):
+        with self._lock:
+            queue = self._queue(user_id)
+            for message_id in message_ids:
+                queue.pop(message_id, None)
+            if not queue:
+                self._queues.pop(user_id, None)
+
+    def pending(self, user_id):
+        with self._lock:
+            queue = dict(self._queue(user_id))
+        return [queue[message_id] for message_id in sorted(queue)]
+
+
+class RedisDeliveryQueue:
+    """Pending queues kept as one Redis hash per user, keyed by message id.
+
+    Each call is a single round trip. Queues of users who never come back
+    expire ``ttl`` seconds after their last message.
+    """
+
+    def __init__(self, client, ttl):
+        self.redis = client
+        self.ttl = ttl
+
+    def _key(self, user_id):
+        return f'{KEY_PREFIX}:{user_id}'
+
+    def push(self, user_id, message_id, payload):
+        key = self._key(user_id)
+        pipeline = self.redis.pipeline()
+        pipeline.hset(key, message_id, json.dumps(payload))
+        pipeline.expire(key, self.ttl)
+        pipeline.execute()
+
+    def ack(self, user_id, message_ids):
+        if message_ids:
+            self.redis.hdel(self._key(user_id), *message_ids)
+
+    def pending(self, user_id):
+        queue = self.redis.hgetall(self._key(user_id))
+        return [json.loads(queue[field]) for field in sorted(queue, key=int)]
+
+
+def _create(app):
+    url = app.config.get('DELIVERY_QUEUE_URL')
+    ttl = app.config.get('DELIVERY_QUEUE_TTL', 7 * 24 * 3600)
+    if not url:
+        return LocalDeliveryQueue(ttl)
+    if url.startswith('fakeredis://'):
+        import fakeredis
+        return RedisDeliveryQueue(fakeredis.FakeRedis(), ttl)
+    return RedisDeliveryQueue(redis.Redis.from_url(url), ttl)
+
+
+def delivery_queue():
+    """Return the pending-delivery queue of the current app."""
+    queue = current_app.extensions.get('delivery_queue')
+    if queue is None:
+        queue = current_app.extensions['delivery_queue'] = _create(current_app)
+    return queue
+
+
+def deliver(user_id, payload):
+    """Send ``payload`` (a serialized message) to ``user_id`` once committed.
+
+    Call before committing: the message goes through the outbox, whose
+    dispatcher queues it until acked and emits it to the user's room.
+    """
+    from app.outbox import enqueue
+
+    enqueue('new_message', payload, room=str(user_id), user_id=user_id)
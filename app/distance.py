@@ -0,0 +1,68 @@
+"""Batched distance calculations for proximity search.
+
+Distances for a whole candidate set are computed in one vectorised
+haversine pass. Exact mode additionally re-ranks the rows whose spherical
+distance lies close to the search radius with the ellipsoidal geodesic,
+since those are the only ones the cheaper model can misclassify.
+"""
+import numpy as np
+from geopy.distance import geodesic
+
+from app.geo import EARTH_RADIUS_KM
+
+# Haversine on a mean-radius sphere is within ~0.6% of the WGS-84 geodesic
+BOUNDARY_TOLERANCE = 0.006
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """Return great-circle distances in km from one point to arrays of points."""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=float))
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(lngs, dtype=float) - lng)
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distances_within(lat, lng, lats, lngs, radius_km, exact=False):
+    """Return (indexes, distances_km) of the points inside the radius.
+
+    Results are in input order. In exact mode every returned distance for
+    a point near the boundary is the geodesic one, and membership is
+    decided on it.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    distances = haversine_km(lat, lng, lats, lngs)
+
+    if not exact:
+        indexes = np.flatnonzero(distances <= radius_km)
+        return indexes, distances[indexes]
+
+    margin = radius_km * BOUNDARY_TOLERANCE
+    indexes = np.flatnonzero(distances <= radius_km + margin)
+    distances = distances[indexes]
+
+    boundary = np.flatnonzero(distances >= radius_km - margin)
+    for position in boundary:
+        index = indexes[position]
+        distances[position] = geodesic((lat, lng), (lats[index], lngs[index])).km
+
+    keep = distances <= radius_km
+    return indexes[keep], distances[keep]
+
+
+def within_radius(rows, lat, lng, radius_km, location=None, exact=False):
+    """Return [(row, distance_km)] for candidate rows inside the radius."""
+    if location is None:
+        location = lambda row: (row.latitude, row.longitude)
+
+    rows = list(rows)
+    if not rows:
+        return []
+
+    coordinates = np.array([location(row) for row in rows], dtype=float)
+    indexes, distances = distances_within(
+        lat, lng, coordinates[:, 0], coordinates[:, 1], radius_km, exact=exact)
+    return [(rows[index], float(distance)) for index, distance in zip(indexes, distances)]
@@ -0,0 +1,148 @@
+"""Geohash helpers for indexed proximity search.
+
+Every provider stores the geohash of its coordinates. A radius search is
+turned into a small set of geohash prefix ranges covering the bounding box
+of the search circle, so the database only returns nearby candidates and
+exact distances are computed for those rows alone.
+"""
+import math
+
+from sqlalchemy import and_, or_
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+GEOHASH_PRECISION = 9
+MAX_SEARCH_CELLS = 16
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_MILE = 1.609344
+
+
+def encode(lat, lng, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            geohash.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(geohash)
+
+
+def _grid(precision):
+    """Return (lat_cells, lng_cells) of the geohash grid at a precision."""
+    total_bits = 5 * precision
+    return 2 ** (total_bits // 2), 2 ** ((total_bits + 1) // 2)
+
+
+def bounding_box(lat, lng, radius_km):
+    """Return (min_lat, min_lng, max_lat, max_lng) enclosing the circle.
+
+    Longitudes may fall outside [-180, 180] when the circle crosses the
+    antimeridian; callers split the box with ``_lng_ranges``.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    min_lat = lat - dlat
+    max_lat = lat + dlat
+
+    if min_lat <= -90 or max_lat >= 90 or angular >= math.pi / 2:
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+
+    ratio = math.sin(angular) / math.cos(math.radians(lat))
+    if ratio >= 1:
+        return min_lat, -180.0, max_lat, 180.0
+
+    dlng = math.degrees(math.asin(ratio))
+    return min_lat, lng - dlng, max_lat, lng + dlng
+
+
+def _lng_ranges(min_lng, max_lng):
+    if max_lng - min_lng >= 360:
+        return [(-180.0, 180.0)]
+    if min_lng < -180:
+        return [(min_lng + 360, 180.0), (-180.0, max_lng)]
+    if max_lng > 180:
+        return [(min_lng, 180.0), (-180.0, max_lng - 360)]
+    return [(min_lng, max_lng)]
+
+
+def _cell_indexes(low, high, origin, step, cells):
+    first = int((low - origin) // step)
+    last = int((high - origin) // step)
+    return range(max(first, 0), min(last, cells - 1) + 1)
+
+
+def _cells_for_box(min_lat, max_lat, lng_ranges, precision, limit):
+    lat_cells, lng_cells = _grid(precision)
+    lat_step = 180.0 / lat_cells
+    lng_step = 360.0 / lng_cells
+
+    rows = _cell_indexes(min_lat, max_lat, -90.0, lat_step, lat_cells)
+    columns = [
+        column
+        for low, high in lng_ranges
+        for column in _cell_indexes(low, high, -180.0, lng_step, lng_cells)
+    ]
+    if limit is not None and len(rows) * len(columns) > limit:
+        return None
+
+    cells = set()
+    for row in rows:
+        center_lat = -90.0 + (row + 0.5) * lat_step
+        for column in columns:
+            center_lng = -180.0 + (column + 0.5) * lng_step
+            cells.add(encode(center_lat, center_lng, precision))
+    return sorted(cells)
+
+
+def covering_cells(lat, lng, radius_km, max_cells=MAX_SEARCH_CELLS):
+    """Return the geohash prefixes covering a search circle.
+
+    The finest precision whose covering needs at most ``max_cells`` cells
+    is used, so large radii fall back to a few coarse cells rather than
+    thousands of tiny ones.
+    """
+    min_lat, min_lng, max_lat, max_lng = bounding_box(lat, lng, radius_km)
+    lng_ranges = _lng_ranges(min_lng, max_lng)
+
+    for precision in range(GEOHASH_PRECISION, 1, -1):
+        cells = _cells_for_box(min_lat, max_lat, lng_ranges, precision, max_cells)
+        if cells is not None:
+            return cells
+    return _cells_for_box(min_lat, max_lat, lng_ranges, 1, None)
+
+
+def geohash_filter(column, lat, lng, radius_km):
+    """Build an index-friendly filter restricting ``column`` to the circle.
+
+    Each covering cell becomes a ``cell <= geohash < cell + '{'`` range,
+    which every backend can answer from a plain b-tree index.
+    """
+    cells = covering_cells(lat, lng, radius_km)
+    return or_(*[and_(column >= cell, column < cell + '{') for cell in cells])
+
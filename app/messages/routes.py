@@ -1,17 +1,25 @@
-from flask import jsonify, request
+from flask import jsonify, request, session
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_socketio import ConnectionRefusedError, emit, join_room
+from sqlalchemy import select
 from app.messages import bp
-from app.models import Message, message_schema, messages_schema, User
+from app.models import Conversation, Message, message_schema, User, record_message
 from app import db, socketio
+from app.delivery import deliver, delivery_queue
+from app.pagination import paginate, page_response
+from app.presence import presence, publish_presence
+from app.socket_auth import authenticate, socket_user_id
+
+RESUME_BATCH_SIZE = 200
 
 @bp.route('/messages', methods=['GET'])
 @jwt_required()
 def get_messages():
     user_id = get_jwt_identity()
-    messages = Message.query.filter(
+    messages, next_cursor = paginate(Message.query.filter(
         (Message.sender_id == user_id) | (Message.recipient_id == user_id)
-    ).order_by(Message.created_at.desc()).all()
-    return jsonify(messages_schema.dump(messages)), 200
+    ), Message)
+    return page_response(messages, next_cursor, message_schema.dump), 200
 
 @bp.route('/messages/<int:recipient_id>', methods=['POST'])
 @jwt_required()
@@ -29,25 +37,82 @@ def send_message(recipient_id):
     )
     
     db.session.add(message)
+    record_message(message)
+    # Emitted by the outbox dispatcher once this transaction commits
+    deliver(recipient_id, message_schema.dump(message))
     db.session.commit()
     
-    # Emit message to recipient
-    socketio.emit(
-        'new_message',
-        message_schema.dump(message),
-        room=str(recipient_id)
-    )
-    
     return jsonify(message_schema.dump(message)), 201
 
 @socketio.on('connect')
-@jwt_required()
-def handle_connect():
-    user_id = get_jwt_identity()
-    socketio.emit('user_connected', {'user_id': user_id})
+def handle_connect(auth=None):
+    # Authenticated once here; later events use the identity on the session
+    user_id = authenticate(auth)
+    if user_id is None:
+        raise ConnectionRefusedError('unauthorized')
+    session['user_id'] = user_id
+    join_room(str(user_id))
+    if presence().connect(user_id, request.sid):
+        publish_presence(user_id, True)
+    
+    # Everything sent while this user was away, in one event
+    pending = delivery_queue().pending(user_id)
+    if pending:
+        emit('pending_messages', pending)
+
+@socketio.on('heartbeat')
+def handle_heartbeat():
+    presence().heartbeat(socket_user_id(), request.sid)
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    user_id = socket_user_id()
+    if user_id is not None and presence().disconnect(user_id, request.sid):
+        publish_presence(user_id, False)
+
+@socketio.on('ack')
+def handle_ack(data):
+    message_ids = (data or {}).get('message_ids', []) if isinstance(data or {}, dict) else None
+    if not isinstance(message_ids, list) or not all(type(message_id) is int for message_id in message_ids):
+        emit('error', {'error': 'message_ids must be a list of message ids'})
+        return
+    delivery_queue().ack(socket_user_id(), message_ids)
 
 @socketio.on('join')
-def handle_join(data):
-    room = data['room']
-    socketio.join_room(room)
-    socketio.emit('user_joined', {'room': room}, room=room)
+def handle_join(data=None):
+    # The socket already sits in its user's room; a client-supplied room is
+    # ignored so nobody can subscribe to another user's messages
+    room = str(socket_user_id())
+    join_room(room)
+    emit('user_joined', {'room': room})
+
+@socketio.on('resume')
+def handle_resume(data):
+    """Replay messages the client missed after ``last_id``.
+
+    Messages are sent oldest first as ordinary ``new_message`` events. The
+    acknowledgement carries the last id sent and whether more remain, so a
+    client far behind asks again instead of receiving its whole history.
+    """
+    user_id = socket_user_id()
+    try:
+        last_id = int((data or {}).get('last_id') or 0)
+    except (AttributeError, TypeError, ValueError):
+        emit('error', {'error': 'last_id must be a message id'})
+        return None
+    conversations = select(Conversation.id).where(
+        (Conversation.user_a_id == user_id) | (Conversation.user_b_id == user_id)
+    )
+    messages = Message.query.filter(
+        Message.conversation_id.in_(conversations),
+        Message.id > last_id
+    ).order_by(Message.id).limit(RESUME_BATCH_SIZE + 1).all()
+    
+    replayed = messages[:RESUME_BATCH_SIZE]
+    for message in replayed:
+        emit('new_message', message_schema.dump(message))
+    
+    return {
+        'last_id': replayed[-1].id if replayed else last_id,
+        'has_more': len(messages) > RESUME_BATCH_SIZE
+    }
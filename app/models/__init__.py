@@ -1,18 +1,23 @@
-from .user import User, UserSchema
+from .user import User, UserRole, UserSchema
 from .provider import ServiceProvider, ServiceProviderSchema
+from .service import Service, normalize_services, providers_offering
+from .conversation import Conversation, record_message
 from .message import Message, MessageSchema
 from .blog import BlogPost, Comment
 from .review import Review
+from .outbox import OutboxEvent
+from app.schema_compiler import CompiledSchema
 
-# Initialize schemas
-user_schema = UserSchema()
-users_schema = UserSchema(many=True)
-provider_schema = ServiceProviderSchema()
-providers_schema = ServiceProviderSchema(many=True)
-message_schema = MessageSchema()
-messages_schema = MessageSchema(many=True)
+# Initialize schemas, with dump compiled once at import
+user_schema = CompiledSchema(UserSchema())
+users_schema = CompiledSchema(UserSchema(many=True))
+provider_schema = CompiledSchema(ServiceProviderSchema())
+providers_schema = CompiledSchema(ServiceProviderSchema(many=True))
+message_schema = CompiledSchema(MessageSchema())
+messages_schema = CompiledSchema(MessageSchema(many=True))
 
-__all__ = ['User', 'ServiceProvider', 'Message', 'BlogPost', 'Comment', 'Review', 
+__all__ = ['User', 'UserRole', 'ServiceProvider', 'Service', 'normalize_services', 'providers_offering',
+           'Message', 'Conversation', 'record_message', 'BlogPost', 'Comment', 'Review', 'OutboxEvent', 
            'UserSchema', 'ServiceProviderSchema', 'MessageSchema', 
            'user_schema', 'users_schema', 'provider_schema', 'providers_schema', 
            'message_schema', 'messages_schema']
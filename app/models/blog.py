@@ -1,7 +1,14 @@
 from app import db
+from app.models.versioning import Versioned
+from sqlalchemy import update
 from sqlalchemy.sql import func
 
-class BlogPost(db.Model):
+class BlogPost(Versioned, db.Model):
+    __table_args__ = (
+        db.Index('ix_blog_post_created_at_id', 'created_at', 'id'),
+        db.Index('ix_blog_post_status_created_at_id', 'status', 'created_at', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
@@ -9,26 +16,44 @@ class BlogPost(db.Model):
     slug = db.Column(db.String(200), unique=True, nullable=False)
     status = db.Column(db.String(20), default='draft')  # draft, published, archived
     view_count = db.Column(db.Integer, default=0)
+    # Maintained in SQL on every comment write (see record_comment)
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(db.DateTime, onupdate=func.now())
     
     author = db.relationship('User')
     comments = db.relationship('Comment', backref='post', lazy=True, cascade='all, delete-orphan')
 
+    def record_comment(self, delta):
+        """Add ``delta`` to ``comment_count`` with a SQL-side increment."""
+        cls = type(self)
+        db.session.execute(update(cls).where(cls.id == self.id)
+                           .values(comment_count=cls.comment_count + delta, version=cls.version + 1),
+                           execution_options={'synchronize_session': False})
+        db.session.expire(self, ['comment_count', 'version'])
+
     def to_dict(self):
         return {
             'id': self.id,
             'title': self.title,
             'content': self.content,
             'author_id': self.author_id,
+            'author': {
+                'id': self.author.id,
+                'first_name': self.author.first_name,
+                'last_name': self.author.last_name
+            },
             'slug': self.slug,
             'status': self.status,
             'view_count': self.view_count,
+            'comment_count': self.comment_count,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
 class Comment(db.Model):
+    __table_args__ = (db.Index('ix_comment_post_id_created_at_id', 'post_id', 'created_at', 'id'),)
+    
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
     author_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
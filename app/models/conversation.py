@@ -0,0 +1,123 @@
+from app import db
+from datetime import datetime
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+class Conversation(db.Model):
+    """A message thread between an unordered pair of users.
+
+    The pair is stored ordered (user_a_id < user_b_id) so it has exactly
+    one row. The last message and each side's unread count are kept up to
+    date in the same transaction as every message insert, so an inbox is
+    one indexed read no matter how many messages it covers.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('user_a_id', 'user_b_id', name='uq_conversation_users'),
+        db.Index('ix_conversation_user_a_id_last_message_at', 'user_a_id', 'last_message_at', 'id'),
+        db.Index('ix_conversation_user_b_id_last_message_at', 'user_b_id', 'last_message_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_a_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    user_b_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    last_message_id = db.Column(db.Integer)
+    last_message_at = db.Column(db.DateTime)
+    unread_a = db.Column(db.Integer, nullable=False, default=0)
+    unread_b = db.Column(db.Integer, nullable=False, default=0)
+    # Highest message id each side has read; messages up to it count as read
+    last_read_a = db.Column(db.Integer, nullable=False, default=0)
+    last_read_b = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @classmethod
+    def between(cls, user_id, other_user_id):
+        """Return the conversation for a pair of users, creating it if needed."""
+        user_a_id, user_b_id = sorted((user_id, other_user_id))
+        conversation = cls.query.filter_by(user_a_id=user_a_id, user_b_id=user_b_id).first()
+        if conversation is not None:
+            return conversation
+        
+        conversation = cls(user_a_id=user_a_id, user_b_id=user_b_id)
+        try:
+            with db.session.begin_nested():
+                db.session.add(conversation)
+        except IntegrityError:
+            # Another request created it first
+            conversation = cls.query.filter_by(user_a_id=user_a_id, user_b_id=user_b_id).one()
+        return conversation
+    
+    def other_user_id(self, user_id):
+        return self.user_b_id if user_id == self.user_a_id else self.user_a_id
+    
+    def unread_count(self, user_id):
+        return self.unread_a if user_id == self.user_a_id else self.unread_b
+    
+    def last_read(self, user_id):
+        return self.last_read_a if user_id == self.user_a_id else self.last_read_b
+    
+    def is_read(self, message):
+        return message.id <= (self.last_read(message.recipient_id) or 0)
+    
+    def mark_read(self, user_id, up_to=None):
+        """Advance a participant's read cursor with a single UPDATE.
+
+        Everything up to ``up_to`` (default: the latest message) becomes
+        read. The cursor never moves backwards nor past the latest message,
+        and the unread count is recomputed from the messages still past it.
+        """
+        from app.models.message import Message
+        
+        cls = type(self)
+        side_a = user_id == self.user_a_id
+        cursor = cls.last_read_a if side_a else cls.last_read_b
+        unread = cls.unread_a if side_a else cls.unread_b
+        if self.last_message_id is None:
+            return
+        up_to = self.last_message_id if up_to is None else min(up_to, self.last_message_id)
+        
+        new_cursor = case((cursor > up_to, cursor), else_=up_to)
+        remaining = select(func.count(Message.id)).where(
+            Message.conversation_id == cls.id,
+            Message.recipient_id == user_id,
+            Message.id > new_cursor
+        ).scalar_subquery()
+        
+        db.session.execute(
+            update(cls).where(cls.id == self.id).values(**{cursor.key: new_cursor, unread.key: remaining}),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.expire(self, [cursor.key, unread.key])
+    
+    def record_message(self, message):
+        """Point the conversation at a new message and bump the recipient's unread count."""
+        cls = type(self)
+        unread = cls.unread_a if message.recipient_id == self.user_a_id else cls.unread_b
+        message.conversation_id = self.id
+        db.session.flush()
+        
+        db.session.execute(
+            update(cls).where(cls.id == self.id).values(
+                last_message_id=message.id,
+                last_message_at=message.created_at,
+                **{unread.key: unread + 1}
+            ),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.expire(self, ['last_message_id', 'last_message_at', unread.key])
+    
+    def to_dict(self, user_id, last_message=None):
+        return {
+            'id': self.id,
+            'other_user_id': self.other_user_id(user_id),
+            'last_message_id': self.last_message_id,
+            'last_message_at': self.last_message_at.isoformat() if self.last_message_at else None,
+            'last_message': last_message.to_dict() if last_message else None,
+            'unread_count': self.unread_count(user_id),
+            'last_read_message_id': self.last_read(user_id)
+        }
+
+def record_message(message):
+    """Attach a pending message to its conversation; call before commit."""
+    conversation = Conversation.between(message.sender_id, message.recipient_id)
+    conversation.record_message(message)
+    return conversation
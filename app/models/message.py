@@ -1,17 +1,32 @@
 from app import db, ma
 from datetime import datetime
+from marshmallow import fields
 
 class Message(db.Model):
+    __table_args__ = (
+        db.Index('ix_message_conversation_id_id', 'conversation_id', 'id'),
+        db.Index('ix_message_sender_id_recipient_id_id', 'sender_id', 'recipient_id', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversation.id', ondelete='CASCADE'))
     sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     recipient_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    receiver_id = db.synonym('recipient_id')
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    read = db.Column(db.Boolean, default=False)
+    
+    conversation = db.relationship('Conversation', lazy='joined')
+    
+    @property
+    def read(self):
+        # Derived from the recipient's read cursor on the conversation
+        return self.conversation is not None and self.conversation.is_read(self)
     
     def to_dict(self):
         return {
             'id': self.id,
+            'conversation_id': self.conversation_id,
             'sender_id': self.sender_id,
             'recipient_id': self.recipient_id,
             'content': self.content,
@@ -24,3 +39,5 @@ class MessageSchema(ma.SQLAlchemyAutoSchema):
         model = Message
         load_instance = True
         include_fk = True
+    
+    read = fields.Boolean(dump_only=True)
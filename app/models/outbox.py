@@ -0,0 +1,25 @@
+from app import db
+from datetime import datetime
+
+class OutboxEvent(db.Model):
+    """A socket emit recorded in the transaction that caused it.
+
+    Rows are written alongside the data they announce and removed by the
+    dispatcher once emitted, so nothing committed is lost if an emit fails.
+    """
+    __tablename__ = 'outbox_event'
+    __table_args__ = (
+        db.Index('ix_outbox_event_available_at_id', 'available_at', 'id'),
+        db.Index('ix_outbox_event_claim', 'claim'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event = db.Column(db.String(64), nullable=False)
+    room = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    # Set when the payload must also wait in this user's pending-delivery queue
+    user_id = db.Column(db.Integer, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claim = db.Column(db.String(32), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,16 +1,81 @@
 from app import db, ma
+from app.geo import encode
+from app.models.service import Service, normalize_services, provider_service
+from app.models.versioning import Versioned
 from datetime import datetime
+from marshmallow import fields
+from sqlalchemy import case, event, update
 
-class ServiceProvider(db.Model):
+class ServiceProvider(Versioned, db.Model):
+    __table_args__ = (db.Index('ix_service_provider_created_at_id', 'created_at', 'id'),)
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     business_name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text)
-    services = db.Column(db.Text)
     location = db.Column(db.String(120))
+    address = db.Column(db.String(200))
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(12), index=True)
     rating = db.Column(db.Float, default=0.0)
+    # Review aggregates, incremented in SQL on every review write (see record_rating)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    stars_1 = db.Column(db.Integer, nullable=False, default=0)
+    stars_2 = db.Column(db.Integer, nullable=False, default=0)
+    stars_3 = db.Column(db.Integer, nullable=False, default=0)
+    stars_4 = db.Column(db.Integer, nullable=False, default=0)
+    stars_5 = db.Column(db.Integer, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    service_tags = db.relationship(Service, secondary=provider_service, lazy='selectin',
+                                   order_by=Service.name, backref='providers')
+    
+    @property
+    def services(self):
+        return [service.name for service in self.service_tags]
+    
+    @services.setter
+    def services(self, services):
+        self.service_tags = Service.for_names(normalize_services(services))
+    
+    @property
+    def rating_histogram(self):
+        return {str(stars): getattr(self, f'stars_{stars}') or 0 for stars in range(1, 6)}
+    
+    def record_rating(self, added=None, removed=None):
+        """Fold a review being added, changed or removed into the aggregates.
+
+        The change is applied as one SQL-side UPDATE of increments, so
+        concurrent review writes for the same provider never overwrite each
+        other. The average is recomputed from the incremented sum and count
+        in the same statement instead of being adjusted in Python.
+        """
+        cls = type(self)
+        deltas = {}
+        for stars, delta in ((added, 1), (removed, -1)):
+            if stars is None:
+                continue
+            column = f'stars_{stars}'
+            deltas[column] = deltas.get(column, 0) + delta
+            deltas['rating_sum'] = deltas.get('rating_sum', 0) + delta * stars
+            deltas['review_count'] = deltas.get('review_count', 0) + delta
+        if not deltas:
+            return
+        
+        values = {column: getattr(cls, column) + delta for column, delta in deltas.items()}
+        values['version'] = cls.version + 1
+        review_count = values.get('review_count', cls.review_count)
+        values['rating'] = case(
+            (review_count > 0, values.get('rating_sum', cls.rating_sum) * 1.0 / review_count),
+            else_=0.0
+        )
+        
+        db.session.execute(update(cls).where(cls.id == self.id).values(**values),
+                           execution_options={'synchronize_session': False})
+        db.session.expire(self, list(values))
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -19,12 +84,28 @@ class ServiceProvider(db.Model):
             'description': self.description,
             'services': self.services,
             'location': self.location,
+            'address': self.address,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'rating': self.rating,
+            'review_count': self.review_count,
+            'rating_histogram': self.rating_histogram,
             'created_at': self.created_at.isoformat()
         }
 
+@event.listens_for(ServiceProvider, 'before_insert')
+@event.listens_for(ServiceProvider, 'before_update')
+def update_geohash(mapper, connection, provider):
+    # Keep the spatial bucket in step with the coordinates it was derived from
+    if provider.latitude is not None and provider.longitude is not None:
+        provider.geohash = encode(provider.latitude, provider.longitude)
+    else:
+        provider.geohash = None
+
 class ServiceProviderSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = ServiceProvider
         load_instance = True
         include_fk = True
+    
+    services = fields.List(fields.String())
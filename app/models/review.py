@@ -3,6 +3,8 @@ from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 
 class Review(db.Model):
+    __table_args__ = (db.Index('ix_review_provider_id_created_at_id', 'provider_id', 'created_at', 'id'),)
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     provider_id = db.Column(db.Integer, db.ForeignKey('service_provider.id', ondelete='CASCADE'), nullable=False)
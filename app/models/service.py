@@ -0,0 +1,76 @@
+import json
+from app import db
+from sqlalchemy.exc import IntegrityError
+
+provider_service = db.Table(
+    'provider_service',
+    db.Column('provider_id', db.Integer, db.ForeignKey('service_provider.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('service_id', db.Integer, db.ForeignKey('service.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_provider_service_service_id', 'service_id', 'provider_id')
+)
+
+def normalize_services(services):
+    """Turn a JSON list, list or comma-joined string into unique lowercase names.
+
+    Raises ValueError for anything else, including malformed JSON.
+    """
+    if not services:
+        return []
+    if isinstance(services, str):
+        try:
+            services = json.loads(services) if services.lstrip().startswith('[') else services.split(',')
+        except ValueError:
+            services = None
+    if not isinstance(services, (list, tuple)) or not all(isinstance(service, str) for service in services):
+        raise ValueError('services must be a list of names')
+    
+    names = []
+    for service in services:
+        name = service.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+class Service(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+    
+    @classmethod
+    def for_names(cls, names):
+        """Return Service rows for names, creating the missing ones.
+
+        This runs while a provider is being built, so nothing else in the
+        session may be flushed: lookups skip autoflush, and missing names are
+        inserted in a savepoint on the connection rather than the session.
+        """
+        if not names:
+            return []
+        with db.session.no_autoflush:
+            existing = {service.name: service for service in cls.query.filter(cls.name.in_(names))}
+            missing = [name for name in names if name not in existing]
+            if missing:
+                connection = db.session.connection()
+                for name in missing:
+                    try:
+                        with connection.begin_nested():
+                            connection.execute(db.insert(cls).values(name=name))
+                    except IntegrityError:
+                        # Another request created it first
+                        pass
+                existing.update((service.name, service) for service in cls.query.filter(cls.name.in_(missing)))
+        return [existing[name] for name in names]
+
+def providers_offering(names, match='all'):
+    """Select ids of providers offering the named services.
+
+    With match='all' a provider must offer every service, with 'any' one
+    of them is enough. Both are answered from the service_id index.
+    """
+    query = db.select(provider_service.c.provider_id).\
+        join(Service, Service.id == provider_service.c.service_id).\
+        where(Service.name.in_(names))
+    
+    if match == 'all':
+        query = query.group_by(provider_service.c.provider_id).\
+            having(db.func.count(provider_service.c.service_id) == len(names))
+    return query
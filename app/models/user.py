@@ -12,6 +12,8 @@ class UserRole(enum.Enum):
     ADMIN = "admin"
 
 class User(db.Model):
+    __table_args__ = (db.Index('ix_user_created_at_id', 'created_at', 'id'),)
+    
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(100), unique=True, nullable=True)
     phone = db.Column(db.String(20), unique=True, nullable=True)
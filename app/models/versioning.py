@@ -0,0 +1,17 @@
+from app import db
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+class Versioned:
+    """Mixin adding a ``version`` counter bumped by every change to the row.
+
+    ORM updates (collections included) bump it on flush. Code that updates
+    these tables in SQL must add ``version=cls.version + 1`` itself.
+    """
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+@event.listens_for(Versioned, 'before_update', propagate=True)
+def bump_version(mapper, connection, target):
+    # before_update also fires for rows touched without a net change
+    if object_session(target).is_modified(target):
+        target.version = type(target).version + 1
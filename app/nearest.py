@@ -0,0 +1,172 @@
+"""In-memory KD-tree over provider coordinates for k-nearest queries.
+
+Coordinates are projected onto the unit sphere so that straight-line
+(chord) distance orders points exactly like great-circle distance, which
+lets a plain 3-d KD-tree answer "the k closest providers" in O(log n).
+
+The tree lives in process memory. Inserts go straight into the tree,
+removals leave a tombstone, and the tree is rebuilt balanced once the
+number of changes since the last build outgrows half the live set.
+"""
+import heapq
+import math
+import threading
+import time
+
+from app.geo import EARTH_RADIUS_KM
+
+MIN_REBUILD_CHANGES = 64
+
+
+def _to_point(lat, lng):
+    lat = math.radians(lat)
+    lng = math.radians(lng)
+    return (math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat))
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+def _squared(a, b):
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+class _Node:
+    __slots__ = ('point', 'key', 'tags', 'axis', 'left', 'right', 'deleted')
+
+    def __init__(self, point, key, tags, axis):
+        self.point = point
+        self.key = key
+        self.tags = tags
+        self.axis = axis
+        self.left = None
+        self.right = None
+        self.deleted = False
+
+
+class ProviderIndex:
+    """k-nearest index of ``key -> (lat, lng, tags)`` entries."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._root = None
+        self._nodes = {}
+        self._changes = 0
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def build(self, entries):
+        """Replace the index contents with ``(key, lat, lng, tags)`` tuples."""
+        nodes = [
+            _Node(_to_point(lat, lng), key, frozenset(tags or ()), 0)
+            for key, lat, lng, tags in entries
+            if lat is not None and lng is not None
+        ]
+        with self._lock:
+            self._install(nodes)
+            self.built_at = time.monotonic()
+
+    def _install(self, nodes):
+        self._nodes = {node.key: node for node in nodes}
+        self._root = self._build(list(self._nodes.values()), 0)
+        self._changes = 0
+
+    def _build(self, nodes, depth):
+        if not nodes:
+            return None
+        axis = depth % 3
+        nodes.sort(key=lambda node: node.point[axis])
+        middle = len(nodes) // 2
+        node = nodes[middle]
+        node.axis = axis
+        node.left = self._build(nodes[:middle], depth + 1)
+        node.right = self._build(nodes[middle + 1:], depth + 1)
+        return node
+
+    def upsert(self, key, lat, lng, tags=()):
+        with self._lock:
+            self._discard(key)
+            if lat is None or lng is None:
+                self._maybe_rebuild()
+                return
+
+            node = _Node(_to_point(lat, lng), key, frozenset(tags or ()), 0)
+            self._nodes[key] = node
+            self._changes += 1
+            if self._root is None:
+                self._root = node
+            else:
+                self._insert(node)
+            self._maybe_rebuild()
+
+    def remove(self, key):
+        with self._lock:
+            self._discard(key)
+            self._maybe_rebuild()
+
+    def _discard(self, key):
+        node = self._nodes.pop(key, None)
+        if node is not None:
+            node.deleted = True
+            self._changes += 1
+
+    def _insert(self, node):
+        parent = self._root
+        while True:
+            axis = parent.axis
+            branch = 'left' if node.point[axis] < parent.point[axis] else 'right'
+            child = getattr(parent, branch)
+            if child is None:
+                node.axis = (axis + 1) % 3
+                setattr(parent, branch, node)
+                return
+            parent = child
+
+    def _maybe_rebuild(self):
+        if self._changes > max(len(self._nodes) // 2, MIN_REBUILD_CHANGES):
+            for node in self._nodes.values():
+                node.left = node.right = None
+            self._install(list(self._nodes.values()))
+
+    def nearest(self, lat, lng, k, tags=None):
+        """Return up to ``k`` ``(key, distance_km)`` pairs, closest first.
+
+        When ``tags`` is given only entries carrying all of them count.
+        """
+        if k <= 0:
+            return []
+        target = _to_point(lat, lng)
+        required = frozenset(tags or ())
+        heap = []
+
+        with self._lock:
+            self._search(target, k, required, heap)
+
+        found = sorted((-negative, key) for negative, key in heap)
+        return [(key, _chord_to_km(math.sqrt(squared))) for squared, key in found]
+
+    def _search(self, target, k, required, heap):
+        # Depth-first with an explicit stack; each entry carries the squared
+        # distance from the target to the splitting plane that bounds it
+        stack = [(self._root, 0.0)] if self._root is not None else []
+        while stack:
+            node, bound = stack.pop()
+            if len(heap) == k and bound >= -heap[0][0]:
+                continue
+
+            if not node.deleted and required <= node.tags:
+                squared = _squared(node.point, target)
+                if len(heap) < k:
+                    heapq.heappush(heap, (-squared, node.key))
+                elif squared < -heap[0][0]:
+                    heapq.heapreplace(heap, (-squared, node.key))
+
+            delta = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if delta < 0 else (node.right, node.left)
+            if far is not None:
+                stack.append((far, max(bound, delta * delta)))
+            if near is not None:
+                stack.append((near, bound))
@@ -0,0 +1,142 @@
+"""Transactional outbox for socket emits.
+
+Request handlers call ``enqueue`` before committing, so an event exists
+exactly when the data it announces does, and the request returns as soon
+as the commit succeeds. A dispatcher running in the background of every
+worker drains the outbox:
+
+- a batch is claimed with one UPDATE that leases the rows, so several
+  workers can dispatch at once without sending the same row twice;
+- events for the same room are coalesced into a single ``batch`` emit
+  (a list of ``{'event', 'data'}``), single events keep their own name;
+- rows are deleted only after their emit succeeded; a failed emit is
+  retried with capped exponential backoff, and rows leased by a worker
+  that died become available again when the lease runs out.
+
+Delivery is therefore at least once: clients dedupe by message id.
+"""
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.orm import Session
+
+from app import db, socketio
+from app.delivery import delivery_queue
+from app.models import OutboxEvent
+
+MAX_BACKOFF = 300  # seconds
+
+
+def enqueue(event_name, payload, room, user_id=None):
+    """Add an emit to the current transaction's outbox."""
+    db.session.add(OutboxEvent(event=event_name, payload=payload, room=room, user_id=user_id))
+    db.session.info['outbox_written'] = True
+
+
+def _claim(batch_size, lease):
+    now = datetime.utcnow()
+    claim = uuid.uuid4().hex
+    candidates = select(OutboxEvent.id).where(OutboxEvent.available_at <= now) \
+        .order_by(OutboxEvent.id).limit(batch_size)
+    # Re-checking available_at makes a concurrent claim of the same rows a no-op
+    db.session.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id.in_(candidates), OutboxEvent.available_at <= now)
+        .values(claim=claim, available_at=now + timedelta(seconds=lease)),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    return OutboxEvent.query.filter_by(claim=claim).order_by(OutboxEvent.id).all()
+
+
+def _emit(room, rows):
+    for row in rows:
+        if row.user_id is not None:
+            delivery_queue().push(row.user_id, row.payload['id'], row.payload)
+    if len(rows) == 1:
+        socketio.emit(rows[0].event, rows[0].payload, room=room)
+    else:
+        socketio.emit('batch', [{'event': row.event, 'data': row.payload} for row in rows], room=room)
+
+
+def dispatch_outbox(batch_size=None):
+    """Emit one batch of outbox events; return how many rows were claimed."""
+    batch_size = batch_size or current_app.config.get('OUTBOX_BATCH_SIZE', 200)
+    rows = _claim(batch_size, current_app.config.get('OUTBOX_LEASE', 30))
+
+    rooms = {}
+    for row in rows:
+        rooms.setdefault(row.room, []).append(row)
+
+    sent = []
+    for room, room_rows in rooms.items():
+        try:
+            _emit(room, room_rows)
+        except Exception:
+            current_app.logger.exception('Outbox emit to room %s failed', room)
+            for row in room_rows:
+                row.attempts += 1
+                row.claim = None
+                row.available_at = datetime.utcnow() + timedelta(seconds=min(2 ** row.attempts, MAX_BACKOFF))
+        else:
+            sent.extend(row.id for row in room_rows)
+
+    if sent:
+        db.session.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(sent)),
+                           execution_options={'synchronize_session': False})
+    db.session.commit()
+    return len(rows)
+
+
+class Dispatcher:
+    """Background loop draining the outbox of one app."""
+
+    def __init__(self, app):
+        self.app = app
+        self._wake = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def run(self):
+        interval = self.app.config['OUTBOX_DISPATCH_INTERVAL']
+        batch_size = self.app.config.get('OUTBOX_BATCH_SIZE', 200)
+        while True:
+            self._wake.clear()
+            with self.app.app_context():
+                try:
+                    claimed = dispatch_outbox(batch_size)
+                except Exception:
+                    self.app.logger.exception('Outbox dispatch failed')
+                    db.session.rollback()
+                    claimed = 0
+            # A full batch means more is waiting; otherwise sleep until woken
+            if claimed < batch_size:
+                self._wake.wait(interval)
+
+
+def start_dispatcher(app):
+    """Start the app's dispatcher once, if ``OUTBOX_DISPATCH_INTERVAL`` is set."""
+    if not app.config.get('OUTBOX_DISPATCH_INTERVAL') or 'outbox_dispatcher' in app.extensions:
+        return
+    dispatcher = Dispatcher(app)
+    if app.extensions.setdefault('outbox_dispatcher', dispatcher) is dispatcher:
+        socketio.start_background_task(dispatcher.run)
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_dispatcher(session):
+    # Commits that wrote to the outbox wake the dispatcher instead of waiting
+    # out its polling interval
+    if session.info.pop('outbox_written', False) and has_app_context():
+        dispatcher = current_app.extensions.get('outbox_dispatcher')
+        if dispatcher is not None:
+            dispatcher.wake()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_outbox_writes(session):
+    session.info.pop('outbox_written', None)
@@ -0,0 +1,101 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered on ``(created_at, id)`` and the cursor is an opaque
+token holding the sort key of the last row served. The next page is read
+with a ``WHERE (created_at, id) < (:created_at, :id)`` seek on the
+matching index, so page N costs the same as page 1, unlike OFFSET. Rows
+whose sort key is NULL, such as conversations without messages, sort as
+the smallest values and are paged through by id.
+
+Append-only feeds such as message threads can also be read by id window:
+``since_id`` returns what arrived after the last id a client holds, and
+``before_id`` pages back into older history.
+"""
+import base64
+import json
+from datetime import datetime
+
+from flask import abort, jsonify, make_response, request
+from sqlalchemy import and_, or_, tuple_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def encode_cursor(created_at, id):
+    payload = json.dumps([created_at and created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return created_at and datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        abort(make_response(jsonify({'error': 'Invalid cursor'}), 400))
+
+
+def paginate(query, model, descending=True, entity=None, column=None):
+    """Return one page of ``query`` as ``(items, next_cursor)``.
+
+    ``cursor`` and ``limit`` are read from the request arguments.
+    ``entity`` extracts the model instance from a row when the query
+    selects more than one entity. ``column`` replaces ``created_at`` as
+    the leading sort key.
+    """
+    limit = max(1, min(request.args.get('limit', DEFAULT_LIMIT, type=int), MAX_LIMIT))
+    cursor = request.args.get('cursor')
+    column = column if column is not None else model.created_at
+    key = tuple_(column, model.id)
+
+    if cursor:
+        value, id = decode_cursor(cursor)
+        if value is None:
+            after = model.id < id if descending else model.id > id
+            seek = and_(column.is_(None), after)
+            if not descending:
+                seek = or_(seek, column.isnot(None))
+        else:
+            position = tuple_(value, id)
+            seek = key < position if descending else key > position
+            if descending:
+                seek = or_(seek, column.is_(None))
+        query = query.filter(seek)
+
+    if descending:
+        query = query.order_by(column.desc().nulls_last(), model.id.desc())
+    else:
+        query = query.order_by(column.asc().nulls_first(), model.id.asc())
+
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    if len(rows) <= limit:
+        return items, None
+
+    last = entity(items[-1]) if entity else items[-1]
+    return items, encode_cursor(getattr(last, column.key), last.id)
+
+
+def id_window(query, model, since_id=None, before_id=None):
+    """Return ``(items, has_more)`` for rows with ids between the bounds.
+
+    With ``since_id`` rows come oldest first, so a client catching up can
+    append them and ask again from the last id; otherwise newest first.
+    """
+    limit = max(1, min(request.args.get('limit', DEFAULT_LIMIT, type=int), MAX_LIMIT))
+    if since_id is not None:
+        query = query.filter(model.id > since_id)
+    if before_id is not None:
+        query = query.filter(model.id < before_id)
+    
+    order = model.id.asc() if since_id is not None else model.id.desc()
+    rows = query.order_by(order).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def page_response(items, next_cursor, serialize):
+    return jsonify({
+        'items': [serialize(item) for item in items],
+        'next_cursor': next_cursor
+    })
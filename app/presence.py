@@ -0,0 +1,227 @@
+"""Online presence shared by every worker.
+
+Each socket connection is registered under its user and kept alive by
+client heartbeats. A user is online while any of their connections has
+heartbeated within ``PRESENCE_TTL`` seconds, so sockets held by a worker
+that died age out on their own; ``expire_presence`` sweeps them up every
+``PRESENCE_SWEEP_INTERVAL`` seconds and tells partners those users left.
+
+``PRESENCE_URL`` picks the backend the same way ``DELIVERY_QUEUE_URL``
+does: Redis, ``fakeredis://`` for tests, or local memory when unset. Online
+lookups for any number of users take one Redis command, and changes are
+sent only to the conversation partners who are online to see them.
+"""
+import threading
+import time
+
+import redis
+from flask import current_app
+from sqlalchemy import case, select
+
+from app import db, socketio
+from app.models import Conversation
+
+MAX_LOOKUP = 200
+
+
+class LocalPresence:
+    """Process-local presence table."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sockets = {}
+
+    def _live(self, user_id, now):
+        sockets = self._sockets.get(user_id, {})
+        for sid in [sid for sid, expires in sockets.items() if expires <= now]:
+            del sockets[sid]
+        return sockets
+
+    def connect(self, user_id, sid):
+        """Register a connection; return True if the user just came online."""
+        now = time.time()
+        with self._lock:
+            sockets = self._live(user_id, now)
+            came_online = not sockets
+            sockets[sid] = now + self.ttl
+            self._sockets[user_id] = sockets
+        return came_online
+
+    def heartbeat(self, user_id, sid):
+        with self._lock:
+            self._sockets.setdefault(user_id, {})[sid] = time.time() + self.ttl
+
+    def disconnect(self, user_id, sid):
+        """Drop a connection; return True if the user just went offline.
+
+        A connection that had already expired is left for ``expire`` to
+        report, so each departure is reported once.
+        """
+        now = time.time()
+        with self._lock:
+            expires = self._sockets.get(user_id, {}).pop(sid, None)
+            if expires is None or expires <= now or self._live(user_id, now):
+                return False
+            self._sockets.pop(user_id, None)
+            return True
+
+    def expire(self):
+        """Forget users whose connections all expired; return their ids."""
+        now = time.time()
+        with self._lock:
+            expired = [user_id for user_id in self._sockets if not self._live(user_id, now)]
+            for user_id in expired:
+                del self._sockets[user_id]
+        return expired
+
+    def online(self, user_ids):
+        now = time.time()
+        with self._lock:
+            return {user_id for user_id in user_ids if self._live(user_id, now)}
+
+
+class RedisPresence:
+    """Presence kept in Redis sorted sets scored by expiry time.
+
+    ``presence:users`` holds each user's latest heartbeat expiry, so an
+    online lookup is a single ZMSCORE. ``presence:sockets:<id>`` holds the
+    user's connections so the last disconnect can be told apart.
+    """
+
+    USERS_KEY = 'presence:users'
+
+    def __init__(self, client, ttl):
+        self.redis = client
+        self.ttl = ttl
+
+    def _sockets_key(self, user_id):
+        return f'presence:sockets:{user_id}'
+
+    def connect(self, user_id, sid):
+        now = time.time()
+        key = self._sockets_key(user_id)
+        pipeline = self.redis.pipeline()
+        pipeline.zremrangebyscore(key, '-inf', now)
+        pipeline.zcard(key)
+        pipeline.zadd(key, {sid: now + self.ttl})
+        pipeline.pexpire(key, int(self.ttl * 1000))
+        pipeline.zadd(self.USERS_KEY, {user_id: now + self.ttl})
+        live = pipeline.execute()[1]
+        return live == 0
+
+    def heartbeat(self, user_id, sid):
+        expires = time.time() + self.ttl
+        key = self._sockets_key(user_id)
+        pipeline = self.redis.pipeline()
+        pipeline.zadd(key, {sid: expires})
+        pipeline.pexpire(key, int(self.ttl * 1000))
+        pipeline.zadd(self.USERS_KEY, {user_id: expires})
+        pipeline.execute()
+
+    def disconnect(self, user_id, sid):
+        # Connects and heartbeats write the sockets key and the users key in
+        # one transaction, so watching the sockets key is enough to keep a
+        # concurrent connect from being wiped out
+        key = self._sockets_key(user_id)
+        with self.redis.pipeline() as pipeline:
+            while True:
+                try:
+                    pipeline.watch(key)
+                    now = time.time()
+                    expires = pipeline.zscore(key, sid)
+                    others = pipeline.zcount(key, f'({now}', '+inf') - (1 if expires and expires > now else 0)
+                    went_offline = expires is not None and expires > now and not others
+                    pipeline.multi()
+                    pipeline.zrem(key, sid)
+                    pipeline.zremrangebyscore(key, '-inf', now)
+                    if went_offline:
+                        pipeline.zrem(self.USERS_KEY, user_id)
+                    pipeline.execute()
+                    return went_offline
+                except redis.WatchError:
+                    continue
+
+    def expire(self):
+        now = time.time()
+        pipeline = self.redis.pipeline()
+        pipeline.zrangebyscore(self.USERS_KEY, '-inf', now)
+        pipeline.zremrangebyscore(self.USERS_KEY, '-inf', now)
+        expired, _ = pipeline.execute()
+        return [int(user_id) for user_id in expired]
+
+    def online(self, user_ids):
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        now = time.time()
+        scores = self.redis.zmscore(self.USERS_KEY, user_ids)
+        return {user_id for user_id, expires in zip(user_ids, scores) if expires and expires > now}
+
+
+def _create(app):
+    url = app.config.get('PRESENCE_URL')
+    ttl = app.config.get('PRESENCE_TTL', 60)
+    if not url:
+        return LocalPresence(ttl)
+    if url.startswith('fakeredis://'):
+        import fakeredis
+        return RedisPresence(fakeredis.FakeRedis(), ttl)
+    return RedisPresence(redis.Redis.from_url(url), ttl)
+
+
+def presence():
+    """Return the presence table of the current app."""
+    table = current_app.extensions.get('presence')
+    if table is None:
+        table = current_app.extensions['presence'] = _create(current_app)
+    return table
+
+
+def conversation_partners(user_id):
+    """Return the ids of everyone ``user_id`` has a conversation with."""
+    other = case((Conversation.user_a_id == user_id, Conversation.user_b_id), else_=Conversation.user_a_id)
+    query = select(other).where((Conversation.user_a_id == user_id) | (Conversation.user_b_id == user_id))
+    return db.session.execute(query).scalars().all()
+
+
+def publish_presence(user_id, online):
+    """Tell ``user_id``'s online conversation partners about a status change."""
+    watchers = presence().online(conversation_partners(user_id))
+    if watchers:
+        socketio.emit('presence', {'user_id': user_id, 'online': online},
+                      to=[str(watcher) for watcher in sorted(watchers)])
+
+
+def expire_presence():
+    """Publish offline for users who left without disconnecting; return them."""
+    expired = presence().expire()
+    for user_id in expired:
+        publish_presence(user_id, False)
+    return expired
+
+
+class Sweeper:
+    """Background loop expiring silent connections of one app."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def run(self):
+        interval = self.app.config['PRESENCE_SWEEP_INTERVAL']
+        while True:
+            socketio.sleep(interval)
+            with self.app.app_context():
+                try:
+                    expire_presence()
+                except Exception:
+                    self.app.logger.exception('Presence sweep failed')
+
+
+def start_sweeper(app):
+    """Start the app's sweeper once, if ``PRESENCE_SWEEP_INTERVAL`` is set."""
+    if not app.config.get('PRESENCE_SWEEP_INTERVAL') or 'presence_sweeper' in app.extensions:
+        return
+    sweeper = Sweeper(app)
+    if app.extensions.setdefault('presence_sweeper', sweeper) is sweeper:
+        socketio.start_background_task(sweeper.run)
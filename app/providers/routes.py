@@ -1,13 +1,14 @@
 from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.providers import bp
-from app.models import ServiceProvider, provider_schema, providers_schema, User
+from app.models import ServiceProvider, provider_schema, User
 from app import db
+from app.pagination import paginate, page_response
 
 @bp.route('/providers', methods=['GET'])
 def get_providers():
-    providers = ServiceProvider.query.all()
-    return jsonify(providers_schema.dump(providers)), 200
+    providers, next_cursor = paginate(ServiceProvider.query, ServiceProvider)
+    return page_response(providers, next_cursor, provider_schema.dump), 200
 
 @bp.route('/providers', methods=['POST'])
 @jwt_required()
@@ -0,0 +1,70 @@
+"""Message queue selection for Socket.IO.
+
+Each worker process only holds the sockets connected to it, so an emit
+made while serving an HTTP request must go through a queue that every
+worker listens on to reach a socket on another worker. The queue is
+picked from ``SOCKETIO_MESSAGE_QUEUE``:
+
+- unset: emits stay in this process (one worker, most tests);
+- ``redis://`` / ``rediss://``: Redis pub/sub, the production setting;
+- ``fakeredis://<name>``: an in-process fakeredis server shared by every
+  app in the process that uses the same name, for tests;
+- anything else is handed to kombu (``amqp://``, ``filesystem://``...).
+
+``SOCKETIO_MESSAGE_QUEUE_OPTIONS`` is passed to the Redis client or the
+kombu connection.
+
+Background work goes through ``start_app_task`` so it runs with its own
+app context, and so its own database session, in any async mode.
+"""
+import socketio
+from flask import current_app
+
+_fake_servers = {}
+
+
+class FakeRedisManager(socketio.RedisManager):
+    """Redis pub/sub manager backed by an in-process fakeredis server."""
+
+    name = 'fakeredis'
+
+    def _redis_connect(self):
+        import fakeredis
+
+        server = _fake_servers.setdefault(self.redis_url, fakeredis.FakeServer())
+        self.redis = fakeredis.FakeRedis(server=server, **self.redis_options)
+        self.pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        self.connected = True
+
+
+def message_queue(app):
+    """Return the Socket.IO client manager configured for ``app``, if any."""
+    url = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    if not url:
+        return None
+
+    channel = app.config.get('SOCKETIO_CHANNEL', 'flask-socketio')
+    options = app.config.get('SOCKETIO_MESSAGE_QUEUE_OPTIONS') or {}
+    if url.startswith('fakeredis://'):
+        return FakeRedisManager(url, channel=channel, redis_options=options)
+    if url.startswith(('redis://', 'rediss://')):
+        return socketio.RedisManager(url, channel=channel, redis_options=options)
+    return socketio.KombuManager(url, channel=channel, connection_options=options)
+
+
+def start_app_task(target, *args, **kwargs):
+    """Run ``target`` as a Socket.IO background task inside an app context.
+
+    Under gevent the task is a greenlet. ``db.session`` is scoped
+    to the active app context, so the task gets a session of its own that is
+    removed when it finishes instead of sharing the caller's.
+    """
+    from app import socketio as server
+
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            target(*args, **kwargs)
+
+    return server.start_background_task(run)
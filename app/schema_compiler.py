@@ -0,0 +1,159 @@
+"""Compiled dump functions for Marshmallow schemas.
+
+``Schema.dump`` walks its fields one by one: every value goes through
+``Field.serialize``, the schema's accessor and ``utils.get_value`` before
+the field's own ``_serialize`` runs, and nested schemas repeat all of it.
+``compile_schema`` generates, once per schema, a Python function that
+reads each attribute directly and converts it inline:
+
+- strings, numbers and ISO datetimes become a single expression;
+- inferred fields (``Meta.fields`` without a declared type) pass plain
+  values through and only dispatch for anything else;
+- nested schemas call their own compiled function, so recursive schemas
+  such as ``CommentSchema`` work;
+- any other field, or one with a ``dump_default``, calls its own
+  ``serialize`` exactly as Marshmallow would.
+
+Schemas with ``pre_dump``/``post_dump`` hooks, a custom ``get_attribute``
+or mapping inputs (dicts) are dumped by Marshmallow itself, so the output
+is always the same as ``schema.dump``. ``CompiledSchema`` wraps a schema
+instance and can replace it anywhere ``dump`` is called.
+"""
+from marshmallow import Schema, fields, missing
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+_ISO_FORMATS = (None, 'iso', 'iso8601')
+
+
+def _has_dump_hooks(schema):
+    return any(schema._hooks.get((tag, many)) for tag in ('pre_dump', 'post_dump') for many in (False, True))
+
+
+def _compilable(schema):
+    return not _has_dump_hooks(schema) and type(schema).get_attribute is Schema.get_attribute
+
+
+class _Compiler:
+    def __init__(self):
+        # Structural key -> dump function; shared so recursion terminates
+        self.functions = {}
+        self.namespace = {'missing': missing, '_PLAIN_TYPES': _PLAIN_TYPES, '_functions': self.functions}
+        self._names = 0
+
+    def _name(self, prefix):
+        self._names += 1
+        return f'{prefix}{self._names}'
+
+    def _key(self, schema):
+        return type(schema), tuple(schema.dump_fields)
+
+    def compile(self, schema):
+        key = self._key(schema)
+        if key in self.functions:
+            return key
+        if not _compilable(schema):
+            self.functions[key] = lambda obj, schema=schema: schema.dump(obj, many=False)
+            return key
+
+        # Registered before the fields are compiled, for recursive schemas
+        self.functions[key] = None
+        name = self._name('_dump_')
+        schema_name = self._name('_schema_')
+        self.namespace[schema_name] = schema
+        lines = [
+            f'def {name}(obj):',
+            "    if hasattr(obj, '__getitem__'):",
+            f'        return {schema_name}.dump(obj, many=False)',
+            '    result = {}',
+        ]
+        for attr_name, field in schema.dump_fields.items():
+            lines.extend('    ' + line for line in self._field(schema_name, attr_name, field))
+        lines.append('    return result')
+        exec('\n'.join(lines), self.namespace)
+        self.functions[key] = self.namespace[name]
+        return key
+
+    def _field(self, schema_name, attr_name, field):
+        data_key = field.data_key if field.data_key is not None else attr_name
+        field_name = self._name('_field_')
+        self.namespace[field_name] = field
+
+        if not field._CHECK_ATTRIBUTE or field.dump_default is not missing:
+            return [
+                f'value = {field_name}.serialize({attr_name!r}, obj, accessor={schema_name}.get_attribute)',
+                'if value is not missing:',
+                f'    result[{data_key!r}] = value',
+            ]
+
+        source = field.attribute or attr_name
+        if '.' in source:
+            get = f'{schema_name}.get_attribute(obj, {source!r}, missing)'
+        else:
+            get = f'getattr(obj, {source!r}, missing)'
+        return [
+            f'value = {get}',
+            'if value is not missing:',
+            f'    result[{data_key!r}] = {self._expression(field_name, attr_name, field, "value")}',
+        ]
+
+    def _expression(self, field_name, attr_name, field, value):
+        """Return an expression serializing ``value`` as ``field`` would."""
+        kind = type(field)
+        if kind in (fields.String, fields.Email):
+            return f'(None if {value} is None else str({value}))'
+        if kind is fields.Integer and not field.as_string:
+            return f'(None if {value} is None else int({value}))'
+        if kind is fields.Float and not field.as_string:
+            return f'(None if {value} is None else float({value}))'
+        if kind is fields.DateTime and field.format in _ISO_FORMATS:
+            return f'(None if {value} is None else {value}.isoformat())'
+        if kind is fields.Inferred:
+            return (f'({value} if type({value}) in _PLAIN_TYPES '
+                    f'else {field_name}._serialize({value}, {attr_name!r}, obj))')
+        if kind is fields.List:
+            inner_name = self._name('_field_')
+            self.namespace[inner_name] = field.inner
+            item = self._expression(inner_name, attr_name, field.inner, '_item')
+            return f'(None if {value} is None else [{item} for _item in {value}])'
+        if kind is fields.Nested:
+            nested = field.schema
+            function = f'_functions[{self._constant(self.compile(nested))}]'
+            if nested.many or field.many:
+                return f'(None if {value} is None else [{function}(_item) for _item in {value}])'
+            return f'(None if {value} is None else {function}({value}))'
+        return f'{field_name}._serialize({value}, {attr_name!r}, obj)'
+
+    def _constant(self, value):
+        name = self._name('_key_')
+        self.namespace[name] = value
+        return name
+
+
+_compiler = _Compiler()
+
+
+def compile_schema(schema):
+    """Return a function dumping one object exactly as ``schema.dump`` does."""
+    return _compiler.functions[_compiler.compile(schema)]
+
+
+class CompiledSchema:
+    """A schema instance whose ``dump`` runs the compiled function.
+
+    Everything else (``load``, ``validate``, attributes) is delegated to
+    the wrapped Marshmallow schema.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._dump_one = compile_schema(schema)
+
+    def dump(self, obj, *, many=None):
+        many = self.schema.many if many is None else many
+        if many:
+            dump_one = self._dump_one
+            return [dump_one(item) for item in obj]
+        return self._dump_one(obj)
+
+    def __getattr__(self, name):
+        return getattr(self.schema, name)
@@ -1,6 +1,6 @@
 from marshmallow import fields, validates, ValidationError
 from flask_marshmallow import Marshmallow
-from flask_marshmallow.sqla import auto_field
+from app.schema_compiler import CompiledSchema
 
 ma = Marshmallow()
 
@@ -8,7 +8,7 @@ class UserSchema(ma.Schema):
     class Meta:
         fields = ('id', 'email', 'phone', 'first_name', 'last_name', 'role', 'created_at')
     
-    id = auto_field()
+    id = fields.Integer(dump_only=True)
     email = fields.Email()
     phone = fields.String()
     first_name = fields.String(required=True)
@@ -22,7 +22,7 @@ class ServiceProviderSchema(ma.Schema):
                  'latitude', 'longitude', 'services', 'rating', 'review_count', 
                  'created_at', 'user')
     
-    id = auto_field()
+    id = fields.Integer(dump_only=True)
     user = fields.Nested(UserSchema)
     services = fields.List(fields.String())
     rating = fields.Float()
@@ -75,16 +75,16 @@ class ReviewSchema(ma.Schema):
         if not 1 <= value <= 5:
             raise ValidationError('Rating must be between 1 and 5')
 
-# Initialize schema instances
-user_schema = UserSchema()
-users_schema = UserSchema(many=True)
-provider_schema = ServiceProviderSchema()
-providers_schema = ServiceProviderSchema(many=True)
-message_schema = MessageSchema()
-messages_schema = MessageSchema(many=True)
-blog_post_schema = BlogPostSchema()
-blog_posts_schema = BlogPostSchema(many=True)
-comment_schema = CommentSchema()
-comments_schema = CommentSchema(many=True)
-review_schema = ReviewSchema()
-reviews_schema = ReviewSchema(many=True)
+# Initialize schema instances, with dump compiled once at import
+user_schema = CompiledSchema(UserSchema())
+users_schema = CompiledSchema(UserSchema(many=True))
+provider_schema = CompiledSchema(ServiceProviderSchema())
+providers_schema = CompiledSchema(ServiceProviderSchema(many=True))
+message_schema = CompiledSchema(MessageSchema())
+messages_schema = CompiledSchema(MessageSchema(many=True))
+blog_post_schema = CompiledSchema(BlogPostSchema())
+blog_posts_schema = CompiledSchema(BlogPostSchema(many=True))
+comment_schema = CompiledSchema(CommentSchema())
+comments_schema = CompiledSchema(CommentSchema(many=True))
+review_schema = CompiledSchema(ReviewSchema())
+reviews_schema = CompiledSchema(ReviewSchema(many=True))
@@ -0,0 +1,93 @@
+"""Fast JSON for responses.
+
+``OrjsonProvider`` replaces Flask's stdlib JSON provider when orjson is
+installed. It encodes datetimes, dates, enums, UUIDs and dataclasses
+natively, in the same ISO 8601 form ``to_dict`` produces with
+``isoformat()``, and builds response bodies straight from bytes. Without
+orjson (or with ``JSON_PROVIDER = 'default'``) ``StdlibJSONProvider``
+produces the same output, only slower.
+
+SQLAlchemy ``Row`` objects serialize as objects keyed by column label, so
+endpoints can select just the columns they return and hand the rows to
+``jsonify`` without hydrating ORM instances or calling ``to_dict``.
+"""
+import dataclasses
+import datetime
+import decimal
+import enum
+import uuid
+
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+from sqlalchemy.engine import Row
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib provider stays in use
+    orjson = None
+
+
+def row_dict(row):
+    """Return a ``Row`` as a dict keyed by column label."""
+    return row._asdict()
+
+
+def _default(obj):
+    # orjson handles dates, enums, UUIDs and dataclasses itself; the stdlib
+    # provider needs them here
+    if isinstance(obj, Row):
+        return obj._asdict()
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's stdlib provider with the same encodings as ``OrjsonProvider``."""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson."""
+
+    mimetype = 'application/json'
+    sort_keys = True
+
+    def _option(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self._option(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self._option(indent=self._app.debug) | orjson.OPT_APPEND_NEWLINE
+        return self._app.response_class(orjson.dumps(obj, default=_default, option=option),
+                                        mimetype=self.mimetype)
+
+
+def json_provider(app):
+    """Return the JSON provider ``JSON_PROVIDER`` selects for ``app``."""
+    if app.config.get('JSON_PROVIDER', 'orjson') == 'orjson' and orjson is not None:
+        return OrjsonProvider(app)
+    return StdlibJSONProvider(app)
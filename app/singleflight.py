@@ -0,0 +1,176 @@
+"""Single-flight coalescing of identical concurrent requests.
+
+``@coalesced(key)`` makes concurrent requests with the same key share one
+run of the view: the first becomes the leader and the others wait for its
+response instead of repeating the work. Nothing is kept once the leader
+finishes, so this is not a cache; it only collapses bursts.
+
+``search_key`` builds the key from the request arguments with the
+coordinates snapped to a ``SINGLE_FLIGHT_GRID`` degree grid, so searches a
+few metres apart coalesce too and share the leader's distances.
+
+Requests are always coalesced within a worker; a waiter that hears nothing
+from its leader within ``SINGLE_FLIGHT_LOCK_TTL`` seconds runs the view
+itself rather than hang behind a stuck call. With ``SINGLE_FLIGHT_URL``
+set, a Redis lock elects one leader across workers; the others poll for
+the result it publishes, and run the view themselves if the leader's lock
+expires without one.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from functools import wraps
+
+import redis
+from flask import Response, current_app, make_response, request
+from redis.exceptions import WatchError
+
+COORDINATE_ARGS = ('lat', 'lng', 'lon')
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces calls with equal keys made by threads of this process."""
+
+    def __init__(self, shared=None, timeout=None):
+        self.shared = shared
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Return ``fn()``, or the result of an identical call in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(self.timeout):
+                # The leader is stuck: stop waiting and do the work
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self.shared.do(key, fn) if self.shared else fn()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class RedisSingleFlight:
+    """Elects one leader per key across workers with a Redis lock.
+
+    Results must be JSON-serializable, since followers on other workers
+    read them back from Redis.
+    """
+
+    def __init__(self, client, lock_ttl, poll_interval=0.02):
+        self.redis = client
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+
+    def do(self, key, fn):
+        lock_key = f'singleflight:lock:{key}'
+        result_key = f'singleflight:result:{key}'
+        token = uuid.uuid4().hex
+
+        locked = not self.redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        while locked:
+            # The leader publishes before it unlocks, so reading in the
+            # opposite order never misses a result
+            pipeline = self.redis.pipeline()
+            pipeline.exists(lock_key)
+            pipeline.get(result_key)
+            held, result = pipeline.execute()
+            if result is not None:
+                return json.loads(result)
+            if held:
+                time.sleep(self.poll_interval)
+            else:
+                # The leader gave up without a result: take over
+                locked = not self.redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+
+        try:
+            result = fn()
+            # Long enough for every follower's next poll to see it
+            self.redis.set(result_key, json.dumps(result), px=max(int(self.poll_interval * 5000), 100))
+            return result
+        finally:
+            self._release(lock_key, token)
+
+    def _release(self, lock_key, token):
+        with self.redis.pipeline() as pipeline:
+            try:
+                pipeline.watch(lock_key)
+                if pipeline.get(lock_key) == token.encode():
+                    pipeline.multi()
+                    pipeline.delete(lock_key)
+                    pipeline.execute()
+            except WatchError:
+                pass
+
+
+def _create(app):
+    url = app.config.get('SINGLE_FLIGHT_URL')
+    lock_ttl = app.config.get('SINGLE_FLIGHT_LOCK_TTL', 10)
+    if not url:
+        return SingleFlight(timeout=lock_ttl)
+    if url.startswith('fakeredis://'):
+        import fakeredis
+        return SingleFlight(RedisSingleFlight(fakeredis.FakeRedis(), lock_ttl), lock_ttl)
+    return SingleFlight(RedisSingleFlight(redis.Redis.from_url(url), lock_ttl), lock_ttl)
+
+
+def single_flight():
+    """Return the single-flight group of the current app."""
+    group = current_app.extensions.get('single_flight')
+    if group is None:
+        group = current_app.extensions['single_flight'] = _create(current_app)
+    return group
+
+
+def search_key():
+    """Key the current request by path and arguments, coordinates on a grid."""
+    grid = current_app.config.get('SINGLE_FLIGHT_GRID', 0.001)
+    args = []
+    for name, value in sorted(request.args.items(multi=True)):
+        if name in COORDINATE_ARGS:
+            try:
+                value = str(round(float(value) / grid))
+            except ValueError:
+                pass
+        args.append((name, value))
+    return hashlib.sha1(json.dumps([request.path, args]).encode()).hexdigest()
+
+
+def coalesced(key=search_key):
+    """Share one run of a GET view between concurrent requests with equal keys."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            def run():
+                response = make_response(view(*args, **kwargs))
+                return {'body': response.get_data(as_text=True), 'status': response.status_code,
+                        'mimetype': response.mimetype}
+
+            result = single_flight().do(key(), run)
+            return Response(result['body'], status=result['status'], mimetype=result['mimetype'])
+        return wrapper
+    return decorator
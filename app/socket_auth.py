@@ -0,0 +1,106 @@
+"""Authentication of Socket.IO connections.
+
+A socket is authenticated once, at the handshake, from the access token
+the client sends in its ``auth`` payload (or, for non-browser clients, an
+``Authorization: Bearer`` header). The user id goes on the socket session
+and every later event trusts that instead of client-supplied ids.
+
+Verified tokens are kept in a small TTL cache so a reconnect storm does
+not decode the JWT and load the ``User`` row again for every socket. An
+entry never outlives the token itself.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request, session
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+
+from app import db
+from app.models import User
+
+
+class TokenCache:
+    """Bounded map of token digest -> (user_id, expires_at)."""
+
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _key(self, token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, token, user_id, token_expires_at):
+        key = self._key(token)
+        expires_at = min(time.time() + self.ttl, token_expires_at)
+        with self._lock:
+            self._entries[key] = (user_id, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+def token_cache():
+    cache = current_app.extensions.get('socket_token_cache')
+    if cache is None:
+        cache = current_app.extensions['socket_token_cache'] = TokenCache(
+            current_app.config.get('SOCKET_TOKEN_CACHE_TTL', 300),
+            current_app.config.get('SOCKET_TOKEN_CACHE_SIZE', 10000)
+        )
+    return cache
+
+
+def _handshake_token(auth):
+    if isinstance(auth, dict) and auth.get('token'):
+        return auth['token']
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):]
+    return None
+
+
+def authenticate(auth):
+    """Return the user id for a handshake, or None if it is not authorized."""
+    token = _handshake_token(auth)
+    if not token:
+        return None
+
+    cache = token_cache()
+    user_id = cache.get(token)
+    if user_id is not None:
+        return user_id
+
+    try:
+        claims = decode_token(token)
+    except (PyJWTError, JWTExtendedException):
+        return None
+    if claims.get('type') != 'access':
+        return None
+
+    user = db.session.get(User, int(claims[current_app.config['JWT_IDENTITY_CLAIM']]))
+    if user is None or not user.is_active:
+        return None
+    cache.put(token, user.id, claims['exp'])
+    return user.id
+
+
+def socket_user_id():
+    """Return the id of the user who owns the current socket."""
+    return session.get('user_id')
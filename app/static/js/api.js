@@ -61,9 +61,13 @@ class Api {
         return await this.request('auth/me');
     }
 
+    pageQuery(cursor) {
+        return cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    }
+
     // Provider endpoints
-    async getProviders() {
-        return await this.request('api/providers');
+    async getProviders(cursor) {
+        return await this.request('api/providers' + this.pageQuery(cursor));
     }
 
     async getProvider(id) {
@@ -85,8 +89,8 @@ class Api {
     }
 
     // Message endpoints
-    async getMessages() {
-        return await this.request('api/messages');
+    async getMessages(cursor) {
+        return await this.request('api/messages' + this.pageQuery(cursor));
     }
 
     async sendMessage(receiverId, content) {
@@ -97,8 +101,8 @@ class Api {
     }
 
     // Review endpoints
-    async getProviderReviews(providerId) {
-        return await this.request(`api/providers/${providerId}/reviews`);
+    async getProviderReviews(providerId, cursor) {
+        return await this.request(`api/providers/${providerId}/reviews` + this.pageQuery(cursor));
     }
 
     async createReview(providerId, data) {
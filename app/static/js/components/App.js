@@ -6,10 +6,6 @@ function App() {
     const [socket, setSocket] = React.useState(null);
 
     React.useEffect(() => {
-        // Initialize Socket.IO connection
-        const newSocket = io(window.INITIAL_DATA.socketUrl);
-        setSocket(newSocket);
-
         // Check if user is logged in
         const token = localStorage.getItem('token');
         if (token) {
@@ -17,21 +13,38 @@ function App() {
         } else {
             setIsLoading(false);
         }
-
-        return () => newSocket.close();
     }, []);
 
     React.useEffect(() => {
-        if (socket && user) {
-            // Join user's room for private messages
-            socket.emit('join', { user_id: user.id });
+        if (!user) {
+            return;
+        }
+
+        // The server refuses handshakes without a token, so connect once logged in
+        const newSocket = io(window.INITIAL_DATA.socketUrl, {
+            auth: {
+                token: localStorage.getItem('token')
+            }
+        });
+        setSocket(newSocket);
 
-            // Listen for new messages
-            socket.on('new_message', (message) => {
-                setMessages(prev => [...prev, message]);
+        // Join user's room for private messages
+        newSocket.emit('join', { user_id: user.id });
+
+        // Listen for new messages
+        newSocket.on('new_message', (message) => {
+            setMessages(prev => [...prev, message]);
+        });
+
+        // Several events for this client dispatched together arrive as one batch
+        newSocket.on('batch', (events) => {
+            events.forEach(({ event, data }) => {
+                newSocket.listeners(event).forEach((listener) => listener(data));
             });
-        }
-    }, [socket, user]);
+        });
+
+        return () => newSocket.close();
+    }, [user]);
 
     const loadCurrentUser = async () => {
         try {
@@ -52,8 +65,8 @@ function App() {
                 window.api.getProviders(),
                 window.api.getMessages()
             ]);
-            setProviders(providersData);
-            setMessages(messagesData);
+            setProviders(providersData.items);
+            setMessages(messagesData.items);
         } catch (error) {
             console.error('Failed to load data:', error);
         }
@@ -15,6 +15,24 @@ socket.on('message', (data) => {
     // Handle incoming messages (e.g., update UI, show notifications)
 });
 
+// Keep this user marked online; the server drops silent sockets after 60s
+setInterval(() => {
+    if (socket.connected) {
+        socket.emit('heartbeat');
+    }
+}, 25000);
+
+// Several events for this client dispatched together arrive as one batch
+socket.on('batch', (events) => {
+    events.forEach(({ event, data }) => {
+        socket.listeners(event).forEach((listener) => listener(data));
+    });
+});
+
+socket.on('presence', (data) => {
+    console.log('Presence changed:', data);
+});
+
 socket.on('disconnect', () => {
     console.log('Disconnected from Socket.IO server');
 });
@@ -0,0 +1,53 @@
+"""Streaming JSON responses for large collections.
+
+``stream_json`` sends every row of a query without building the list
+first. Rows are read ``STREAM_BATCH_SIZE`` at a time with ``yield_per``
+and each batch is encoded and written as one chunk, so memory stays flat
+whatever the size of the result and the first bytes leave as soon as the
+first batch is read.
+
+The body is a JSON array, or NDJSON (one object per line) when the client
+asks for ``application/x-ndjson`` or passes ``?format=ndjson``.
+"""
+from itertools import islice
+
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_ndjson():
+    return request.args.get('format') == 'ndjson' or \
+        request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def wants_stream():
+    """Whether the client asked for the whole collection as a stream."""
+    return request.args.get('stream', 'false').lower() == 'true' or wants_ndjson()
+
+
+def stream_json(query, serialize, batch_size=None, ndjson=None):
+    """Return a response streaming ``serialize(row)`` for every row of ``query``."""
+    batch_size = batch_size or current_app.config.get('STREAM_BATCH_SIZE', 500)
+    ndjson = wants_ndjson() if ndjson is None else ndjson
+    dumps = current_app.json.dumps
+
+    def generate():
+        rows = iter(query.yield_per(batch_size))
+        if not ndjson:
+            yield '['
+        first = True
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            if ndjson:
+                yield ''.join(dumps(serialize(row)) + '\n' for row in batch)
+            else:
+                yield ('' if first else ',') + ','.join(dumps(serialize(row)) for row in batch)
+            first = False
+        if not ndjson:
+            yield ']'
+
+    mimetype = NDJSON_MIMETYPE if ndjson else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
@@ -0,0 +1,192 @@
+"""Buffered blog post view counters.
+
+Reads never write to ``blog_post``. A view is counted into a buffer keyed
+by post, and a flusher in every worker folds the buffer into
+``view_count`` every ``VIEW_FLUSH_INTERVAL`` seconds with one UPDATE per
+batch of posts, so a popular post costs one row write per interval
+instead of one per read.
+
+Each client counts once per post per ``VIEW_DEDUP_WINDOW`` seconds, keyed
+by user id when the request is authenticated and by address and user
+agent otherwise.
+
+``VIEW_COUNTER_URL`` picks the backend like ``DELIVERY_QUEUE_URL``: a
+Redis URL shares the buffer and the dedup window between workers and
+keeps buffered views across a worker crash, ``fakeredis://`` does the same
+in-process for tests, and leaving it unset buffers in local memory, where
+a crash loses at most one flush interval of views.
+
+Flushes neither bump ``BlogPost.version`` nor invalidate cached listings,
+or a hot post would change ETag on every flush; ``view_count`` in a
+response may lag by up to ``RESPONSE_CACHE_TTL`` seconds instead.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+from sqlalchemy import case, func, update
+
+from app import db, socketio
+from app.models import BlogPost
+
+FLUSH_BATCH_SIZE = 500
+
+
+class LocalViewCounter:
+    """Process-local view buffer and dedup window."""
+
+    def __init__(self, window, max_clients=100000):
+        self.window = window
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._counts = {}
+        # Insertion order is expiry order since every entry gets the same window
+        self._seen = OrderedDict()
+
+    def record(self, post_id, client):
+        """Count a view unless ``client`` viewed the post within the window."""
+        now = time.time()
+        key = (post_id, client)
+        with self._lock:
+            while self._seen and next(iter(self._seen.values())) <= now:
+                self._seen.popitem(last=False)
+            if key in self._seen:
+                return False
+            self._seen[key] = now + self.window
+            while len(self._seen) > self.max_clients:
+                self._seen.popitem(last=False)
+            self._counts[post_id] = self._counts.get(post_id, 0) + 1
+            return True
+
+    def drain(self):
+        """Return and reset the buffered ``{post_id: views}``."""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        return counts
+
+    def restore(self, counts):
+        """Put back counts that could not be flushed."""
+        with self._lock:
+            for post_id, views in counts.items():
+                self._counts[post_id] = self._counts.get(post_id, 0) + views
+
+
+class RedisViewCounter:
+    """View buffer kept in one Redis hash, dedup window in expiring keys."""
+
+    PENDING_KEY = 'views:pending'
+
+    def __init__(self, client, window):
+        self.redis = client
+        self.window = window
+
+    def record(self, post_id, client):
+        if not self.redis.set(f'views:seen:{post_id}:{client}', 1, nx=True, ex=self.window):
+            return False
+        self.redis.hincrby(self.PENDING_KEY, post_id, 1)
+        return True
+
+    def drain(self):
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.hgetall(self.PENDING_KEY)
+        pipeline.delete(self.PENDING_KEY)
+        counts = pipeline.execute()[0]
+        return {int(post_id): int(views) for post_id, views in counts.items()}
+
+    def restore(self, counts):
+        pipeline = self.redis.pipeline()
+        for post_id, views in counts.items():
+            pipeline.hincrby(self.PENDING_KEY, post_id, views)
+        pipeline.execute()
+
+
+def _create(app):
+    url = app.config.get('VIEW_COUNTER_URL')
+    window = app.config.get('VIEW_DEDUP_WINDOW', 1800)
+    if not url:
+        return LocalViewCounter(window)
+    if url.startswith('fakeredis://'):
+        import fakeredis
+        return RedisViewCounter(fakeredis.FakeRedis(), window)
+    return RedisViewCounter(redis.Redis.from_url(url), window)
+
+
+def view_counter():
+    """Return the view buffer of the current app."""
+    counter = current_app.extensions.get('view_counter')
+    if counter is None:
+        counter = current_app.extensions['view_counter'] = _create(current_app)
+    return counter
+
+
+def _client_key():
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except (PyJWTError, JWTExtendedException):
+        user_id = None
+    if user_id is not None:
+        return f'user:{user_id}'
+    fingerprint = f"{request.remote_addr}|{request.headers.get('User-Agent', '')}"
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+
+
+def record_view(post_id):
+    """Count a view of post ``post_id`` by the requesting client."""
+    return view_counter().record(post_id, _client_key())
+
+
+def flush_views():
+    """Fold buffered views into ``view_count``; return how many posts changed."""
+    counter = view_counter()
+    counts = counter.drain()
+    if not counts:
+        return 0
+    try:
+        post_ids = sorted(counts)
+        for start in range(0, len(post_ids), FLUSH_BATCH_SIZE):
+            batch = {post_id: counts[post_id] for post_id in post_ids[start:start + FLUSH_BATCH_SIZE]}
+            db.session.execute(
+                update(BlogPost)
+                .where(BlogPost.id.in_(batch))
+                .values(view_count=func.coalesce(BlogPost.view_count, 0) + case(batch, value=BlogPost.id, else_=0)),
+                execution_options={'synchronize_session': False}
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        counter.restore(counts)
+        raise
+    return len(counts)
+
+
+class Flusher:
+    """Background loop flushing the view buffer of one app."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def run(self):
+        interval = self.app.config['VIEW_FLUSH_INTERVAL']
+        while True:
+            socketio.sleep(interval)
+            with self.app.app_context():
+                try:
+                    flush_views()
+                except Exception:
+                    self.app.logger.exception('View count flush failed')
+
+
+def start_flusher(app):
+    """Start the app's flusher once, if ``VIEW_FLUSH_INTERVAL`` is set."""
+    if not app.config.get('VIEW_FLUSH_INTERVAL') or 'view_flusher' in app.extensions:
+        return
+    flusher = Flusher(app)
+    if app.extensions.setdefault('view_flusher', flusher) is flusher:
+        socketio.start_background_task(flusher.run)
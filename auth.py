@@ -33,7 +33,7 @@ def register():
             address=data['address'],
             latitude=data['latitude'],
             longitude=data['longitude'],
-            services=','.join(data.get('services', []))
+            services=data.get('services', [])
         )
         db.session.add(provider)
     
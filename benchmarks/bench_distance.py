@@ -0,0 +1,52 @@
+"""Compare the per-row geodesic loop with the batched distance engine.
+
+Run from the repository root:
+
+    python benchmarks/bench_distance.py [sizes...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from geopy.distance import geodesic
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.distance import distances_within  # noqa: E402
+
+ORIGIN = (40.7128, -74.0060)
+RADIUS_KM = 50 * 1.609344
+
+
+def per_row_loop(lats, lngs):
+    result = []
+    for lat, lng in zip(lats, lngs):
+        distance = geodesic(ORIGIN, (lat, lng)).km
+        if distance <= RADIUS_KM:
+            result.append(distance)
+    return result
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    rng = np.random.default_rng(42)
+    print(f"{'providers':>10} {'per-row':>10} {'fast':>10} {'exact':>10} {'speedup':>9}")
+    for size in sizes:
+        # Scatter providers over roughly a 500 km box around the origin
+        lats = ORIGIN[0] + rng.uniform(-2.5, 2.5, size)
+        lngs = ORIGIN[1] + rng.uniform(-3.0, 3.0, size)
+
+        loop = timed(per_row_loop, lats, lngs)
+        fast = timed(distances_within, *ORIGIN, lats, lngs, RADIUS_KM)
+        exact = timed(distances_within, *ORIGIN, lats, lngs, RADIUS_KM, exact=True)
+        print(f"{size:>10} {loop:>9.3f}s {fast:>9.4f}s {exact:>9.4f}s {loop / fast:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
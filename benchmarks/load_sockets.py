@@ -0,0 +1,106 @@
+"""Hold thousands of idle Socket.IO connections while serving REST traffic.
+
+Start the server with the default gevent worker, then run the load from a
+second shell. Raise the open file limit on both sides first:
+
+    ulimit -n 20000
+    RATELIMIT_ENABLED=false gunicorn run:app
+    python benchmarks/load_sockets.py --url http://127.0.0.1:5000 --sockets 5000
+
+Both sides must share JWT_SECRET_KEY, since the sockets authenticate on
+connect. Reports how long the idle sockets took to connect, REST throughput
+and latency while they are held open, and how many were still connected
+at the end.
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+
+import requests  # noqa: E402
+import socketio  # noqa: E402
+from gevent.pool import Pool  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app  # noqa: E402
+
+
+def tokens(count):
+    app = create_app()
+    with app.app_context():
+        return [create_access_token(identity=user_id) for user_id in range(1, count + 1)]
+
+
+def open_socket(url, token, transport):
+    client = socketio.Client(reconnection=False)
+    try:
+        client.connect(url, headers={'Authorization': f'Bearer {token}'},
+                       transports=[transport], wait_timeout=60)
+    except socketio.exceptions.ConnectionError:
+        return None
+    return client
+
+
+def rest_worker(url, deadline, latencies, statuses):
+    session = requests.Session()
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            status = session.get(f'{url}/api/providers?limit=20', timeout=30).status_code
+        except requests.RequestException:
+            status = 'error'
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--sockets', type=int, default=2000)
+    parser.add_argument('--transport', choices=('websocket', 'polling'), default='websocket')
+    parser.add_argument('--connect-concurrency', type=int, default=200)
+    parser.add_argument('--rest-concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=20.0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pool = Pool(args.connect_concurrency)
+    clients = [client for client in pool.imap_unordered(
+        lambda token: open_socket(args.url, token, args.transport), tokens(args.sockets)
+    ) if client is not None]
+    print(f'idle sockets: {len(clients)}/{args.sockets} connected in {time.perf_counter() - start:.1f}s')
+
+    latencies = []
+    statuses = {}
+    deadline = time.monotonic() + args.duration
+    rest = Pool(args.rest_concurrency)
+    for _ in range(args.rest_concurrency):
+        rest.spawn(rest_worker, args.url, deadline, latencies, statuses)
+    rest.join()
+
+    print(f'REST: {len(latencies)} requests in {args.duration:.0f}s '
+          f'({len(latencies) / args.duration:.0f} req/s) statuses={statuses}')
+    if latencies:
+        print('latency ms: ' + ' '.join(
+            f'p{int(fraction * 100)}={percentile(latencies, fraction) * 1000:.1f}'
+            for fraction in (0.5, 0.95, 0.99)
+        ))
+    print(f'idle sockets still connected: {sum(client.connected for client in clients)}/{len(clients)}')
+
+    Pool(args.connect_concurrency).map(lambda client: client.disconnect(), clients)
+
+
+if __name__ == '__main__':
+    main()
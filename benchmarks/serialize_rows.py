@@ -0,0 +1,96 @@
+"""Compare the cost of serializing rows for a JSON response.
+
+Fills an in-memory SQLite database with reviews, then times producing the
+response body for them three ways:
+
+- before: load Review instances, call to_dict, encode with Flask's stdlib
+  provider;
+- orjson: the same instances and to_dict, encoded with OrjsonProvider;
+- rows + orjson: select the columns, encode the rows with OrjsonProvider.
+
+    python benchmarks/serialize_rows.py --rows 10000 --repeat 5
+
+Reports the best time of each, per 10k rows, split into loading and
+encoding.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.api.reviews import REVIEW_COLUMNS  # noqa: E402
+from app.models import Review, ServiceProvider, User  # noqa: E402
+from app.serialization import OrjsonProvider, StdlibJSONProvider, row_dict  # noqa: E402
+from config import TestingConfig  # noqa: E402
+
+
+def fill(count):
+    user = User(email='bench@example.com', first_name='Bench', last_name='User')
+    user.set_password('bench-password')
+    db.session.add(user)
+    db.session.flush()
+    provider = ServiceProvider(user_id=user.id, business_name='Bench')
+    db.session.add(provider)
+    db.session.flush()
+
+    start = datetime(2026, 1, 1)
+    db.session.execute(Review.__table__.insert(), [
+        {'user_id': user.id, 'provider_id': provider.id, 'rating': index % 5 + 1,
+         'content': f'Review number {index}', 'created_at': start + timedelta(seconds=index),
+         'updated_at': start + timedelta(seconds=index, microseconds=index)}
+        for index in range(count)
+    ])
+    db.session.commit()
+
+
+def best(repeat, load, encode):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        items = load()
+        loaded = time.perf_counter()
+        encode(items)
+        timings.append((loaded - started, time.perf_counter() - loaded))
+    return min(timings, key=sum)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app(TestingConfig)
+    app.debug = False  # compact output, as in production
+    with app.app_context():
+        db.create_all()
+        fill(args.rows)
+        stdlib = StdlibJSONProvider(app)
+        fast = OrjsonProvider(app)
+
+        def instances():
+            return [review.to_dict() for review in Review.query.all()]
+
+        def rows():
+            return [row_dict(row) for row in db.session.query(*REVIEW_COLUMNS)]
+
+        cases = [
+            ('before (to_dict + stdlib)', instances, lambda items: stdlib.response(items)),
+            ('to_dict + orjson', instances, lambda items: fast.response(items)),
+            ('rows + orjson', rows, lambda items: fast.response(items)),
+        ]
+        scale = 10000 / args.rows * 1000
+        print(f'{"per 10k rows (ms)":<28}{"load":>8}{"encode":>8}{"total":>8}')
+        for name, load, encode in cases:
+            load_time, encode_time = best(args.repeat, load, encode)
+            print(f'{name:<28}{load_time * scale:>8.1f}{encode_time * scale:>8.1f}'
+                  f'{(load_time + encode_time) * scale:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
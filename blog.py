@@ -1,13 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload
 from .models import db, BlogPost, Comment, User
+from app.pagination import paginate, page_response
 
 blog_bp = Blueprint('blog', __name__)
 
 @blog_bp.route('', methods=['GET'])
 def get_blog_posts():
-    posts = BlogPost.query.order_by(BlogPost.created_at.desc()).all()
-    return jsonify([post_to_dict(post, include_content=False) for post in posts])
+    posts, next_cursor = paginate(BlogPost.query.options(joinedload(BlogPost.author)), BlogPost)
+    return page_response(posts, next_cursor, lambda post: post_to_dict(post, include_content=False))
 
 @blog_bp.route('/<int:post_id>', methods=['GET'])
 def get_blog_post(post_id):
@@ -51,6 +53,8 @@ def add_comment(post_id):
     )
     
     db.session.add(comment)
+    BlogPost.query.filter_by(id=post_id).update({BlogPost.comment_count: BlogPost.comment_count + 1},
+                                                synchronize_session=False)
     db.session.commit()
     
     return jsonify(comment_to_dict(comment)), 201
@@ -65,7 +69,7 @@ def post_to_dict(post, include_content=True, include_comments=False):
             "last_name": post.author.last_name
         },
         "created_at": post.created_at.isoformat(),
-        "comment_count": len(post.comments)
+        "comment_count": post.comment_count
     }
     
     if include_content:
@@ -22,6 +22,9 @@ class Config:
     # CORS
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5000,http://127.0.0.1:5000').split(',')
 
+    # 'orjson' (falls back to the stdlib when it is not installed) or 'default'
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+
     # File Upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(basedir, 'app', 'static', 'uploads')
@@ -30,7 +33,57 @@ class Config:
     # Redis (for SocketIO)
     REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 
+    # SocketIO message queue shared by all workers; unset keeps emits in-process
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_CHANNEL = 'flask-socketio'
+    # threading or gevent; gevent needs a patched stdlib
+    SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+
+    # Messages awaiting a socket ack; unset keeps the queues in local memory
+    DELIVERY_QUEUE_URL = os.environ.get('DELIVERY_QUEUE_URL')
+    DELIVERY_QUEUE_TTL = 7 * 24 * 3600  # seconds
+
+    # Online status; sockets that stop heartbeating drop off after PRESENCE_TTL
+    PRESENCE_URL = os.environ.get('PRESENCE_URL')
+    PRESENCE_TTL = 60  # seconds
+    # How often each worker publishes offline for sockets that stopped heartbeating
+    PRESENCE_SWEEP_INTERVAL = 15.0  # seconds
+
+    # Verified socket handshake tokens, so reconnects skip JWT decode and User load
+    SOCKET_TOKEN_CACHE_TTL = 300  # seconds
+    SOCKET_TOKEN_CACHE_SIZE = 10000
+
+    # Outbox dispatcher: idle poll interval (commits wake it sooner), batch, lease
+    OUTBOX_DISPATCH_INTERVAL = 1.0  # seconds
+    OUTBOX_BATCH_SIZE = 200
+    OUTBOX_LEASE = 30  # seconds
+
+    # Blog post views: buffered (shared in Redis when set), flushed in batches,
+    # each client counted once per post per dedup window
+    VIEW_COUNTER_URL = os.environ.get('VIEW_COUNTER_URL')
+    VIEW_FLUSH_INTERVAL = 10.0  # seconds
+    VIEW_DEDUP_WINDOW = 1800  # seconds
+
+    # Response cache: in-process LRU in front of a shared tier (Redis when set)
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL')
+    RESPONSE_CACHE_TTL = 60  # seconds, shared tier
+    RESPONSE_CACHE_LOCAL_SIZE = 1024  # entries per process
+    RESPONSE_CACHE_LOCAL_TTL = 30  # seconds
+
+    # Rows read and written per chunk by streamed collection responses
+    STREAM_BATCH_SIZE = 500
+
+    # Provider search
+    NEAREST_INDEX_MAX_AGE = int(os.environ.get('NEAREST_INDEX_MAX_AGE', 300))  # seconds
+    # Concurrent identical searches share one run; coordinates are keyed on a
+    # grid of this many degrees, and a Redis lock coalesces across workers if set
+    SINGLE_FLIGHT_GRID = 0.001
+    SINGLE_FLIGHT_URL = os.environ.get('SINGLE_FLIGHT_URL')
+    SINGLE_FLIGHT_LOCK_TTL = 10  # seconds
+
     # Rate Limiting
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() != 'false'
     RATELIMIT_DEFAULT = "100 per minute"
     RATELIMIT_STORAGE_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 
@@ -52,11 +105,34 @@ class ProductionConfig(Config):
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI')
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '').split(',')
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE', Config.REDIS_URL)
+    DELIVERY_QUEUE_URL = os.environ.get('DELIVERY_QUEUE_URL', Config.REDIS_URL)
+    PRESENCE_URL = os.environ.get('PRESENCE_URL', Config.REDIS_URL)
+    VIEW_COUNTER_URL = os.environ.get('VIEW_COUNTER_URL', Config.REDIS_URL)
+    RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL', Config.REDIS_URL)
+    SINGLE_FLIGHT_URL = os.environ.get('SINGLE_FLIGHT_URL', Config.REDIS_URL)
+    
+    # Thousands of greenlets share one pool per worker: queue briefly for a
+    # connection rather than opening one per request
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_pre_ping': True
+    }
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    # Tests drain the outbox explicitly with dispatch_outbox()
+    OUTBOX_DISPATCH_INTERVAL = None
+    # and fold buffered views in with flush_views()
+    VIEW_FLUSH_INTERVAL = None
+    # and expire silent sockets with expire_presence()
+    PRESENCE_SWEEP_INTERVAL = None
+    # Tests write rows directly, bypassing the endpoints' invalidation
+    RESPONSE_CACHE_ENABLED = False
 
 config = {
     'development': DevelopmentConfig,
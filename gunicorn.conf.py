@@ -0,0 +1,51 @@
+"""Gunicorn settings for serving the app with cooperative workers.
+
+Gunicorn loads this file automatically from the working directory. Socket.IO
+connections are long-lived, so the default sync worker (one request per
+process) is only suitable for REST-only deployments. The gevent worker
+serves thousands of idle sockets per process on greenlets. Select with
+``GUNICORN_WORKER_CLASS``:
+
+    gevent (default), sync, gthread
+
+Any other worker class runs Socket.IO in threading mode.
+
+Polling clients must keep talking to the worker that owns their session,
+so run one worker per container (``WEB_CONCURRENCY=1``) and scale out with
+more containers behind a sticky load balancer, sharing emits through
+``SOCKETIO_MESSAGE_QUEUE``.
+"""
+import os
+
+# Gunicorn worker class -> matching Socket.IO async mode
+WORKER_CLASSES = {
+    'gevent': 'gevent',
+    'sync': 'threading',
+    'gthread': 'threading'
+}
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+# Workers inherit the environment, so the app picks the same mode
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', WORKER_CLASSES.get(worker_class, 'threading'))
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+# Concurrent connections (sockets and requests) per cooperative worker
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 10000))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+
+# Long-polling requests stay open for up to the Socket.IO ping interval
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Each worker builds its own engine and Socket.IO server after fork
+preload_app = False
+
+def post_worker_init(worker):
+    # Each worker starts its background tasks once it has loaded the app
+    from app import start_background_tasks
+    start_background_tasks(worker.wsgi)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from .models import db, Message, User
 from .socket_events import socketio
+from app.pagination import id_window
 
 messages_bp = Blueprint('messages', __name__)
 
@@ -10,15 +11,28 @@ messages_bp = Blueprint('messages', __name__)
 def get_messages(user_id):
     current_user_id = get_jwt_identity()
     
-    messages = Message.query.filter(
+    # Both directions of the thread, each an index range on (sender, receiver, id)
+    query = Message.query.filter(
         ((Message.sender_id == current_user_id) & (Message.receiver_id == user_id)) |
         ((Message.sender_id == user_id) & (Message.receiver_id == current_user_id))
-    ).order_by(Message.created_at).all()
+    )
+    since_id = request.args.get('since_id', type=int)
+    before_id = request.args.get('before_id', type=int)
+    if since_id is not None or before_id is not None:
+        messages, has_more = id_window(query, Message, since_id, before_id)
+        return jsonify({
+            'items': [message_to_dict(message) for message in messages],
+            'has_more': has_more
+        })
     
-    for message in messages:
-        if message.receiver_id == current_user_id and not message.read:
-            message.read = True
+    messages = query.order_by(Message.created_at).all()
     
+    # One set-based UPDATE instead of flushing every message object
+    Message.query.filter(
+        Message.sender_id == user_id,
+        Message.receiver_id == current_user_id,
+        Message.read == False
+    ).update({Message.read: True}, synchronize_session=False)
     db.session.commit()
     
     return jsonify([message_to_dict(message) for message in messages])
@@ -0,0 +1,34 @@
+"""add provider coordinates and geohash index
+
+Revision ID: 3f9a1c2d7b4e
+Revises: 0c577150ac77
+Create Date: 2026-10-18 09:12:41.532108
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c2d7b4e'
+down_revision = '0c577150ac77'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('service_provider', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('address', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('geohash', sa.String(length=12), nullable=True))
+        batch_op.create_index(batch_op.f('ix_service_provider_geohash'), ['geohash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('service_provider', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_service_provider_geohash'))
+        batch_op.drop_column('geohash')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
+        batch_op.drop_column('address')
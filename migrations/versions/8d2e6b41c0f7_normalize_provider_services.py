@@ -0,0 +1,93 @@
+"""normalize provider services into service / provider_service
+
+Revision ID: 8d2e6b41c0f7
+Revises: 3f9a1c2d7b4e
+Create Date: 2026-10-18 11:40:05.318722
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e6b41c0f7'
+down_revision = '3f9a1c2d7b4e'
+branch_labels = None
+depends_on = None
+
+
+def _parse_services(value):
+    if not value:
+        return []
+    if value.lstrip().startswith('['):
+        services = json.loads(value)
+    else:
+        services = value.split(',')
+    names = []
+    for service in services:
+        name = service.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade():
+    service = op.create_table('service',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    provider_service = op.create_table('provider_service',
+    sa.Column('provider_id', sa.Integer(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['provider_id'], ['service_provider.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['service_id'], ['service.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('provider_id', 'service_id')
+    )
+    op.create_index('ix_provider_service_service_id', 'provider_service', ['service_id', 'provider_id'], unique=False)
+
+    # Backfill from the comma-joined / JSON text column
+    connection = op.get_bind()
+    service_provider = sa.table('service_provider', sa.column('id', sa.Integer), sa.column('services', sa.Text))
+    service_ids = {}
+    links = []
+    for provider_id, services in connection.execute(sa.select(service_provider.c.id, service_provider.c.services)):
+        for name in _parse_services(services):
+            if name not in service_ids:
+                result = connection.execute(service.insert().values(name=name))
+                service_ids[name] = result.inserted_primary_key[0]
+            links.append({'provider_id': provider_id, 'service_id': service_ids[name]})
+    if links:
+        op.bulk_insert(provider_service, links)
+
+    with op.batch_alter_table('service_provider', schema=None) as batch_op:
+        batch_op.drop_column('services')
+
+
+def downgrade():
+    with op.batch_alter_table('service_provider', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('services', sa.Text(), nullable=True))
+
+    connection = op.get_bind()
+    service_provider = sa.table('service_provider', sa.column('id', sa.Integer), sa.column('services', sa.Text))
+    service = sa.table('service', sa.column('id', sa.Integer), sa.column('name', sa.String))
+    provider_service = sa.table('provider_service', sa.column('provider_id', sa.Integer), sa.column('service_id', sa.Integer))
+    services = {}
+    rows = connection.execute(
+        sa.select(provider_service.c.provider_id, service.c.name)
+        .join(service, service.c.id == provider_service.c.service_id)
+        .order_by(service.c.name))
+    for provider_id, name in rows:
+        services.setdefault(provider_id, []).append(name)
+    for provider_id, names in services.items():
+        connection.execute(
+            service_provider.update()
+            .where(service_provider.c.id == provider_id)
+            .values(services=','.join(names)))
+
+    op.drop_index('ix_provider_service_service_id', table_name='provider_service')
+    op.drop_table('provider_service')
+    op.drop_table('service')
@@ -0,0 +1,42 @@
+"""add outbox_event table for post-commit socket emits
+
+Revision ID: a5d3c8e91f04
+Revises: f2b86d0a4c71
+Create Date: 2026-10-18 19:26:44.502918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5d3c8e91f04'
+down_revision = 'f2b86d0a4c71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_event',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event', sa.String(length=64), nullable=False),
+    sa.Column('room', sa.String(length=64), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('claim', sa.String(length=32), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('outbox_event', schema=None) as batch_op:
+        batch_op.create_index('ix_outbox_event_available_at_id', ['available_at', 'id'], unique=False)
+        batch_op.create_index('ix_outbox_event_claim', ['claim'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('outbox_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_outbox_event_claim')
+        batch_op.drop_index('ix_outbox_event_available_at_id')
+
+    op.drop_table('outbox_event')
@@ -0,0 +1,32 @@
+"""add maintained comment_count to blog_post
+
+Revision ID: b0e4f7a2c913
+Revises: a5d3c8e91f04
+Create Date: 2026-10-18 20:04:17.215863
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b0e4f7a2c913'
+down_revision = 'a5d3c8e91f04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('blog_post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from existing comments with a correlated count
+    blog_post = sa.table('blog_post', sa.column('id'), sa.column('comment_count'))
+    comment = sa.table('comment', sa.column('post_id'))
+    count = sa.select(sa.func.count()).where(comment.c.post_id == blog_post.c.id).scalar_subquery()
+    op.execute(blog_post.update().values(comment_count=count))
+
+
+def downgrade():
+    with op.batch_alter_table('blog_post', schema=None) as batch_op:
+        batch_op.drop_column('comment_count')
@@ -0,0 +1,53 @@
+"""add maintained rating aggregates to service_provider
+
+Revision ID: b71f0e93a5d2
+Revises: 8d2e6b41c0f7
+Create Date: 2026-10-18 13:05:52.907114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71f0e93a5d2'
+down_revision = '8d2e6b41c0f7'
+branch_labels = None
+depends_on = None
+
+STAR_COLUMNS = ['stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5']
+
+
+def upgrade():
+    with op.batch_alter_table('service_provider', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('review_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+        for column in STAR_COLUMNS:
+            batch_op.add_column(sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from existing reviews with correlated aggregates
+    service_provider = sa.table('service_provider', sa.column('id'), sa.column('rating'),
+                                sa.column('review_count'), sa.column('rating_sum'),
+                                *[sa.column(column) for column in STAR_COLUMNS])
+    review = sa.table('review', sa.column('provider_id'), sa.column('rating'))
+
+    def aggregate(expression, *criteria):
+        return sa.select(expression).where(review.c.provider_id == service_provider.c.id, *criteria) \
+            .scalar_subquery()
+
+    values = {
+        'review_count': aggregate(sa.func.count()),
+        'rating_sum': aggregate(sa.func.coalesce(sa.func.sum(review.c.rating), 0)),
+        'rating': aggregate(sa.func.coalesce(sa.func.avg(review.c.rating), 0)),
+    }
+    for stars, column in enumerate(STAR_COLUMNS, 1):
+        values[column] = aggregate(sa.func.count(), review.c.rating == stars)
+    op.execute(service_provider.update().values(**values))
+
+
+def downgrade():
+    with op.batch_alter_table('service_provider', schema=None) as batch_op:
+        for column in reversed(STAR_COLUMNS):
+            batch_op.drop_column(column)
+        batch_op.drop_column('rating_sum')
+        batch_op.drop_column('review_count')
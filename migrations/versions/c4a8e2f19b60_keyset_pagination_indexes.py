@@ -0,0 +1,33 @@
+"""add (created_at, id) indexes for keyset pagination
+
+Revision ID: c4a8e2f19b60
+Revises: b71f0e93a5d2
+Create Date: 2026-10-18 14:22:17.640385
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a8e2f19b60'
+down_revision = 'b71f0e93a5d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_user_created_at_id', 'user', ['created_at', 'id'], unique=False)
+    op.create_index('ix_service_provider_created_at_id', 'service_provider', ['created_at', 'id'], unique=False)
+    op.create_index('ix_blog_post_created_at_id', 'blog_post', ['created_at', 'id'], unique=False)
+    op.create_index('ix_blog_post_status_created_at_id', 'blog_post', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_comment_post_id_created_at_id', 'comment', ['post_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_review_provider_id_created_at_id', 'review', ['provider_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_review_provider_id_created_at_id', table_name='review')
+    op.drop_index('ix_comment_post_id_created_at_id', table_name='comment')
+    op.drop_index('ix_blog_post_status_created_at_id', table_name='blog_post')
+    op.drop_index('ix_blog_post_created_at_id', table_name='blog_post')
+    op.drop_index('ix_service_provider_created_at_id', table_name='service_provider')
+    op.drop_index('ix_user_created_at_id', table_name='user')
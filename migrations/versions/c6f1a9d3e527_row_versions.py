@@ -0,0 +1,32 @@
+"""add version counters to blog_post and service_provider
+
+Revision ID: c6f1a9d3e527
+Revises: b0e4f7a2c913
+Create Date: 2026-10-18 20:41:09.638120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f1a9d3e527'
+down_revision = 'b0e4f7a2c913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('blog_post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('service_provider', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('service_provider', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('blog_post', schema=None) as batch_op:
+        batch_op.drop_column('version')
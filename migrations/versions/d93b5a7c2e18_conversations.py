@@ -0,0 +1,83 @@
+"""add conversation table with denormalized last message
+
+Revision ID: d93b5a7c2e18
+Revises: c4a8e2f19b60
+Create Date: 2026-10-18 15:48:33.205961
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd93b5a7c2e18'
+down_revision = 'c4a8e2f19b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conversation = op.create_table('conversation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_a_id', sa.Integer(), nullable=False),
+    sa.Column('user_b_id', sa.Integer(), nullable=False),
+    sa.Column('last_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_message_at', sa.DateTime(), nullable=True),
+    sa.Column('unread_a', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('unread_b', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_a_id'], ['user.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_b_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_a_id', 'user_b_id', name='uq_conversation_users')
+    )
+    op.create_index('ix_conversation_user_a_id_last_message_at', 'conversation', ['user_a_id', 'last_message_at', 'id'], unique=False)
+    op.create_index('ix_conversation_user_b_id_last_message_at', 'conversation', ['user_b_id', 'last_message_at', 'id'], unique=False)
+
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('conversation_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_message_conversation_id', 'conversation', ['conversation_id'], ['id'], ondelete='CASCADE')
+        batch_op.create_index('ix_message_conversation_id_id', ['conversation_id', 'id'], unique=False)
+
+    # Backfill one conversation per user pair from the existing messages
+    connection = op.get_bind()
+    message = sa.table('message', sa.column('id'), sa.column('conversation_id'), sa.column('sender_id'),
+                       sa.column('recipient_id'), sa.column('created_at', sa.DateTime), sa.column('read', sa.Boolean))
+    user_a = sa.func.min(message.c.sender_id, message.c.recipient_id) if connection.dialect.name == 'sqlite' \
+        else sa.func.least(message.c.sender_id, message.c.recipient_id)
+    user_b = sa.func.max(message.c.sender_id, message.c.recipient_id) if connection.dialect.name == 'sqlite' \
+        else sa.func.greatest(message.c.sender_id, message.c.recipient_id)
+    unread = sa.case((sa.or_(message.c.read.is_(None), message.c.read == sa.false()), 1), else_=0)
+    pairs = connection.execute(
+        sa.select(
+            user_a.label('user_a_id'), user_b.label('user_b_id'),
+            sa.func.max(message.c.id).label('last_message_id'),
+            sa.func.sum(sa.case((message.c.recipient_id == user_a, unread), else_=0)).label('unread_a'),
+            sa.func.sum(sa.case((message.c.recipient_id == user_b, unread), else_=0)).label('unread_b'),
+        ).group_by(user_a, user_b)
+    ).all()
+    for pair in pairs:
+        last_message_at = connection.execute(
+            sa.select(message.c.created_at).where(message.c.id == pair.last_message_id)).scalar()
+        conversation_id = connection.execute(conversation.insert().values(
+            user_a_id=pair.user_a_id, user_b_id=pair.user_b_id,
+            last_message_id=pair.last_message_id, last_message_at=last_message_at,
+            unread_a=pair.unread_a, unread_b=pair.unread_b, created_at=sa.func.now()
+        )).inserted_primary_key[0]
+        connection.execute(message.update().where(
+            sa.or_(
+                sa.and_(message.c.sender_id == pair.user_a_id, message.c.recipient_id == pair.user_b_id),
+                sa.and_(message.c.sender_id == pair.user_b_id, message.c.recipient_id == pair.user_a_id),
+            )
+        ).values(conversation_id=conversation_id))
+
+
+def downgrade():
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.drop_index('ix_message_conversation_id_id')
+        batch_op.drop_constraint('fk_message_conversation_id', type_='foreignkey')
+        batch_op.drop_column('conversation_id')
+
+    op.drop_index('ix_conversation_user_b_id_last_message_at', table_name='conversation')
+    op.drop_index('ix_conversation_user_a_id_last_message_at', table_name='conversation')
+    op.drop_table('conversation')
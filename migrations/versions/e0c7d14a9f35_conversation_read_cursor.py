@@ -0,0 +1,61 @@
+"""replace per-message read flags with per-conversation read cursors
+
+Revision ID: e0c7d14a9f35
+Revises: d93b5a7c2e18
+Create Date: 2026-10-18 17:03:26.881540
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e0c7d14a9f35'
+down_revision = 'd93b5a7c2e18'
+branch_labels = None
+depends_on = None
+
+conversation = sa.table('conversation', sa.column('id', sa.Integer), sa.column('user_a_id', sa.Integer),
+                        sa.column('user_b_id', sa.Integer), sa.column('unread_a', sa.Integer),
+                        sa.column('unread_b', sa.Integer), sa.column('last_read_a', sa.Integer),
+                        sa.column('last_read_b', sa.Integer))
+message = sa.table('message', sa.column('id', sa.Integer), sa.column('conversation_id', sa.Integer),
+                   sa.column('recipient_id', sa.Integer), sa.column('read', sa.Boolean))
+
+
+def _to(user_id, *criteria):
+    return sa.and_(message.c.conversation_id == conversation.c.id, message.c.recipient_id == user_id, *criteria)
+
+
+def upgrade():
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_read_a', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_read_b', sa.Integer(), server_default='0', nullable=False))
+
+    # Each side's cursor starts at the newest message it had already read
+    for user_id, cursor, unread in ((conversation.c.user_a_id, 'last_read_a', 'unread_a'),
+                                    (conversation.c.user_b_id, 'last_read_b', 'unread_b')):
+        last_read = sa.select(sa.func.coalesce(sa.func.max(message.c.id), 0)) \
+            .where(_to(user_id, message.c.read == sa.true())).scalar_subquery()
+        op.execute(conversation.update().values(**{cursor: last_read}))
+        remaining = sa.select(sa.func.count(message.c.id)) \
+            .where(_to(user_id, message.c.id > conversation.c[cursor])).scalar_subquery()
+        op.execute(conversation.update().values(**{unread: remaining}))
+
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.drop_column('read')
+
+
+def downgrade():
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('read', sa.Boolean(), nullable=True))
+
+    last_read = sa.select(
+        sa.case((message.c.recipient_id == conversation.c.user_a_id, conversation.c.last_read_a),
+                else_=conversation.c.last_read_b)
+    ).where(conversation.c.id == message.c.conversation_id).scalar_subquery()
+    op.execute(message.update().values(read=sa.func.coalesce(message.c.id <= last_read, sa.false())))
+
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.drop_column('last_read_b')
+        batch_op.drop_column('last_read_a')
@@ -0,0 +1,23 @@
+"""add (sender_id, recipient_id, id) index for thread delta sync
+
+Revision ID: f2b86d0a4c71
+Revises: e0c7d14a9f35
+Create Date: 2026-10-18 18:41:09.215734
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b86d0a4c71'
+down_revision = 'e0c7d14a9f35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_message_sender_id_recipient_id_id', 'message', ['sender_id', 'recipient_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_message_sender_id_recipient_id_id', table_name='message')
@@ -1,6 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from sqlalchemy import event
+from app.geo import encode
+from app.models.service import normalize_services
 
 db = SQLAlchemy()
 
@@ -20,6 +23,17 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+provider_service = db.Table(
+    'provider_service',
+    db.Column('provider_id', db.Integer, db.ForeignKey('service_provider.id'), primary_key=True),
+    db.Column('service_id', db.Integer, db.ForeignKey('service.id'), primary_key=True),
+    db.Index('ix_provider_service_service_id', 'service_id', 'provider_id')
+)
+
+class Service(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
 class ServiceProvider(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -28,13 +42,33 @@ class ServiceProvider(db.Model):
     address = db.Column(db.String(200), nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
-    services = db.Column(db.Text, nullable=True)
+    geohash = db.Column(db.String(12), index=True)
+    rating = db.Column(db.Float, default=0.0)
+    review_count = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     user = db.relationship('User', backref=db.backref('provider', uselist=False))
     reviews = db.relationship('Review', backref='provider', lazy='dynamic')
+    service_tags = db.relationship('Service', secondary='provider_service', lazy='selectin', order_by='Service.name')
+    
+    @property
+    def services(self):
+        return [service.name for service in self.service_tags]
+    
+    @services.setter
+    def services(self, services):
+        names = normalize_services(services)
+        existing = {service.name: service for service in Service.query.filter(Service.name.in_(names))}
+        self.service_tags = [existing.get(name) or Service(name=name) for name in names]
+
+@event.listens_for(ServiceProvider, 'before_insert')
+@event.listens_for(ServiceProvider, 'before_update')
+def update_geohash(mapper, connection, provider):
+    provider.geohash = encode(provider.latitude, provider.longitude)
 
 class Message(db.Model):
+    __table_args__ = (db.Index('ix_message_sender_id_receiver_id_id', 'sender_id', 'receiver_id', 'id'),)
+    
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     receiver_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -50,6 +84,7 @@ class BlogPost(db.Model):
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
     author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     author = db.relationship('User')
@@ -1,48 +1,60 @@
 from flask import Blueprint, request, jsonify
-from .models import db, ServiceProvider, User, Review
-from geopy.distance import geodesic
+from .models import db, ServiceProvider, Service, User, provider_service
+from app.models.service import normalize_services
+from app.distance import within_radius
+from app.geo import KM_PER_MILE, geohash_filter
+from app.pagination import paginate, page_response
+from app.singleflight import coalesced
 from sqlalchemy import func
 
 providers_bp = Blueprint('providers', __name__)
 
 @providers_bp.route('', methods=['GET'])
+@coalesced()
 def get_providers():
     lat = request.args.get('lat', type=float)
     lng = request.args.get('lng', type=float)
     max_distance = request.args.get('max_distance', 50, type=int)
-    services = request.args.get('services', '')
+    services = normalize_services(request.args.get('services', ''))
+    match = request.args.get('match', 'all')
+    exact = request.args.get('exact', 'false').lower() == 'true'
     
-    query = db.session.query(ServiceProvider, User, 
-                             func.avg(Review.rating).label('avg_rating'),
-                             func.count(Review.id).label('review_count')).\
-        join(User, ServiceProvider.user_id == User.id).\
-        outerjoin(Review, ServiceProvider.id == Review.provider_id).\
-        group_by(ServiceProvider.id)
+    # Ratings come from the aggregates maintained on ServiceProvider
+    query = db.session.query(ServiceProvider, User).\
+        join(User, ServiceProvider.user_id == User.id)
     
     if services:
-        service_list = services.split(',')
-        query = query.filter(ServiceProvider.services.like(f"%{service}%") for service in service_list)
+        offering = db.select(provider_service.c.provider_id).\
+            join(Service, Service.id == provider_service.c.service_id).\
+            where(Service.name.in_(services))
+        if match == 'all':
+            offering = offering.group_by(provider_service.c.provider_id).\
+                having(func.count(provider_service.c.service_id) == len(services))
+        query = query.filter(ServiceProvider.id.in_(offering))
     
-    providers = query.all()
+    if lat and lng:
+        radius_km = max_distance * KM_PER_MILE
+        query = query.filter(geohash_filter(ServiceProvider.geohash, lat, lng, radius_km))
+    
+    # Pages are cut before the distance check, so a page may hold fewer
+    # than `limit` providers while next_cursor still advances correctly
+    providers, next_cursor = paginate(query, ServiceProvider, entity=lambda row: row[0])
+    
+    if not (lat and lng):
+        return page_response(providers, next_cursor, lambda row: provider_to_dict(*row))
     
     result = []
-    for provider, user, avg_rating, review_count in providers:
-        provider_dict = provider_to_dict(provider, user, avg_rating, review_count)
-        
-        if lat and lng:
-            user_location = (lat, lng)
-            provider_location = (provider.latitude, provider.longitude)
-            distance = geodesic(user_location, provider_location).miles
-            
-            if distance <= max_distance:
-                provider_dict['distance'] = round(distance, 1)
-                result.append(provider_dict)
-        else:
-            result.append(provider_dict)
+    nearby = within_radius(providers, lat, lng, radius_km,
+                           location=lambda row: (row[0].latitude, row[0].longitude),
+                           exact=exact)
+    for row, distance in nearby:
+        provider_dict = provider_to_dict(*row)
+        provider_dict['distance'] = round(distance / KM_PER_MILE, 1)
+        result.append(provider_dict)
     
-    return jsonify(result)
+    return jsonify({'items': result, 'next_cursor': next_cursor})
 
-def provider_to_dict(provider, user, avg_rating, review_count):
+def provider_to_dict(provider, user):
     return {
         "id": provider.id,
         "business_name": provider.business_name,
@@ -50,9 +62,9 @@ def provider_to_dict(provider, user, avg_rating, review_count):
         "address": provider.address,
         "latitude": provider.latitude,
         "longitude": provider.longitude,
-        "services": provider.services.split(',') if provider.services else [],
-        "rating": round(avg_rating or 0, 1),
-        "review_count": review_count,
+        "services": provider.services,
+        "rating": round(provider.rating or 0, 1),
+        "review_count": provider.review_count or 0,
         "owner": {
             "id": user.id,
             "first_name": user.first_name,
@@ -1,8 +1,18 @@
-from app import create_app, socketio
+import os
+
+# gevent must patch the standard library before anything imports it
+if __name__ == '__main__' and os.environ.get('SOCKETIO_ASYNC_MODE') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from app import create_app, socketio, start_background_tasks
 
 app = create_app()
 
 if __name__ == '__main__':
+    # Under the reloader only the child process serves requests
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_tasks(app)
     socketio.run(app, 
                 debug=True, 
                 host='127.0.0.1',
@@ -1,21 +1,21 @@
-from flask_socketio import join_room, leave_room
+from flask import session
+from flask_socketio import ConnectionRefusedError, join_room, leave_room
+from app.socket_auth import authenticate
 
 def register_socket_events(socketio):
     @socketio.on('connect')
-    def handle_connect():
-        print('Client connected')
+    def handle_connect(auth=None):
+        # Identity comes from the handshake token, never from event payloads
+        user_id = authenticate(auth)
+        if user_id is None:
+            raise ConnectionRefusedError('unauthorized')
+        session['user_id'] = user_id
+        join_room(f"user_{user_id}")
 
     @socketio.on('join')
-    def handle_join(data):
-        user_id = data.get('user_id')
-        if user_id:
-            join_room(f"user_{user_id}")
-            print(f"User {user_id} joined their room")
+    def handle_join(data=None):
+        join_room(f"user_{session['user_id']}")
 
     @socketio.on('leave')
-    def handle_leave(data):
-        user_id = data.get('user_id')
-        if user_id:
-            leave_room(f"user_{user_id}")
-            print(f"User {user_id} left their room")
-
+    def handle_leave(data=None):
+        leave_room(f"user_{session['user_id']}")
@@ -0,0 +1,73 @@
+from contextlib import contextmanager
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import BlogPost, User, UserRole
+from config import TestingConfig
+
+@pytest.fixture
+def app():
+    app = create_app(TestingConfig)
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    def _make_user(email, role=UserRole.CUSTOMER):
+        user = User(email=email, first_name='Test', last_name='User', role=role)
+        user.set_password('testpass123')
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return _make_user
+
+@pytest.fixture
+def auth_headers(app):
+    def _auth_headers(user):
+        token = create_access_token(identity=user.id)
+        return {'Authorization': f'Bearer {token}'}
+    return _auth_headers
+
+@pytest.fixture
+def send_message(client, auth_headers):
+    def _send_message(sender, receiver, content):
+        response = client.post('/api/messages', headers=auth_headers(sender),
+                               json={'receiver_id': receiver.id, 'content': content})
+        assert response.status_code == 201
+        return response.json['id']
+    return _send_message
+
+@pytest.fixture
+def make_post(app):
+    def _make_post(author, slug):
+        post = BlogPost(title=slug, content='Body', author_id=author.id, slug=slug, status='published')
+        db.session.add(post)
+        db.session.commit()
+        return post
+    return _make_post
+
+@pytest.fixture
+def count_queries(app):
+    @contextmanager
+    def _count_queries():
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return _count_queries
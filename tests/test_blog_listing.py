@@ -0,0 +1,33 @@
+from app import db
+from app.models import Comment
+
+def test_listing_queries_do_not_grow_with_posts_or_comments(client, make_user, make_post, count_queries):
+    authors = [make_user(f'author{i}@example.com') for i in range(5)]
+    for i in range(50):
+        post = make_post(authors[i % 5], f'post-{i}')
+        db.session.add_all([Comment(content='Hi', author_id=authors[0].id, post_id=post.id) for _ in range(3)])
+        post.comment_count = 3
+    db.session.commit()
+    db.session.expire_all()
+    
+    with count_queries() as statements:
+        response = client.get('/api/blog/posts?limit=50')
+    
+    assert len(response.json['items']) == 50
+    assert len(statements) <= 2
+    assert all(item['comment_count'] == 3 for item in response.json['items'])
+    assert response.json['items'][0]['author']['first_name'] == 'Test'
+
+def test_comment_writes_maintain_comment_count(client, make_user, auth_headers, make_post):
+    author = make_user('author@example.com')
+    reader = make_user('reader@example.com')
+    post = make_post(author, 'hello')
+    
+    client.post(f'/api/blog/posts/{post.id}/comments', headers=auth_headers(author), json={'content': 'First'})
+    response = client.post(f'/api/blog/posts/{post.id}/comments', headers=auth_headers(reader), json={'content': 'Second'})
+    comment_id = response.json['id']
+    assert client.get(f'/api/blog/posts/{post.id}').json['comment_count'] == 2
+    
+    assert client.delete(f'/api/blog/comments/{comment_id}', headers=auth_headers(author)).status_code == 403
+    assert client.delete(f'/api/blog/comments/{comment_id}', headers=auth_headers(reader)).status_code == 204
+    assert client.get(f'/api/blog/posts/{post.id}').json['comment_count'] == 1
@@ -0,0 +1,76 @@
+import pytest
+
+from app import db
+from app.cache import LRUCache, response_cache
+from app.models import ServiceProvider, UserRole
+
+@pytest.fixture(params=[None, 'fakeredis://'])
+def cache_app(app, request):
+    app.config.update(RESPONSE_CACHE_ENABLED=True, RESPONSE_CACHE_URL=request.param)
+    if request.param:
+        response_cache().shared.redis.flushall()
+    return app
+
+def test_lru_is_bounded_by_size():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+def test_tiers_serve_hits_and_count_them(cache_app, client, make_user, make_post, count_queries):
+    make_post(make_user('author@example.com'), 'hello')
+    
+    first = client.get('/api/blog/posts')
+    with count_queries() as statements:
+        second = client.get('/api/blog/posts')
+    assert second.json == first.json
+    assert not statements
+    
+    # Another worker has an empty local tier but shares the second one
+    response_cache().local = LRUCache(16, 30)
+    assert client.get('/api/blog/posts').json == first.json
+    client.get('/api/blog/posts')
+    
+    assert response_cache().stats['api.get_posts'] == {'local_hits': 2, 'shared_hits': 1, 'misses': 1}
+
+def test_writes_invalidate_only_their_tags(cache_app, client, make_user, auth_headers):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    pipes = ServiceProvider(user_id=owner.id, business_name='Pipes')
+    wires = ServiceProvider(user_id=owner.id, business_name='Wires')
+    db.session.add_all([pipes, wires])
+    db.session.commit()
+    
+    for url in ('/api/providers', f'/api/providers/{pipes.id}', f'/api/providers/{wires.id}',
+                f'/api/providers/{pipes.id}/reviews'):
+        client.get(url)
+    
+    client.post(f'/api/providers/{pipes.id}/reviews', headers=auth_headers(make_user('alice@example.com')),
+                json={'rating': 5})
+    
+    assert client.get(f'/api/providers/{pipes.id}').json['review_count'] == 1
+    assert len(client.get(f'/api/providers/{pipes.id}/reviews').json['items']) == 1
+    assert client.get('/api/providers').json['items'][-1]['review_count'] == 1
+    client.get(f'/api/providers/{wires.id}')
+    
+    stats = response_cache().stats
+    assert stats['api.get_provider'] == {'local_hits': 1, 'shared_hits': 0, 'misses': 3}
+    assert stats['api.get_providers']['misses'] == 2
+
+def test_deleting_a_provider_drops_its_cached_reviews(cache_app, client, make_user, auth_headers):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    pipes = ServiceProvider(user_id=owner.id, business_name='Pipes')
+    db.session.add(pipes)
+    db.session.commit()
+    url = f'/api/providers/{pipes.id}/reviews'
+    client.get(url)
+    
+    assert client.delete(f'/api/providers/{pipes.id}', headers=auth_headers(owner)).status_code == 204
+    assert client.get(url).status_code == 404
+
+def test_stats_are_admin_only(client, make_user, auth_headers):
+    assert client.get('/api/cache/stats', headers=auth_headers(make_user('user@example.com'))).status_code == 403
+    
+    response = client.get('/api/cache/stats', headers=auth_headers(make_user('admin@example.com', UserRole.ADMIN)))
+    assert response.json['totals'] == {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'hit_ratio': None}
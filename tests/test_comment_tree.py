@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Comment
+
+START = datetime(2026, 10, 18, 9, 0, 0)
+
+def reply(post, author, parent=None):
+    comment = Comment(content='Hi', author_id=author.id, post_id=post.id,
+                      parent_id=parent.id if parent else None,
+                      created_at=START + timedelta(seconds=Comment.query.count()))
+    db.session.add(comment)
+    db.session.commit()
+    return comment
+
+def test_tree_is_assembled_with_depth_limit_and_collapsed_counts(client, make_user, make_post, count_queries):
+    author = make_user('author@example.com')
+    post = make_post(author, 'thread')
+    root = reply(post, author)
+    chain = [root]
+    for _ in range(5):
+        chain.append(reply(post, author, chain[-1]))
+    sibling = reply(post, author, root)
+    other = reply(post, author)
+    
+    with count_queries() as statements:
+        response = client.get(f'/api/blog/posts/{post.id}/comments/tree?depth=2')
+    assert len(statements) == 3
+    
+    first, second = response.json['items']
+    assert [first['id'], second['id']] == [root.id, other.id]
+    assert [node['id'] for node in first['replies']] == [chain[1].id, sibling.id]
+    
+    level_two = first['replies'][0]['replies'][0]
+    assert level_two['id'] == chain[2].id
+    assert level_two['replies'] == []
+    assert level_two['collapsed_count'] == 3
+    assert first['replies'][1]['collapsed_count'] == 0
+    
+    expanded = client.get(f'/api/blog/comments/{chain[2].id}/tree?depth=10').json
+    assert expanded['replies'][0]['replies'][0]['replies'][0]['id'] == chain[5].id
+
+def test_top_level_comments_are_paginated(client, make_user, make_post):
+    author = make_user('author@example.com')
+    post = make_post(author, 'busy')
+    roots = [reply(post, author) for _ in range(5)]
+    reply(post, author, roots[0])
+    
+    page = client.get(f'/api/blog/posts/{post.id}/comments/tree?limit=3').json
+    assert [node['id'] for node in page['items']] == [root.id for root in roots[:3]]
+    assert len(page['items'][0]['replies']) == 1
+    
+    page = client.get(f"/api/blog/posts/{post.id}/comments/tree?limit=3&cursor={page['next_cursor']}").json
+    assert [node['id'] for node in page['items']] == [root.id for root in roots[3:]]
+    assert page['next_cursor'] is None
+
+def test_reply_must_belong_to_the_same_post(client, make_user, auth_headers, make_post):
+    author = make_user('author@example.com')
+    post = make_post(author, 'one')
+    elsewhere = reply(make_post(author, 'two'), author)
+    
+    response = client.post(f'/api/blog/posts/{post.id}/comments', headers=auth_headers(author),
+                           json={'content': 'Hi', 'parent_id': elsewhere.id})
+    assert response.status_code == 400
+
+def test_deleting_a_comment_removes_its_replies(client, make_user, auth_headers, make_post):
+    author = make_user('author@example.com')
+    post = make_post(author, 'thread')
+    root = reply(post, author)
+    child = reply(post, author, root)
+    reply(post, author, child)
+    other = reply(post, author)
+    post.comment_count = 4
+    db.session.commit()
+    
+    assert client.delete(f'/api/blog/comments/{root.id}', headers=auth_headers(author)).status_code == 204
+    assert [comment.id for comment in Comment.query] == [other.id]
+    assert client.get(f'/api/blog/posts/{post.id}').json['comment_count'] == 1
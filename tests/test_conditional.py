@@ -0,0 +1,67 @@
+import time
+
+from app import db
+from app.models import ServiceProvider, UserRole
+from app.view_counts import flush_views
+
+def revalidate(client, url, etag):
+    return client.get(url, headers={'If-None-Match': etag})
+
+def test_provider_is_revalidated_from_its_version(client, make_user, auth_headers, count_queries):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    provider = ServiceProvider(user_id=owner.id, business_name='Pipes', latitude=1.0, longitude=2.0,
+                               services=['plumbing'])
+    db.session.add(provider)
+    db.session.commit()
+    url = f'/api/providers/{provider.id}'
+    
+    response = client.get(url)
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+    
+    with count_queries() as statements:
+        response = revalidate(client, url, etag)
+    assert response.status_code == 304
+    assert response.data == b''
+    assert len(statements) == 1
+    
+    # A change to the services collection alone still bumps the version
+    client.put(url, headers=auth_headers(owner), json={'services': ['plumbing', 'heating']})
+    response = revalidate(client, url, etag)
+    assert response.status_code == 200
+    assert response.json['services'] == ['heating', 'plumbing']
+    etag = response.headers['ETag']
+    
+    # So does a review, which only touches the aggregates in SQL
+    client.post(f'{url}/reviews', headers=auth_headers(make_user('alice@example.com')), json={'rating': 4})
+    assert revalidate(client, url, etag).status_code == 200
+
+def test_view_flushes_keep_the_post_etag(app, client, make_user, monkeypatch, make_post):
+    post = make_post(make_user('author@example.com'), 'hello')
+    url = f'/api/blog/posts/{post.id}'
+    etag = client.get(url).headers['ETag']
+    
+    # Revalidating clients are still counted
+    response = client.get(url, headers={'If-None-Match': etag, 'User-Agent': 'other-browser'})
+    assert response.status_code == 304
+    assert flush_views() == 1
+    assert revalidate(client, url, etag).status_code == 304
+    
+    # The view count is refreshed once the bucket moves on
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + app.config['RESPONSE_CACHE_TTL'])
+    response = revalidate(client, url, etag)
+    assert response.status_code == 200
+    assert response.json['view_count'] == 2
+    
+    assert revalidate(client, '/api/blog/posts/999', etag).status_code == 404
+
+def test_listings_are_revalidated_by_content_hash(client, make_user, make_post):
+    author = make_user('author@example.com')
+    make_post(author, 'first')
+    
+    etag = client.get('/api/blog/posts').headers['ETag']
+    assert revalidate(client, '/api/blog/posts', etag).status_code == 304
+    
+    make_post(author, 'second')
+    assert revalidate(client, '/api/blog/posts', etag).status_code == 200
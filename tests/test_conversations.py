@@ -0,0 +1,29 @@
+from app.models import Conversation
+
+def test_inbox_lists_threads_with_last_message(client, make_user, auth_headers):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    carol = make_user('carol@example.com')
+    
+    for sender, content in ((alice, 'hi bob'), (bob, 'hi alice'), (alice, 'how are you?'), (carol, 'hello')):
+        receiver = alice if sender is bob else bob
+        response = client.post('/api/messages', headers=auth_headers(sender),
+                               json={'receiver_id': receiver.id, 'content': content})
+        assert response.status_code == 201
+    
+    assert Conversation.query.count() == 2
+    
+    inbox = client.get('/api/conversations', headers=auth_headers(bob)).json
+    assert [c['other_user_id'] for c in inbox['items']] == [carol.id, alice.id]
+    assert [c['last_message']['content'] for c in inbox['items']] == ['hello', 'how are you?']
+    assert [c['unread_count'] for c in inbox['items']] == [1, 2]
+    
+    inbox = client.get('/api/conversations', headers=auth_headers(alice)).json
+    assert len(inbox['items']) == 1
+    assert inbox['items'][0]['unread_count'] == 1
+    
+    page = client.get('/api/conversations?limit=1', headers=auth_headers(bob)).json
+    assert page['items'][0]['other_user_id'] == carol.id
+    page = client.get(f"/api/conversations?limit=1&cursor={page['next_cursor']}", headers=auth_headers(bob)).json
+    assert page['items'][0]['other_user_id'] == alice.id
+    assert page['next_cursor'] is None
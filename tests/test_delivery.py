@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from app import socketio
+from app.delivery import LocalDeliveryQueue, RedisDeliveryQueue, delivery_queue
+from app.outbox import dispatch_outbox
+
+@pytest.fixture(params=['local', 'redis'])
+def queue(request):
+    if request.param == 'local':
+        return LocalDeliveryQueue(ttl=60)
+    fakeredis = pytest.importorskip('fakeredis')
+    return RedisDeliveryQueue(fakeredis.FakeRedis(), ttl=60)
+
+def test_queue_keeps_messages_until_acked(queue):
+    for message_id in (3, 1, 2):
+        queue.push(7, message_id, {'id': message_id})
+    queue.push(8, 4, {'id': 4})
+    assert [m['id'] for m in queue.pending(7)] == [1, 2, 3]
+    
+    queue.ack(7, [1, 3, 99])
+    assert queue.pending(7) == [{'id': 2}]
+    assert queue.pending(8) == [{'id': 4}]
+    queue.ack(7, [2])
+    assert queue.pending(7) == []
+
+def test_local_queues_expire_after_their_last_message():
+    queue = LocalDeliveryQueue(ttl=0.1)
+    queue.push(7, 1, {'id': 1})
+    time.sleep(0.05)
+    queue.push(8, 2, {'id': 2})
+    time.sleep(0.06)
+    queue.push(9, 3, {'id': 3})
+    
+    assert 7 not in queue._queues
+    assert queue.pending(7) == []
+    assert queue.pending(8) == [{'id': 2}]
+
+def test_pending_messages_flushed_on_connect(app, client, make_user, auth_headers, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    ids = [send_message(alice, bob, f'while away {n}') for n in range(3)]
+    dispatch_outbox()
+    
+    socket = socketio.test_client(app, headers=auth_headers(bob))
+    batches = [event['args'][0] for event in socket.get_received() if event['name'] == 'pending_messages']
+    assert len(batches) == 1
+    assert [m['id'] for m in batches[0]] == ids
+    
+    socket.emit('ack', {'message_ids': ids[:2]})
+    assert [m['id'] for m in delivery_queue().pending(bob.id)] == ids[2:]
+    socket.disconnect()
+    
+    # Unacked messages come back on the next connect
+    socket = socketio.test_client(app, headers=auth_headers(bob))
+    batches = [event['args'][0] for event in socket.get_received() if event['name'] == 'pending_messages']
+    assert [[m['id'] for m in batch] for batch in batches] == [ids[2:]]
+    socket.disconnect()
+
+def test_malformed_ack_is_rejected(app, client, make_user, auth_headers, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    ids = [send_message(alice, bob, 'hello')]
+    dispatch_outbox()
+    socket = socketio.test_client(app, headers=auth_headers(bob))
+    socket.get_received()
+    
+    for payload in [{'message_ids': 'abc'}, {'message_ids': ['1']}, {'message_ids': 5}, ['message_ids']]:
+        socket.emit('ack', payload)
+        assert socket.get_received() == [{'name': 'error', 'args': [{'error': 'message_ids must be a list of message ids'}],
+                                          'namespace': '/'}]
+    assert [m['id'] for m in delivery_queue().pending(bob.id)] == ids
+    assert socket.is_connected()
+    socket.disconnect()
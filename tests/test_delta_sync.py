@@ -0,0 +1,52 @@
+from app import socketio
+from app.models import Conversation
+
+def test_thread_since_and_before_id(client, make_user, auth_headers, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    ids = [send_message(alice, bob, f'message {n}') for n in range(5)]
+    url = f'/api/conversations/{Conversation.query.one().id}/messages'
+    
+    page = client.get(f'{url}?since_id={ids[1]}&limit=2', headers=auth_headers(bob)).json
+    assert [m['id'] for m in page['items']] == ids[2:4]
+    assert page['has_more']
+    page = client.get(f'{url}?since_id={ids[3]}', headers=auth_headers(bob)).json
+    assert [m['id'] for m in page['items']] == ids[4:]
+    assert not page['has_more']
+    
+    page = client.get(f'{url}?before_id={ids[3]}&limit=2', headers=auth_headers(bob)).json
+    assert [m['id'] for m in page['items']] == [ids[2], ids[1]]
+    assert page['has_more']
+    
+    # A delta fetch is a background catch-up, not the reader opening the thread
+    assert Conversation.query.one().unread_count(bob.id) == 5
+
+def test_resume_replays_missed_messages(app, client, make_user, auth_headers, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    carol = make_user('carol@example.com')
+    ids = [send_message(alice, bob, 'seen'), send_message(carol, bob, 'missed'),
+           send_message(bob, alice, 'from another device'), send_message(alice, carol, 'not for bob')]
+    
+    socket = socketio.test_client(app, headers=auth_headers(bob))
+    socket.get_received()
+    ack = socket.emit('resume', {'last_id': ids[0]}, callback=True)
+    
+    replayed = [event['args'][0] for event in socket.get_received() if event['name'] == 'new_message']
+    assert [m['content'] for m in replayed] == ['missed', 'from another device']
+    assert ack == {'last_id': ids[2], 'has_more': False}
+    
+    assert socket.emit('resume', {'last_id': ids[2]}, callback=True) == {'last_id': ids[2], 'has_more': False}
+    assert not socket.get_received()
+    socket.disconnect()
+
+def test_resume_rejects_malformed_last_id(app, make_user, auth_headers):
+    socket = socketio.test_client(app, headers=auth_headers(make_user('bob@example.com')))
+    socket.get_received()
+    
+    for payload in [{'last_id': 'abc'}, {'last_id': [1]}, ['last_id']]:
+        socket.emit('resume', payload)
+        assert socket.get_received() == [{'name': 'error', 'args': [{'error': 'last_id must be a message id'}],
+                                          'namespace': '/'}]
+    assert socket.is_connected()
+    socket.disconnect()
@@ -0,0 +1,30 @@
+import numpy as np
+from geopy.distance import geodesic
+from app.distance import distances_within, haversine_km, within_radius
+
+ORIGIN = (40.7128, -74.0060)
+
+def test_haversine_matches_geodesic_closely():
+    lats = [40.7306, 42.3601, 34.0522]
+    lngs = [-73.9352, -71.0589, -118.2437]
+    distances = haversine_km(*ORIGIN, lats, lngs)
+    for lat, lng, distance in zip(lats, lngs, distances):
+        expected = geodesic(ORIGIN, (lat, lng)).km
+        assert abs(distance - expected) / expected < 0.006
+
+def test_exact_mode_uses_geodesic_at_the_boundary():
+    rng = np.random.default_rng(7)
+    lats = ORIGIN[0] + rng.uniform(-1, 1, 500)
+    lngs = ORIGIN[1] + rng.uniform(-1, 1, 500)
+    radius = 60
+    
+    indexes, distances = distances_within(*ORIGIN, lats, lngs, radius, exact=True)
+    expected = [i for i in range(500) if geodesic(ORIGIN, (lats[i], lngs[i])).km <= radius]
+    assert list(indexes) == expected
+    assert (distances <= radius).all()
+
+def test_within_radius_keeps_rows():
+    rows = [{'name': 'near', 'at': (40.72, -74.0)}, {'name': 'far', 'at': (34.05, -118.24)}]
+    result = within_radius(rows, *ORIGIN, 10, location=lambda row: row['at'])
+    assert [row['name'] for row, _ in result] == ['near']
+    assert within_radius([], *ORIGIN, 10) == []
@@ -0,0 +1,46 @@
+from app import db
+from app.geo import covering_cells, encode, geohash_filter
+from app.models import ServiceProvider, UserRole
+
+def test_encode_known_value():
+    assert encode(57.64911, 10.40744) == 'u4pruydqq'
+
+def test_covering_cells_contain_center():
+    cells = covering_cells(40.7128, -74.0060, 5)
+    assert any(encode(40.7128, -74.0060).startswith(cell) for cell in cells)
+    assert len(cells) <= 16
+
+def test_covering_cells_cross_antimeridian():
+    cells = covering_cells(0.0, 179.99, 50)
+    assert any(encode(0.0, -179.9).startswith(cell) for cell in cells)
+    assert any(encode(0.0, 179.9).startswith(cell) for cell in cells)
+
+def test_geohash_filter_excludes_far_providers(app, make_user):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    near = ServiceProvider(user_id=owner.id, business_name='Near', latitude=40.71, longitude=-74.00)
+    far = ServiceProvider(user_id=owner.id, business_name='Far', latitude=34.05, longitude=-118.24)
+    db.session.add_all([near, far])
+    db.session.commit()
+    
+    assert near.geohash == encode(40.71, -74.00)
+    found = ServiceProvider.query.filter(
+        geohash_filter(ServiceProvider.geohash, 40.7128, -74.0060, 10)).all()
+    assert found == [near]
+
+def test_search_providers_by_radius(client, make_user):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    db.session.add_all([
+        ServiceProvider(user_id=owner.id, business_name='Near', services=['plumbing'],
+                        latitude=40.72, longitude=-74.00),
+        ServiceProvider(user_id=owner.id, business_name='Edge', services=['painting'],
+                        latitude=40.85, longitude=-74.00),
+    ])
+    db.session.commit()
+    
+    response = client.get('/api/providers/search?lat=40.7128&lon=-74.0060&radius=5')
+    assert response.status_code == 200
+    assert [p['business_name'] for p in response.json] == ['Near']
+    assert response.json[0]['distance'] < 5
+    
+    response = client.get('/api/providers/search?lat=40.7128&lon=-74.0060&radius=20&service=painting')
+    assert [p['business_name'] for p in response.json] == ['Edge']
@@ -0,0 +1,31 @@
+import pytest
+from app import db
+from app.models import User
+from app.realtime import start_app_task
+
+gevent = pytest.importorskip('gevent')
+
+def test_each_greenlet_gets_its_own_session(app):
+    seen = {}
+    
+    def handle(n):
+        with app.app_context():
+            db.session.add(User(email=f'user{n}@example.com', first_name='Test', last_name='User'))
+            # Let every other greenlet run while this one holds pending work
+            gevent.sleep(0)
+            seen[n] = (db.session(), {user.email for user in db.session.new})
+    
+    gevent.joinall([gevent.spawn(handle, n) for n in range(20)], raise_error=True)
+    assert len({id(session) for session, _ in seen.values()}) == 20
+    assert all(pending == {f'user{n}@example.com'} for n, (_, pending) in seen.items())
+    assert not db.session.new
+
+def test_background_task_runs_in_app_context(app):
+    seen = []
+    
+    def task(value):
+        seen.append((value, db.session()))
+    
+    start_app_task(task, 'done').join(5)
+    assert seen[0][0] == 'done'
+    assert seen[0][1] is not db.session()
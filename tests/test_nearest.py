@@ -0,0 +1,55 @@
+import random
+from geopy.distance import great_circle
+from app import db
+from app.models import ServiceProvider, UserRole
+from app.nearest import ProviderIndex
+
+def test_index_matches_brute_force():
+    random.seed(3)
+    index = ProviderIndex()
+    points = {}
+    for key in range(500):
+        points[key] = (random.uniform(-60, 60), random.uniform(-180, 180))
+        index.upsert(key, *points[key], tags={'plumbing'} if key % 2 else ())
+    for key in range(0, 500, 5):
+        index.remove(key)
+        del points[key]
+    
+    origin = (10.0, 20.0)
+    expected = sorted(points, key=lambda key: great_circle(origin, points[key]).km)
+    assert [key for key, _ in index.nearest(*origin, 10)] == expected[:10]
+    
+    plumbers = [key for key in expected if key % 2]
+    assert [key for key, _ in index.nearest(*origin, 5, tags={'plumbing'})] == plumbers[:5]
+
+def test_nearest_endpoint_sorted_and_incremental(client, make_user, auth_headers):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    db.session.add_all([
+        ServiceProvider(user_id=owner.id, business_name='Far', services=['plumbing'],
+                        latitude=40.80, longitude=-74.00),
+        ServiceProvider(user_id=owner.id, business_name='Near', services=['painting'],
+                        latitude=40.72, longitude=-74.00),
+    ])
+    db.session.commit()
+    
+    response = client.get('/api/providers/nearest?lat=40.7128&lng=-74.0060&k=5')
+    assert [p['business_name'] for p in response.json] == ['Near', 'Far']
+    
+    response = client.post('/api/providers', headers=auth_headers(owner), json={
+        'business_name': 'Closest', 'address': '1 Main St', 'services': ['plumbing'],
+        'latitude': 40.7129, 'longitude': -74.0061,
+    })
+    assert response.status_code == 201
+    closest_id = response.json['id']
+    
+    response = client.get('/api/providers/nearest?lat=40.7128&lng=-74.0060&k=2&services=plumbing')
+    assert [p['business_name'] for p in response.json] == ['Closest', 'Far']
+    
+    client.put(f'/api/providers/{closest_id}', headers=auth_headers(owner),
+               json={'latitude': 41.5, 'longitude': -74.0})
+    response = client.get('/api/providers/nearest?lat=40.7128&lng=-74.0060&k=1&services=plumbing')
+    assert [p['business_name'] for p in response.json] == ['Far']
+    
+    client.delete(f'/api/providers/{closest_id}', headers=auth_headers(owner))
+    response = client.get('/api/providers/nearest?lat=40.7128&lng=-74.0060&k=5')
+    assert [p['business_name'] for p in response.json] == ['Near', 'Far']
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+from app import db, socketio
+from app.delivery import delivery_queue
+from app.models import Message, OutboxEvent
+from app.outbox import _claim, dispatch_outbox, enqueue
+
+def events(socket, name):
+    return [event['args'][0] for event in socket.get_received() if event['name'] == name]
+
+def test_message_and_event_commit_together(app, client, make_user, auth_headers, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    socket = socketio.test_client(app, headers=auth_headers(bob))
+    socket.get_received()
+    
+    message_id = send_message(alice, bob, 'hello')
+    row = OutboxEvent.query.one()
+    assert (row.event, row.room, row.user_id, row.payload['id']) == ('new_message', str(bob.id), bob.id, message_id)
+    assert not socket.get_received()
+    
+    assert dispatch_outbox() == 1
+    assert [m['id'] for m in events(socket, 'new_message')] == [message_id]
+    assert [m['id'] for m in delivery_queue().pending(bob.id)] == [message_id]
+    assert OutboxEvent.query.count() == 0
+    
+    # Nothing is announced for a transaction that never commits
+    db.session.add(Message(sender_id=alice.id, recipient_id=bob.id, content='draft'))
+    enqueue('new_message', {'id': 0}, room=str(bob.id))
+    db.session.rollback()
+    assert OutboxEvent.query.count() == 0
+    socket.disconnect()
+
+def test_events_for_a_room_are_coalesced(app, client, make_user, auth_headers, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    carol = make_user('carol@example.com')
+    sockets = {user.id: socketio.test_client(app, headers=auth_headers(user)) for user in (bob, carol)}
+    for socket in sockets.values():
+        socket.get_received()
+    
+    ids = [send_message(alice, bob, f'message {n}') for n in range(3)]
+    carol_id = send_message(alice, carol, 'just one')
+    assert dispatch_outbox() == 4
+    
+    bob_events = sockets[bob.id].get_received()
+    assert [event['name'] for event in bob_events] == ['batch']
+    assert [(item['event'], item['data']['id']) for item in bob_events[0]['args'][0]] == \
+        [('new_message', message_id) for message_id in ids]
+    assert [m['id'] for m in events(sockets[carol.id], 'new_message')] == [carol_id]
+    for socket in sockets.values():
+        socket.disconnect()
+
+def test_failed_emits_are_retried(app, client, make_user, auth_headers, monkeypatch, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    message_id = send_message(alice, bob, 'hello')
+    
+    def broken_emit(*args, **kwargs):
+        raise ConnectionError('message queue unavailable')
+    monkeypatch.setattr(socketio, 'emit', broken_emit)
+    assert dispatch_outbox() == 1
+    row = OutboxEvent.query.one()
+    assert row.attempts == 1 and row.claim is None
+    assert row.available_at > datetime.utcnow()
+    assert dispatch_outbox() == 0
+    
+    monkeypatch.undo()
+    row.available_at = datetime.utcnow()
+    db.session.commit()
+    socket = socketio.test_client(app, headers=auth_headers(bob))
+    socket.get_received()
+    assert dispatch_outbox() == 1
+    assert [m['id'] for m in events(socket, 'new_message')] == [message_id]
+    assert OutboxEvent.query.count() == 0
+    socket.disconnect()
+
+def test_claimed_rows_are_leased(app, client, make_user, auth_headers, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    send_message(alice, bob, 'hello')
+    
+    assert len(_claim(10, lease=30)) == 1
+    # Another worker finds nothing until the lease runs out
+    assert _claim(10, lease=30) == []
+    OutboxEvent.query.update({'available_at': datetime.utcnow()})
+    db.session.commit()
+    assert len(_claim(10, lease=30)) == 1
+
+def test_background_command_needs_shared_stores(app):
+    app.config.update(SOCKETIO_MESSAGE_QUEUE='redis://redis:6379/0', DELIVERY_QUEUE_URL='redis://redis:6379/0',
+                      VIEW_COUNTER_URL='redis://redis:6379/0', PRESENCE_URL='fakeredis://')
+    result = app.test_cli_runner().invoke(args=['background', 'run'])
+    assert result.exit_code == 1
+    assert 'PRESENCE_URL, RESPONSE_CACHE_URL must point at a shared store' in result.output
+    assert 'outbox_dispatcher' not in app.extensions
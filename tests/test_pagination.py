@@ -0,0 +1,69 @@
+from datetime import datetime
+from app import db
+from app.models import BlogPost, Conversation, UserRole
+from app.pagination import decode_cursor, encode_cursor, paginate
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 18, 9, 30, 15, 120000)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    assert decode_cursor(encode_cursor(None, 42)) == (None, 42)
+
+def test_posts_page_through_without_gaps(client, make_user):
+    author = make_user('author@example.com', UserRole.ADMIN)
+    # Identical timestamps force the id tie-breaker
+    same_time = datetime(2026, 1, 1, 12, 0, 0)
+    db.session.add_all([
+        BlogPost(title=f'Post {i}', content='...', slug=f'post-{i}', author_id=author.id,
+                 status='published', created_at=same_time if i < 4 else datetime(2026, 1, i, 8, 0, 0))
+        for i in range(1, 8)
+    ])
+    db.session.commit()
+    
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/blog/posts?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url).json
+        assert len(page['items']) <= 3
+        seen.extend(post['slug'] for post in page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    
+    assert seen == ['post-7', 'post-6', 'post-5', 'post-4', 'post-3', 'post-2', 'post-1']
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get('/api/blog/posts?cursor=not-a-cursor')
+    assert response.status_code == 400
+    assert response.json == {'error': 'Invalid cursor'}
+
+def test_null_sort_keys_page_last_by_id(app, client, make_user, auth_headers, send_message):
+    bob = make_user('bob@example.com')
+    alice, carol, dave = (make_user(f'{name}@example.com') for name in ('alice', 'carol', 'dave'))
+    send_message(alice, bob, 'hi bob')
+    # Threads without messages yet have no last_message_at
+    for other in (carol, dave):
+        Conversation.between(bob.id, other.id)
+    db.session.commit()
+    
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/conversations?limit=1' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url, headers=auth_headers(bob)).json
+        seen.extend(item['other_user_id'] for item in page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert seen == [alice.id, dave.id, carol.id]
+    
+    seen = []
+    cursor = None
+    while True:
+        with app.test_request_context('/?limit=1' + (f'&cursor={cursor}' if cursor else '')):
+            items, cursor = paginate(Conversation.query, Conversation, descending=False,
+                                     column=Conversation.last_message_at)
+        seen.extend(conversation.user_a_id + conversation.user_b_id - bob.id for conversation in items)
+        if not cursor:
+            break
+    assert seen == [carol.id, dave.id, alice.id]
@@ -0,0 +1,126 @@
+import time
+
+import pytest
+from app import socketio
+from app.presence import LocalPresence, RedisPresence, expire_presence, presence
+
+@pytest.fixture(params=['local', 'redis'])
+def make_presence(request):
+    def _make_presence(ttl=60):
+        if request.param == 'local':
+            return LocalPresence(ttl)
+        fakeredis = pytest.importorskip('fakeredis')
+        return RedisPresence(fakeredis.FakeRedis(), ttl)
+    return _make_presence
+
+def test_online_until_last_connection_leaves(make_presence):
+    table = make_presence()
+    assert table.connect(1, 'a')
+    assert not table.connect(1, 'b')
+    assert table.connect(2, 'c')
+    assert table.online([1, 2, 3]) == {1, 2}
+    
+    assert not table.disconnect(1, 'a')
+    assert table.online([1]) == {1}
+    assert table.disconnect(1, 'b')
+    assert not table.disconnect(1, 'b')
+    assert table.online([1, 2, 3]) == {2}
+
+def test_connections_expire_without_heartbeat(make_presence):
+    table = make_presence(ttl=0.2)
+    table.connect(1, 'a')
+    table.connect(2, 'b')
+    time.sleep(0.1)
+    table.heartbeat(2, 'b')
+    time.sleep(0.15)
+    assert table.online([1, 2]) == {2}
+    # A user whose sockets all aged out comes back online on reconnect
+    assert table.connect(1, 'c')
+
+def test_expired_users_are_reported_once(make_presence):
+    table = make_presence(ttl=0.1)
+    table.connect(1, 'a')
+    table.connect(2, 'b')
+    time.sleep(0.15)
+    table.heartbeat(2, 'b')
+    assert table.expire() == [1]
+    assert table.expire() == []
+    # Its late disconnect does not report the user offline a second time
+    assert not table.disconnect(1, 'a')
+    assert table.online([1, 2]) == {2}
+
+def test_disconnect_keeps_a_racing_connect(monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    table = RedisPresence(client, 60)
+    other_worker = RedisPresence(client, 60)
+    table.connect(1, 'a')
+    
+    pipeline = client.pipeline
+    raced = []
+    def racing_pipeline(*args, **kwargs):
+        instance = pipeline(*args, **kwargs)
+        zscore = instance.zscore
+        def racing_zscore(*zscore_args):
+            # The user connects elsewhere between the read and the write
+            if not raced:
+                raced.append(other_worker.connect(1, 'b'))
+            return zscore(*zscore_args)
+        instance.zscore = racing_zscore
+        return instance
+    monkeypatch.setattr(client, 'pipeline', racing_pipeline)
+    
+    assert not table.disconnect(1, 'a')
+    assert raced == [False]
+    assert table.online([1]) == {1}
+
+def test_presence_lookup_and_partner_updates(app, client, make_user, auth_headers):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    carol = make_user('carol@example.com')
+    response = client.post('/api/messages', headers=auth_headers(alice), json={'receiver_id': bob.id, 'content': 'hi'})
+    assert response.status_code == 201
+    
+    watchers = {}
+    for user in (alice, carol):
+        watchers[user.id] = socketio.test_client(app, headers=auth_headers(user))
+        watchers[user.id].emit('join', {'room': str(user.id)})
+        watchers[user.id].get_received()
+    
+    bob_socket = socketio.test_client(app, headers=auth_headers(bob))
+    lookup = client.get(f'/api/presence?user_ids={alice.id},{bob.id},{carol.id},999', headers=auth_headers(alice))
+    assert lookup.json == {'online': [alice.id, bob.id, carol.id]}
+    
+    presence_events = lambda socket: [e['args'][0] for e in socket.get_received() if e['name'] == 'presence']
+    assert presence_events(watchers[alice.id]) == [{'user_id': bob.id, 'online': True}]
+    assert presence_events(watchers[carol.id]) == []
+    
+    bob_socket.disconnect()
+    assert presence_events(watchers[alice.id]) == [{'user_id': bob.id, 'online': False}]
+    assert presence_events(watchers[carol.id]) == []
+    lookup = client.get(f'/api/presence?user_ids={bob.id}', headers=auth_headers(alice))
+    assert lookup.json == {'online': []}
+    
+    ids = ','.join(str(n) for n in range(201))
+    assert client.get(f'/api/presence?user_ids={ids}', headers=auth_headers(alice)).status_code == 400
+    for socket in watchers.values():
+        socket.disconnect()
+
+def test_sweep_publishes_users_who_went_silent(app, client, make_user, auth_headers):
+    app.config['PRESENCE_TTL'] = 0.2
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    client.post('/api/messages', headers=auth_headers(alice), json={'receiver_id': bob.id, 'content': 'hi'})
+    alice_socket = socketio.test_client(app, headers=auth_headers(alice))
+    bob_socket = socketio.test_client(app, headers=auth_headers(bob))
+    alice_socket.get_received()
+    
+    # Bob's connection drops without a disconnect and stops heartbeating
+    time.sleep(0.25)
+    alice_socket.emit('heartbeat')
+    assert expire_presence() == [bob.id]
+    assert [e['args'][0] for e in alice_socket.get_received() if e['name'] == 'presence'] == \
+        [{'user_id': bob.id, 'online': False}]
+    assert presence().online([alice.id, bob.id]) == {alice.id}
+    alice_socket.disconnect()
+    bob_socket.disconnect()
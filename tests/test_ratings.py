@@ -0,0 +1,110 @@
+from app import db
+from app.commands import rebuild_rating_aggregates
+from app.models import Review, ServiceProvider, UserRole
+
+def make_provider(owner):
+    provider = ServiceProvider(user_id=owner.id, business_name='Pipes')
+    db.session.add(provider)
+    db.session.commit()
+    return provider
+
+def test_review_writes_maintain_aggregates(client, make_user, auth_headers):
+    provider = make_provider(make_user('owner@example.com', UserRole.PROVIDER))
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    
+    client.post(f'/api/providers/{provider.id}/reviews', headers=auth_headers(alice), json={'rating': 5})
+    response = client.post(f'/api/providers/{provider.id}/reviews', headers=auth_headers(bob), json={'rating': 2})
+    review_id = response.json['id']
+    
+    provider = client.get(f'/api/providers/{provider.id}').json
+    assert (provider['rating'], provider['review_count']) == (3.5, 2)
+    assert provider['rating_histogram'] == {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1}
+    
+    client.put(f'/api/reviews/{review_id}', headers=auth_headers(bob), json={'rating': 4})
+    provider = client.get(f"/api/providers/{provider['id']}").json
+    assert (provider['rating'], provider['review_count']) == (4.5, 2)
+    assert provider['rating_histogram']['2'] == 0
+    
+    # Editing only the content leaves the provider and its version alone
+    version = ServiceProvider.query.get(provider['id']).version
+    client.put(f'/api/reviews/{review_id}', headers=auth_headers(bob), json={'rating': 4, 'content': 'Edited'})
+    db.session.expire_all()
+    assert ServiceProvider.query.get(provider['id']).version == version
+    
+    client.delete(f'/api/reviews/{review_id}', headers=auth_headers(bob))
+    provider = client.get(f"/api/providers/{provider['id']}").json
+    assert (provider['rating'], provider['review_count']) == (5.0, 1)
+
+def test_ratings_must_be_whole_stars(client, make_user, auth_headers):
+    provider = make_provider(make_user('owner@example.com', UserRole.PROVIDER))
+    alice = make_user('alice@example.com')
+    url = f'/api/providers/{provider.id}/reviews'
+    
+    for rating in [4.5, '4', 0, 6, True, None]:
+        assert client.post(url, headers=auth_headers(alice), json={'rating': rating}).status_code == 400
+    review_id = client.post(url, headers=auth_headers(alice), json={'rating': 4}).json['id']
+    assert client.put(f'/api/reviews/{review_id}', headers=auth_headers(alice), json={'rating': 4.5}).status_code == 400
+
+def test_rebuild_command_reconciles_drift(app, make_user):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    provider = make_provider(owner)
+    empty = make_provider(owner)
+    db.session.add_all([
+        Review(user_id=owner.id, provider_id=provider.id, rating=rating) for rating in (1, 4, 4)
+    ])
+    empty.review_count = 7
+    db.session.commit()
+    
+    result = app.test_cli_runner().invoke(args=['ratings', 'rebuild', '--batch-size', '1'])
+    assert 'for 2 providers' in result.output
+    
+    db.session.expire_all()
+    assert (provider.review_count, provider.rating_sum, provider.rating) == (3, 9, 3.0)
+    assert provider.rating_histogram == {'1': 1, '2': 0, '3': 0, '4': 2, '5': 0}
+    assert (empty.review_count, empty.rating) == (0, 0.0)
+    assert rebuild_rating_aggregates() == 2
+
+def test_concurrent_reviews_do_not_lose_updates(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.models import User
+    from config import TestingConfig
+    
+    class FileDatabaseConfig(TestingConfig):
+        # A file database gives every thread its own connection
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'reviews.db'}"
+        RATELIMIT_ENABLED = False
+    
+    app = create_app(FileDatabaseConfig)
+    with app.app_context():
+        db.create_all()
+        owner = User(email='owner@example.com', first_name='O', last_name='W',
+                     password_hash='x', role=UserRole.PROVIDER)
+        customers = [User(email=f'c{i}@example.com', first_name='C', last_name=str(i), password_hash='x')
+                     for i in range(200)]
+        db.session.add_all([owner] + customers)
+        db.session.commit()
+        provider = make_provider(owner)
+        requests = [(create_access_token(identity=customer.id), customer.id % 5 + 1)
+                    for customer in customers]
+        provider_id = provider.id
+    
+    def post_review(request):
+        token, rating = request
+        return app.test_client().post(f'/api/providers/{provider_id}/reviews', json={'rating': rating},
+                                      headers={'Authorization': f'Bearer {token}'}).status_code
+    
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        statuses = list(executor.map(post_review, requests))
+    assert statuses == [201] * 200
+    
+    with app.app_context():
+        provider = db.session.get(ServiceProvider, provider_id)
+        assert provider.review_count == 200
+        assert provider.rating_sum == 40 * (1 + 2 + 3 + 4 + 5)
+        assert provider.rating == 3.0
+        assert provider.rating_histogram == {str(stars): 40 for stars in range(1, 6)}
+        db.session.remove()
+        db.drop_all()
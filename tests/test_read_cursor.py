@@ -0,0 +1,68 @@
+from app.models import Conversation, Message
+
+def test_opening_thread_advances_read_cursor(client, make_user, auth_headers, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    ids = [send_message(alice, bob, f'message {n}') for n in range(3)]
+    
+    conversation = Conversation.query.one()
+    assert conversation.unread_count(bob.id) == 3
+    assert not Message.query.get(ids[0]).read
+    
+    page = client.get(f'/api/conversations/{conversation.id}/messages', headers=auth_headers(bob)).json
+    assert [m['id'] for m in page['items']] == ids[::-1]
+    assert all(m['read'] for m in page['items'])
+    
+    inbox = client.get('/api/conversations', headers=auth_headers(bob)).json
+    assert inbox['items'][0]['unread_count'] == 0
+    assert inbox['items'][0]['last_read_message_id'] == ids[-1]
+    
+    # The sender's side of the thread is untouched
+    inbox = client.get('/api/conversations', headers=auth_headers(alice)).json
+    assert inbox['items'][0]['last_read_message_id'] == 0
+
+def test_mark_message_read_never_moves_cursor_backwards(client, make_user, auth_headers, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    ids = [send_message(alice, bob, f'message {n}') for n in range(3)]
+    
+    response = client.post(f'/api/messages/{ids[1]}/read', headers=auth_headers(bob))
+    assert response.status_code == 200
+    assert response.json['read']
+    conversation = Conversation.query.one()
+    assert conversation.last_read(bob.id) == ids[1]
+    assert conversation.unread_count(bob.id) == 1
+    assert not Message.query.get(ids[2]).read
+    
+    client.post(f'/api/messages/{ids[0]}/read', headers=auth_headers(bob))
+    conversation = Conversation.query.one()
+    assert conversation.last_read(bob.id) == ids[1]
+    assert conversation.unread_count(bob.id) == 1
+    
+    response = client.post(f'/api/messages/{ids[0]}/read', headers=auth_headers(alice))
+    assert response.status_code == 403
+    
+    response = client.post(f'/api/conversations/{conversation.id}/read', headers=auth_headers(bob))
+    assert response.json['unread_count'] == 0
+    assert response.json['last_read_message_id'] == ids[2]
+
+def test_mark_conversation_read_validates_message_id(client, make_user, auth_headers, send_message):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    ids = [send_message(alice, bob, f'message {n}') for n in range(2)]
+    conversation = Conversation.query.one()
+    url = f'/api/conversations/{conversation.id}/read'
+    
+    for message_id in ['abc', 1.5, True, -1]:
+        response = client.post(url, headers=auth_headers(bob), json={'message_id': message_id})
+        assert response.status_code == 400
+    assert client.get('/api/conversations', headers=auth_headers(bob)).status_code == 200
+    
+    # An id past the latest message only reads up to the latest message
+    response = client.post(url, headers=auth_headers(bob), json={'message_id': 10 ** 9})
+    assert response.json['last_read_message_id'] == ids[-1]
+    
+    third = send_message(alice, bob, 'message 2')
+    inbox = client.get('/api/conversations', headers=auth_headers(bob)).json
+    assert inbox['items'][0]['unread_count'] == 1
+    assert not Message.query.get(third).read
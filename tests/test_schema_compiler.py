@@ -0,0 +1,108 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from marshmallow import Schema, fields, post_dump
+
+from app import db, models, schemas
+from app.models import Conversation, Message, ServiceProvider, User, UserRole
+from app.schema_compiler import CompiledSchema
+
+AT = datetime(2026, 10, 18, 9, 30, 15, 120000)
+
+def compiled_schemas(module):
+    return [(f'{module.__name__}.{name}', schema) for name, schema in vars(module).items()
+            if isinstance(schema, CompiledSchema)]
+
+def namespace_user(id, **overrides):
+    values = dict(id=id, email=f'user{id}@example.com', phone=None, first_name='Test', last_name='User',
+                  role='customer', created_at=AT)
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+def namespace_comment(id, replies=()):
+    return SimpleNamespace(id=id, content=f'Comment {id}', author_id=1, post_id=1, parent_id=None,
+                           created_at=AT, updated_at=None, author=namespace_user(1), replies=list(replies))
+
+def namespace_samples():
+    """Objects carrying every field the app.schemas schemas declare."""
+    alice = namespace_user(1)
+    bob = namespace_user(2, phone='+15550100', role=UserRole.PROVIDER, created_at=None)
+    thread = namespace_comment(1, [namespace_comment(2, [namespace_comment(3)]), namespace_comment(4)])
+    return {
+        'UserSchema': [alice, bob],
+        'ServiceProviderSchema': [
+            SimpleNamespace(id=1, user_id=2, business_name='Pipes', description=None, address='1 Main St',
+                            latitude=51.5, longitude=-0.12, services=['heating', 'plumbing'], rating=4,
+                            review_count=3, created_at=AT, user=bob),
+            SimpleNamespace(id=2, user_id=2, business_name='Wires', latitude=None, longitude=None,
+                            services=[], rating=None, review_count=0, created_at=AT, user=None),
+        ],
+        'MessageSchema': [
+            SimpleNamespace(id=1, sender_id=1, receiver_id=2, content='hi', read=True, read_at=AT,
+                            created_at=AT, sender=alice, receiver=bob),
+            SimpleNamespace(id=2, sender_id=2, receiver_id=1, content='yo', read=False, read_at=None,
+                            created_at=AT, sender=bob, receiver=alice),
+        ],
+        'BlogPostSchema': [
+            SimpleNamespace(id=1, title='Hello', content='Body', author_id=1, slug='hello', status='published',
+                            view_count=7, created_at=AT, updated_at=None, author=alice, comments=[thread]),
+        ],
+        'CommentSchema': [thread, namespace_comment(5)],
+        'ReviewSchema': [
+            SimpleNamespace(id=1, provider_id=1, customer_id=1, rating=5, content=None, created_at=AT,
+                            updated_at=AT, customer=alice),
+        ],
+    }
+
+def model_samples(make_user):
+    """ORM rows for the schemas in app.models."""
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com', UserRole.PROVIDER)
+    provider = ServiceProvider(user_id=bob.id, business_name='Pipes', latitude=51.5, longitude=-0.12,
+                               services=['plumbing', 'heating'])
+    db.session.add(provider)
+    conversation = Conversation(user_a_id=alice.id, user_b_id=bob.id)
+    db.session.add(conversation)
+    db.session.flush()
+    db.session.add_all([
+        Message(conversation_id=conversation.id, sender_id=alice.id, recipient_id=bob.id, content='hi'),
+        Message(conversation_id=conversation.id, sender_id=bob.id, recipient_id=alice.id, content='yo'),
+    ])
+    db.session.commit()
+    return {
+        'UserSchema': User.query.all(),
+        'ServiceProviderSchema': ServiceProvider.query.all(),
+        'MessageSchema': Message.query.all(),
+    }
+
+def assert_parity(name, schema, samples):
+    objects = samples[type(schema.schema).__name__]
+    if schema.many:
+        assert schema.dump(objects) == schema.schema.dump(objects), name
+    for obj in objects:
+        assert schema.dump(obj, many=False) == schema.schema.dump(obj, many=False), name
+
+@pytest.mark.parametrize('name, schema', compiled_schemas(schemas))
+def test_app_schemas_match_marshmallow(name, schema):
+    assert_parity(name, schema, namespace_samples())
+
+@pytest.mark.parametrize('name, schema', compiled_schemas(models))
+def test_model_schemas_match_marshmallow(app, make_user, name, schema):
+    assert_parity(name, schema, model_samples(make_user))
+
+def test_recursive_schema_dumps_the_whole_thread():
+    dumped = schemas.comment_schema.dump(namespace_samples()['CommentSchema'][0])
+    assert dumped['replies'][0]['replies'][0]['id'] == 3
+    assert dumped['replies'][0]['author']['email'] == 'user1@example.com'
+
+def test_hooks_and_mappings_fall_back_to_marshmallow():
+    class Shouting(Schema):
+        name = fields.String()
+        
+        @post_dump
+        def shout(self, data, **kwargs):
+            return {key: value.upper() for key, value in data.items()}
+    
+    assert CompiledSchema(Shouting()).dump(SimpleNamespace(name='pipes')) == {'name': 'PIPES'}
+    assert schemas.user_schema.dump({'id': 1, 'first_name': 'Al'}) == {'id': 1, 'first_name': 'Al'}
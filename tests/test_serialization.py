@@ -0,0 +1,47 @@
+import decimal
+import uuid
+from datetime import datetime
+
+from app import create_app, db
+from app.models import Comment, Review, ServiceProvider, User, UserRole
+from app.serialization import OrjsonProvider, StdlibJSONProvider
+from config import TestingConfig
+
+class StdlibConfig(TestingConfig):
+    JSON_PROVIDER = 'default'
+
+def test_providers_encode_alike(app, make_user):
+    make_user('alice@example.com')
+    row = db.session.query(User.id, User.email, User.role, User.created_at).one()
+    payload = {
+        'row': row,
+        'at': datetime(2026, 10, 18, 9, 30, 15, 120000),
+        'role': UserRole.ADMIN,
+        'price': decimal.Decimal('12.50'),
+        'ref': uuid.UUID(int=1),
+        'items': [1, None, 'two'],
+    }
+    
+    fast = OrjsonProvider(app).dumps(payload)
+    assert fast == StdlibJSONProvider(app).dumps(payload, separators=(',', ':'))
+    assert OrjsonProvider(app).loads(fast)['at'] == '2026-10-18T09:30:15.120000'
+    assert OrjsonProvider(app).loads(fast)['row']['role'] == 'customer'
+
+def test_provider_is_configurable():
+    assert isinstance(create_app(TestingConfig).json, OrjsonProvider)
+    assert isinstance(create_app(StdlibConfig).json, StdlibJSONProvider)
+
+def test_row_listings_match_to_dict(client, make_user, make_post):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    provider = ServiceProvider(user_id=owner.id, business_name='Pipes')
+    post = make_post(owner, 'post')
+    db.session.add(provider)
+    db.session.flush()
+    review = Review(user_id=owner.id, provider_id=provider.id, rating=4, content='Good',
+                    created_at=datetime(2026, 10, 18, 9, 30, 15, 120000))
+    comment = Comment(content='Hi', author_id=owner.id, post_id=post.id)
+    db.session.add_all([review, comment])
+    db.session.commit()
+    
+    assert client.get(f'/api/providers/{provider.id}/reviews').json['items'] == [review.to_dict()]
+    assert client.get(f'/api/blog/posts/{post.id}/comments').json['items'] == [comment.to_dict()]
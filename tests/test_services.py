@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import db
+from app.models import ServiceProvider, Service, UserRole, normalize_services
+
+def test_normalize_services():
+    assert normalize_services('Plumbing, painting,,plumbing') == ['plumbing', 'painting']
+    assert normalize_services('["Tiling", "roofing"]') == ['tiling', 'roofing']
+    assert normalize_services(None) == []
+    for services in ['[x', '[1, 2]', '["a", null]', 5, {'a': 'b'}]:
+        with pytest.raises(ValueError):
+            normalize_services(services)
+
+def test_services_are_shared_rows(app, make_user):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    first = ServiceProvider(user_id=owner.id, business_name='A', services=['paint', 'roofing'])
+    db.session.add(first)
+    db.session.commit()
+    second = ServiceProvider(user_id=owner.id, business_name='B', services='Paint')
+    db.session.add(second)
+    db.session.commit()
+    
+    assert Service.query.count() == 2
+    assert first.services == ['paint', 'roofing']
+    assert second.to_dict()['services'] == ['paint']
+
+def test_search_matches_whole_services(client, make_user):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    db.session.add_all([
+        ServiceProvider(user_id=owner.id, business_name='Painter', services=['paint']),
+        ServiceProvider(user_id=owner.id, business_name='Remover', services=['painting-removal']),
+        ServiceProvider(user_id=owner.id, business_name='Both', services=['paint', 'plumbing']),
+    ])
+    db.session.commit()
+    
+    names = lambda response: sorted(p['business_name'] for p in response.json)
+    assert names(client.get('/api/providers/search?service=paint')) == ['Both', 'Painter']
+    assert names(client.get('/api/providers/search?service=paint,plumbing')) == ['Both']
+    assert names(client.get('/api/providers/search?service=plumbing,painting-removal&match=any')) == ['Both', 'Remover']
+    assert client.get('/api/providers/search?service=paint&match=foo').status_code == 400
+
+def test_malformed_services_are_rejected(client, make_user, auth_headers):
+    for url in ['/api/providers/search?service=[x', '/api/providers/search?service=[1,2]',
+                '/api/providers/nearest?lat=1&lng=1&services=[x']:
+        response = client.get(url)
+        assert response.status_code == 400
+        assert response.json['error'] == 'services must be a list of names'
+    
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    response = client.post('/api/providers', headers=auth_headers(owner), json={
+        'business_name': 'A', 'address': 'Somewhere', 'latitude': 1.0, 'longitude': 1.0, 'services': [1, 2]
+    })
+    assert response.status_code == 400
+    assert ServiceProvider.query.count() == 0
+
+def test_concurrently_created_services_are_reused(app, monkeypatch):
+    db.session.add(Service(name='paint'))
+    db.session.commit()
+    query = Service.query
+    lookups = []
+    
+    # The first lookup misses the row another request committed in the meantime
+    def filter(*criteria):
+        lookups.append(criteria)
+        return [] if len(lookups) == 1 else query.filter(*criteria)
+    monkeypatch.setattr(Service, 'query', SimpleNamespace(filter=filter))
+    services = Service.for_names(['paint', 'roofing'])
+    monkeypatch.undo()
+    db.session.commit()
+    
+    assert [service.name for service in services] == ['paint', 'roofing']
+    assert Service.query.count() == 2
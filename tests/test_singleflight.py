@@ -0,0 +1,112 @@
+import threading
+import time
+
+import fakeredis
+
+from app import db
+from app.api import providers as providers_api
+from app.models import ServiceProvider, UserRole
+from app.singleflight import RedisSingleFlight, SingleFlight, search_key
+
+def run_concurrently(count, target):
+    results = [None] * count
+    
+    def run(index):
+        results[index] = target(index)
+    
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def slow_counter(calls, result='result'):
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return result
+    return compute
+
+def test_concurrent_calls_share_one_run():
+    group = SingleFlight()
+    calls = []
+    
+    assert run_concurrently(8, lambda index: group.do('key', slow_counter(calls))) == ['result'] * 8
+    assert len(calls) == 1
+    
+    # Nothing is kept once the call finished
+    group.do('key', slow_counter(calls))
+    assert len(calls) == 2
+
+def test_errors_reach_every_waiter():
+    group = SingleFlight()
+    
+    def fail():
+        time.sleep(0.2)
+        raise ValueError('boom')
+    
+    def call(index):
+        try:
+            group.do('key', fail)
+        except ValueError as error:
+            return str(error)
+    
+    assert run_concurrently(4, call) == ['boom'] * 4
+
+def test_waiters_give_up_on_a_stuck_leader():
+    group = SingleFlight(timeout=0.1)
+    release = threading.Event()
+    
+    def stuck():
+        release.wait()
+        return 'leader'
+    
+    leader = threading.Thread(target=group.do, args=('key', stuck))
+    leader.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert group.do('key', lambda: 'follower') == 'follower'
+    assert time.monotonic() - started < 1
+    release.set()
+    leader.join()
+
+def test_workers_coalesce_through_a_redis_lock():
+    server = fakeredis.FakeServer()
+    workers = [SingleFlight(RedisSingleFlight(fakeredis.FakeRedis(server=server), lock_ttl=5)) for _ in range(3)]
+    calls = []
+    
+    results = run_concurrently(6, lambda index: workers[index % 3].do('key', slow_counter(calls, {'n': 1})))
+    assert results == [{'n': 1}] * 6
+    assert len(calls) == 1
+
+def test_search_key_snaps_coordinates_to_the_grid(app):
+    def key(query):
+        with app.test_request_context(f'/api/providers/search?{query}'):
+            return search_key()
+    
+    assert key('lat=51.50001&lon=-0.12001&service=plumbing') == key('service=plumbing&lon=-0.12003&lat=51.50002')
+    assert key('lat=51.5&lon=-0.12') != key('lat=51.51&lon=-0.12')
+    assert key('lat=51.5&lon=-0.12&service=plumbing') != key('lat=51.5&lon=-0.12&service=heating')
+
+def test_identical_searches_run_the_pipeline_once(app, make_user, monkeypatch):
+    owner = make_user('owner@example.com', UserRole.PROVIDER)
+    db.session.add(ServiceProvider(user_id=owner.id, business_name='Pipes', latitude=51.5, longitude=-0.12))
+    db.session.commit()
+    
+    calls = []
+    within_radius = providers_api.within_radius
+    
+    def slow_within_radius(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.2)
+        return within_radius(*args, **kwargs)
+    
+    monkeypatch.setattr(providers_api, 'within_radius', slow_within_radius)
+    
+    def search(index):
+        return app.test_client().get('/api/providers/search?lat=51.5&lon=-0.12&radius=5').json
+    
+    results = run_concurrently(5, search)
+    assert len(calls) == 1
+    assert all(result == results[0] and result[0]['business_name'] == 'Pipes' for result in results)
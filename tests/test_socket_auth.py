@@ -0,0 +1,48 @@
+from flask_jwt_extended import create_refresh_token
+from app import db, socketio
+import app.socket_auth as socket_auth
+
+def test_connect_requires_valid_access_token(app, make_user, auth_headers):
+    alice = make_user('alice@example.com')
+    
+    assert not socketio.test_client(app).is_connected()
+    assert not socketio.test_client(app, auth={'token': 'not-a-jwt'}).is_connected()
+    assert not socketio.test_client(app, auth={'token': create_refresh_token(identity=alice.id)}).is_connected()
+    
+    token = auth_headers(alice)['Authorization'].split()[1]
+    socket = socketio.test_client(app, auth={'token': token})
+    assert socket.is_connected()
+    socket.disconnect()
+
+def test_rooms_derive_from_handshake_identity(app, make_user, auth_headers):
+    alice = make_user('alice@example.com')
+    bob = make_user('bob@example.com')
+    socket = socketio.test_client(app, headers=auth_headers(bob))
+    
+    # Asking for someone else's room still only joins your own
+    socket.emit('join', {'room': str(alice.id)})
+    assert [e['args'][0] for e in socket.get_received() if e['name'] == 'user_joined'] == [{'room': str(bob.id)}]
+    
+    socketio.emit('new_message', {'id': 1}, room=str(alice.id))
+    socketio.emit('new_message', {'id': 2}, room=str(bob.id))
+    assert [e['args'][0] for e in socket.get_received() if e['name'] == 'new_message'] == [{'id': 2}]
+    socket.disconnect()
+
+def test_verified_tokens_are_cached(app, make_user, auth_headers, monkeypatch):
+    alice = make_user('alice@example.com')
+    headers = auth_headers(alice)
+    decoded = []
+    decode_token = socket_auth.decode_token
+    monkeypatch.setattr(socket_auth, 'decode_token', lambda token: decoded.append(token) or decode_token(token))
+    
+    for _ in range(5):
+        socket = socketio.test_client(app, headers=headers)
+        assert socket.is_connected()
+        socket.disconnect()
+    assert len(decoded) == 1
+    
+    # Deactivated users are refused once their cached entry is gone
+    alice.is_active = False
+    db.session.commit()
+    app.extensions.pop('socket_token_cache')
+    assert not socketio.test_client(app, headers=headers).is_connected()
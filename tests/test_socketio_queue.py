@@ -0,0 +1,124 @@
+import multiprocessing
+import socket
+import threading
+import time
+
+import pytest
+import requests
+import socketio as socketio_client
+from flask_jwt_extended import create_access_token
+from app import create_app, db, socketio, start_background_tasks
+from app.models import User
+from app.realtime import FakeRedisManager, message_queue
+from socketio import PubSubManager
+from config import TestingConfig
+
+def test_message_queue_follows_config(app):
+    assert message_queue(app) is None
+    assert not isinstance(socketio.server.manager, PubSubManager)
+
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = 'fakeredis://selection'
+    assert isinstance(message_queue(app), FakeRedisManager)
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = 'redis://localhost:6379/0'
+    assert message_queue(app).name == 'redis'
+
+def test_fakeredis_managers_share_a_bus():
+    publisher = FakeRedisManager('fakeredis://bus', channel='test')
+    listener = FakeRedisManager('fakeredis://bus', channel='test')
+    received = []
+    thread = threading.Thread(target=lambda: received.append(next(listener._listen())), daemon=True)
+    thread.start()
+
+    # Publishing reports the subscriber count, so retry until the listener is in
+    deadline = time.monotonic() + 5
+    while not publisher._publish({'method': 'emit', 'event': 'ping'}) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    thread.join(5)
+    assert len(received) == 1 and b'ping' in received[0]
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def run_worker(settings, port):
+    app = create_app(type('WorkerConfig', (TestingConfig,), settings))
+    start_background_tasks(app)
+    socketio.run(app, host='127.0.0.1', port=port, debug=False, use_reloader=False,
+                 allow_unsafe_werkzeug=True, log_output=False)
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f'worker on port {port} did not start')
+
+def test_emit_reaches_socket_on_another_worker(tmp_path):
+    pytest.importorskip('kombu')
+    # kombu's filesystem transport gives the workers a shared fanout queue
+    # without a broker; production points the same setting at Redis
+    for folder in ('data', 'control'):
+        (tmp_path / folder).mkdir()
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'workers.db'}",
+        'RATELIMIT_ENABLED': False,
+        'OUTBOX_DISPATCH_INTERVAL': 0.05,
+        'SOCKETIO_MESSAGE_QUEUE': 'filesystem://',
+        'SOCKETIO_MESSAGE_QUEUE_OPTIONS': {'transport_options': {
+            'data_folder_in': str(tmp_path / 'data'),
+            'data_folder_out': str(tmp_path / 'data'),
+            'control_folder': str(tmp_path / 'control'),
+            'polling_interval': 0.05
+        }}
+    }
+
+    setup = create_app(type('SetupConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': settings['SQLALCHEMY_DATABASE_URI']}))
+    with setup.app_context():
+        db.create_all()
+        alice = User(email='alice@example.com', first_name='Alice', last_name='User')
+        bob = User(email='bob@example.com', first_name='Bob', last_name='User')
+        for user in (alice, bob):
+            user.set_password('testpass123')
+            db.session.add(user)
+        db.session.commit()
+        alice_token = create_access_token(identity=alice.id)
+        bob_token = create_access_token(identity=bob.id)
+        bob_id = bob.id
+
+    context = multiprocessing.get_context('spawn')
+    socket_port, http_port = free_port(), free_port()
+    workers = [context.Process(target=run_worker, args=(settings, port), daemon=True)
+               for port in (socket_port, http_port)]
+    for worker in workers:
+        worker.start()
+
+    client = socketio_client.Client()
+    joined = threading.Event()
+    delivered = []
+    arrived = threading.Event()
+    client.on('user_joined', lambda data: joined.set())
+    client.on('new_message', lambda data: (delivered.append(data), arrived.set()))
+    try:
+        for port in (socket_port, http_port):
+            wait_for(port)
+        client.connect(f'http://127.0.0.1:{socket_port}', transports=['polling'],
+                       headers={'Authorization': f'Bearer {bob_token}'})
+        client.emit('join', {'room': str(bob_id)})
+        assert joined.wait(10)
+
+        response = requests.post(f'http://127.0.0.1:{http_port}/api/messages',
+                                 headers={'Authorization': f'Bearer {alice_token}'},
+                                 json={'receiver_id': bob_id, 'content': 'from another worker'}, timeout=10)
+        assert response.status_code == 201
+
+        assert arrived.wait(10)
+        assert [message['content'] for message in delivered] == ['from another worker']
+    finally:
+        client.disconnect()
+        for worker in workers:
+            worker.terminate()
+            worker.join(10)
@@ -0,0 +1,64 @@
+import json
+
+from app import db
+from app.cache import response_cache
+from app.models import ServiceProvider, UserRole
+
+def make_providers(make_user, count):
+    for index in range(count):
+        user = make_user(f'provider{index}@example.com', UserRole.PROVIDER)
+        db.session.add(ServiceProvider(user_id=user.id, business_name=f'Provider {index}'))
+    db.session.commit()
+
+def test_streams_a_json_array_in_batches(app, client, make_user, auth_headers):
+    app.config['STREAM_BATCH_SIZE'] = 2
+    users = [make_user(f'user{index}@example.com') for index in range(5)]
+    
+    response = client.get('/api/users?stream=true', headers=auth_headers(users[0]))
+    assert response.is_streamed
+    assert response.mimetype == 'application/json'
+    
+    chunks = list(response.response)
+    # Opening bracket, three batches, closing bracket
+    assert len(chunks) == 5
+    body = json.loads(b''.join(chunks))
+    assert [user['email'] for user in body] == [user.email for user in users]
+
+def test_streams_ndjson_when_asked(app, client, make_user, auth_headers):
+    make_providers(make_user, 3)
+    
+    for url, headers in [('/api/providers?format=ndjson', {}),
+                         ('/api/providers', {'Accept': 'application/x-ndjson'})]:
+        response = client.get(url, headers=headers)
+        assert response.mimetype == 'application/x-ndjson'
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line)['business_name'] for line in lines] == ['Provider 0', 'Provider 1', 'Provider 2']
+
+def test_empty_collection_is_an_empty_array(client):
+    response = client.get('/api/providers?stream=true')
+    assert response.json == []
+
+def test_pagination_stays_the_default(client, make_user, auth_headers):
+    user = make_user('user@example.com')
+    response = client.get('/api/users', headers=auth_headers(user))
+    assert [item['email'] for item in response.json['items']] == ['user@example.com']
+
+def test_streamed_responses_are_not_cached_or_hashed(app, client, make_user):
+    app.config['RESPONSE_CACHE_ENABLED'] = True
+    make_providers(make_user, 1)
+    
+    response = client.get('/api/providers?stream=true')
+    assert 'ETag' not in response.headers
+    assert len(response.json) == 1
+    assert 'api.get_providers' not in response_cache().stats
+    
+    # A cached page of the same URL is not served to a stream request
+    assert 'items' in client.get('/api/providers').json
+    response = client.get('/api/providers', headers={'Accept': 'application/x-ndjson'})
+    assert response.mimetype == 'application/x-ndjson'
+    assert json.loads(response.get_data(as_text=True))['business_name'] == 'Provider 0'
+    
+    db.session.add(ServiceProvider(user_id=make_user('late@example.com', UserRole.PROVIDER).id,
+                                   business_name='Late'))
+    db.session.commit()
+    assert len(client.get('/api/providers?stream=true').json) == 2
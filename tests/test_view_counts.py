@@ -0,0 +1,48 @@
+import pytest
+
+from app import db
+from app.view_counts import flush_views, view_counter
+
+def view(client, post, **headers):
+    assert client.get(f'/api/blog/posts/{post.id}', headers=headers).status_code == 200
+
+@pytest.mark.parametrize('url', [None, 'fakeredis://'])
+def test_views_are_buffered_deduplicated_and_flushed(app, client, make_user, auth_headers, url, make_post, count_queries):
+    app.config['VIEW_COUNTER_URL'] = url
+    author = make_user('author@example.com')
+    reader = make_user('reader@example.com')
+    popular = make_post(author, 'popular')
+    quiet = make_post(author, 'quiet')
+    
+    with count_queries() as statements:
+        view(client, popular)
+    assert not any(statement.startswith('UPDATE') for statement in statements)
+    
+    view(client, popular)
+    view(client, popular, **{'User-Agent': 'other-browser'})
+    view(client, popular, **auth_headers(reader))
+    view(client, popular, **auth_headers(reader))
+    view(client, quiet)
+    assert popular.view_count == 0
+    
+    with count_queries() as statements:
+        assert flush_views() == 2
+    assert len([statement for statement in statements if statement.startswith('UPDATE')]) == 1
+    
+    db.session.expire_all()
+    assert (popular.view_count, quiet.view_count) == (3, 1)
+    assert flush_views() == 0
+
+def test_failed_flush_keeps_views_buffered(app, client, make_user, monkeypatch, make_post):
+    post = make_post(make_user('author@example.com'), 'post')
+    view(client, post)
+    
+    def fail(*args, **kwargs):
+        raise RuntimeError('database unavailable')
+    
+    monkeypatch.setattr(db.session, 'commit', fail)
+    with pytest.raises(RuntimeError):
+        flush_views()
+    monkeypatch.undo()
+    
+    assert view_counter().drain() == {post.id: 1}